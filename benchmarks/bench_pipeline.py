@@ -0,0 +1,432 @@
+"""
+İndirme hattı için ağ gerektirmeyen kıyaslama (benchmark) aracı.
+
+Yerel bir HTTP sunucusu DASH benzeri görüntü/ses dosyaları ve sahte bir
+çıkarıcı/oynatma listesi sunar; YouTubeDownloader uçtan uca çalıştırılır ve
+sonuçlar sürümler arasında karşılaştırılabilmesi için JSON olarak yazılır.
+
+Kullanım:
+    python benchmarks/bench_pipeline.py --playlist-size 20 --workers 4 -o results.json
+    python benchmarks/bench_pipeline.py --compare old.json -o new.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.downloader import YouTubeDownloader, load_yt_dlp
+from src.core.segmented import segmented_youtube_dl_class
+from src.core.jobs import JobQueue
+from src.core.cache import MetadataCache
+from src.core.cli import parse_outputs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHASES = ("extract", "video", "audio", "merge", "transcode")
+
+
+class MediaStore:
+    """Sunucunun dağıttığı görüntü ve ses dosyalarının içeriği"""
+
+    def __init__(self, video_size, audio_size, work_dir):
+        self.real_media = False
+        self.video = None
+        self.audio = None
+        if shutil.which("ffmpeg"):
+            self.real_media = self._generate_real_media(work_dir)
+        if not self.real_media:
+            # Örnek medya üretilemezse birleştirme adımı ölçülemez, yalnızca aktarım ölçülür
+            self.video = os.urandom(video_size)
+            self.audio = os.urandom(audio_size)
+
+    def _generate_real_media(self, work_dir):
+        video_path = os.path.join(work_dir, "source_video.mp4")
+        audio_path = os.path.join(work_dir, "source_audio.m4a")
+        commands = [
+            ['ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=duration=30:size=1280x720:rate=30',
+             '-c:v', 'libx264', '-preset', 'ultrafast', '-an', video_path],
+            ['ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=30',
+             '-c:a', 'aac', '-b:a', '128k', '-vn', audio_path],
+        ]
+        for command in commands:
+            if subprocess.run(command, capture_output=True).returncode != 0:
+                return False
+        with open(video_path, 'rb') as f:
+            self.video = f.read()
+        with open(audio_path, 'rb') as f:
+            self.audio = f.read()
+        return True
+
+    def get(self, name):
+        return self.video if name == "video.mp4" else self.audio
+
+
+class BenchServer:
+    """Range isteklerini destekleyen, gecikme ve hız sınırı eklenebilen yerel medya sunucusu"""
+
+    def __init__(self, media, latency=0.0, rate=0):
+        self.media = media
+        self.latency = latency  # Saniye; sayfa/TLS gecikmesini taklit eder
+        self.rate = rate  # Bağlantı başına bayt/saniye, 0 = sınırsız
+        self.bytes_served = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def do_GET(self):
+                self._serve(send_body=True)
+
+            def _serve(self, send_body):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if self.path.startswith("/page/"):
+                    body = b"<html><body>benchmark page</body></html>"
+                    self._send(200, body, "text/html", send_body)
+                    return
+
+                match = re.match(r"^/media/[\w-]+/(video\.mp4|audio\.m4a)$", self.path)
+                if not match:
+                    self._send(404, b"not found", "text/plain", send_body)
+                    return
+
+                data = server.media.get(match.group(1))
+                content_type = "video/mp4" if match.group(1) == "video.mp4" else "audio/mp4"
+                range_header = self.headers.get("Range")
+                range_match = re.match(r"bytes=(\d+)-(\d*)", range_header or "")
+                if range_match:
+                    start = int(range_match.group(1))
+                    end = int(range_match.group(2)) if range_match.group(2) else len(data) - 1
+                    end = min(end, len(data) - 1)
+                    if start >= len(data):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(data)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self._send(206, data[start:end + 1], content_type, send_body,
+                               {"Content-Range": f"bytes {start}-{end}/{len(data)}"})
+                else:
+                    self._send(200, data, content_type, send_body)
+
+            def _send(self, code, body, content_type, send_body, extra_headers=None):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Accept-Ranges", "bytes")
+                for key, value in (extra_headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if not send_body:
+                    return
+
+                chunk_size = 64 * 1024
+                view = memoryview(body)
+                try:
+                    for offset in range(0, len(body), chunk_size):
+                        chunk = view[offset:offset + chunk_size]
+                        self.wfile.write(chunk)
+                        with server.lock:
+                            server.bytes_served += len(chunk)
+                        if server.rate:
+                            time.sleep(len(chunk) / server.rate)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+def build_extractors(server):
+    """Yerel sunucuyu gösteren sahte video ve oynatma listesi çıkarıcılarını oluşturur"""
+    InfoExtractor = load_yt_dlp().extractor.common.InfoExtractor
+    port = server.httpd.server_address[1]
+    media = server.media
+
+    class BenchVideoIE(InfoExtractor):
+        _VALID_URL = r"http://127\.0\.0\.1:%d/watch\?v=(?P<id>[\w-]+)" % port
+
+        def _real_extract(self, url):
+            video_id = self._match_id(url)
+            # Sayfa isteği çıkarma gecikmesini taklit eder
+            self._download_webpage(f"{server.base_url}/page/{video_id}", video_id)
+            return {
+                'id': video_id,
+                'title': f"Benchmark video {video_id}",
+                'webpage_url': url,
+                'formats': [{
+                    'format_id': 'bench-video',
+                    'url': f"{server.base_url}/media/{video_id}/video.mp4",
+                    'ext': 'mp4',
+                    'width': 1920,
+                    'height': 1080,
+                    'vcodec': 'avc1.640028',
+                    'acodec': 'none',
+                    'filesize': len(media.video),
+                }, {
+                    'format_id': 'bench-audio',
+                    'url': f"{server.base_url}/media/{video_id}/audio.m4a",
+                    'ext': 'm4a',
+                    'vcodec': 'none',
+                    'acodec': 'mp4a.40.2',
+                    'abr': 128,
+                    'filesize': len(media.audio),
+                }],
+            }
+
+    class BenchPlaylistIE(InfoExtractor):
+        _VALID_URL = r"http://127\.0\.0\.1:%d/playlist\?n=(?P<id>\d+)" % port
+
+        def _real_extract(self, url):
+            count = int(self._match_id(url))
+            self._download_webpage(f"{server.base_url}/page/playlist-{count}", f"playlist-{count}")
+            entries = (
+                self.url_result(f"{server.base_url}/watch?v=bench{i:05d}", BenchVideoIE, f"bench{i:05d}")
+                for i in range(count)
+            )
+            return self.playlist_result(entries, f"playlist-{count}", f"Benchmark playlist ({count})")
+
+    return BenchVideoIE, BenchPlaylistIE
+
+
+class InstrumentedDownloader(YouTubeDownloader):
+    """
+    Aşama sürelerini ölçen ve sahte çıkarıcıları kullanan YouTubeDownloader.
+    İş kuyruğu ve bilgi önbelleği state_dir'de tutulur; kullanıcının ~/.ytdownloader kuyruğuna yarıda kalan
+    kıyaslamanın localhost işleri düşmez.
+    """
+
+    def __init__(self, extractors, state_dir=None):
+        super().__init__()
+        self.state_dir = state_dir or tempfile.mkdtemp(prefix="ytd-bench-state-")
+        self.jobs = JobQueue(self.state_dir)
+        self.metadata_cache = MetadataCache(self.state_dir)
+        self.extractors = extractors
+        self.phase_lock = threading.Lock()
+        self.phase_times = {phase: [] for phase in PHASES}
+        self.errors = []
+        self.signals.error.connect(self.errors.append)
+
+    def create_ydl(self, ydl_opts):
+        # Konsol çıktısı ölçümleri bozmasın
+        ydl_opts = dict(self.session_options(ydl_opts), quiet=True, noprogress=True, no_warnings=True)
+        ydl = segmented_youtube_dl_class()(ydl_opts, auto_init=False)
+        for extractor in self.extractors:
+            ydl.add_info_extractor(extractor())
+        ydl.add_default_info_extractors()
+        return ydl
+
+    def _timed(self, phase, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.phase_lock:
+                self.phase_times[phase].append(elapsed)
+
+    def extract_url_info(self, ydl, url, is_playlist):
+        return self._timed("extract", super().extract_url_info, ydl, url, is_playlist)
+
+    def resolve_entry(self, entry):
+        return self._timed("extract", super().resolve_entry, entry)
+
+    def download_stream(self, ydl_opts, info):
+        phase = "video" if ydl_opts['format'].startswith("bestvideo") else "audio"
+        return self._timed(phase, super().download_stream, ydl_opts, info)
+
+    def merge_streams(self, video_path, audio_path, source_url, cancel=None, output_path=None):
+        return self._timed("merge", super().merge_streams, video_path, audio_path, source_url, cancel, output_path)
+
+    def convert_audio(self, source_path, mp3_path, bitrate, source_url, cancel=None, keep_source=False):
+        return self._timed("transcode", super().convert_audio, source_path, mp3_path, bitrate, source_url, cancel,
+                           keep_source)
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(0.5) * 1000,
+        "p95_ms": percentile(0.95) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kilobayt, macOS bayt döndürür
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name, server, extractors, url, is_playlist, items, workers, is_video=True, segments=1, segment_min_size=0,
+                 engine="threads", outputs=None):
+    download_dir = tempfile.mkdtemp(prefix=f"ytd-bench-{name}-")
+    downloader = InstrumentedDownloader(extractors, os.path.join(download_dir, ".state"))
+    downloader.set_download_directory(download_dir)
+    downloader.set_max_workers(workers)
+    downloader.set_segment_connections(segments)
+    downloader.segment_min_size = segment_min_size
+    downloader.set_use_archive(False)
+    downloader.set_use_metadata_cache(False)
+
+    bytes_before = server.bytes_served
+    started = time.perf_counter()
+    quality = "1080p" if is_video else "192 kbps"
+    if outputs:
+        is_video, quality = outputs[0]
+    if engine == "asyncio":
+        asyncio.run(downloader.download_async(url, is_video, quality, is_playlist))
+    else:
+        downloader.run_download(url, is_video, quality, is_playlist, outputs=outputs)
+    wall = time.perf_counter() - started
+    transferred = server.bytes_served - bytes_before
+
+    downloader.jobs.close()
+    downloader.metadata_cache.close()
+    shutil.rmtree(download_dir, ignore_errors=True)
+    return {
+        "items": items,
+        "completed": len(downloader.downloaded_files),
+        "errors": len(downloader.errors),
+        "wall_s": wall,
+        "items_per_s": len(downloader.downloaded_files) / wall if wall else 0,
+        "mb_per_s": transferred / (1024 * 1024) / wall if wall else 0,
+        "bytes_transferred": transferred,
+        "phases": {phase: summarize(downloader.phase_times[phase]) for phase in PHASES},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_version():
+    try:
+        result = subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(previous, current):
+    """İki sonuç dosyasındaki senaryoların temel metriklerini karşılaştırır"""
+    lines = []
+    for name, result in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for metric in ("wall_s", "items_per_s", "mb_per_s", "peak_rss_mb"):
+            if old.get(metric) and result.get(metric) is not None:
+                change = (result[metric] - old[metric]) / old[metric] * 100
+                lines.append(f"{name:<10} {metric:<12} {old[metric]:10.2f} -> {result[metric]:10.2f} ({change:+.1f}%)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the download pipeline")
+    parser.add_argument("--playlist-size", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--video-size", type=int, default=8 * 1024 * 1024, help="Synthetic video size in bytes")
+    parser.add_argument("--audio-size", type=int, default=1024 * 1024, help="Synthetic audio size in bytes")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Added latency per HTTP request")
+    parser.add_argument("--rate", type=int, default=0, help="Per-connection rate limit in bytes/s (0 = unlimited)")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="Connections per video stream for segmented downloading (1 = off)")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads",
+                        help="Download engine to benchmark (asyncio runs merge/transcode outside the timed phases)")
+    parser.add_argument("--scenario", choices=("single", "playlist", "all"), default="all")
+    parser.add_argument("--audio", action="store_true", help="Benchmark MP3 (audio) mode instead of video")
+    parser.add_argument("--outputs", type=parse_outputs,
+                        help="Produce several outputs per item from one download, e.g. 'mp4:1080p,mp3:320,mp3:128'")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+    if args.outputs and args.engine == "asyncio":
+        parser.error("--outputs is only supported by the threads engine")
+    # Her öğe birleştirme/dönüştürme adımında başarısız olur, ölçüm anlamsızlaşır
+    if not shutil.which("ffmpeg"):
+        parser.error("ffmpeg was not found on PATH; it is required to merge and convert the benchmark downloads")
+
+    work_dir = tempfile.mkdtemp(prefix="ytd-bench-media-")
+    media = MediaStore(args.video_size, args.audio_size, work_dir)
+    server = BenchServer(media, latency=args.latency_ms / 1000, rate=args.rate)
+    server.start()
+    extractors = build_extractors(server)
+
+    results = {
+        "version": git_version(),
+        "yt_dlp_version": load_yt_dlp().version.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "config": dict(vars(args), real_media=media.real_media),
+        "scenarios": {},
+    }
+
+    try:
+        if args.scenario in ("single", "all"):
+            results["scenarios"]["single"] = run_scenario(
+                "single", server, extractors, f"{server.base_url}/watch?v=single", False, 1, args.workers, not args.audio,
+                args.segments, engine=args.engine, outputs=args.outputs)
+        if args.scenario in ("playlist", "all"):
+            results["scenarios"]["playlist"] = run_scenario(
+                "playlist", server, extractors, f"{server.base_url}/playlist?n={args.playlist_size}", True,
+                args.playlist_size, args.workers, not args.audio, args.segments, engine=args.engine, outputs=args.outputs)
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(json.load(f), results), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
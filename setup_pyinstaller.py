@@ -143,18 +143,6 @@ def install_ffmpeg():
 ffmpeg_path = check_ffmpeg()
 
 # Gerekli paketlerin kontrolü
-try:
-    import ffmpeg
-    print("ffmpeg-python kütüphanesi mevcut.")
-except ImportError:
-    print("ffmpeg-python kütüphanesi kuruluyor...")
-    subprocess.run([sys.executable, "-m", "pip", "install", "ffmpeg-python"], check=True)
-    try:
-        import ffmpeg
-        print("ffmpeg-python kütüphanesi başarıyla kuruldu.")
-    except ImportError:
-        print("UYARI: ffmpeg-python kütüphanesi kurulamadı.")
-
 try:
     import PyQt6
     print("PyQt6 kütüphanesi mevcut.")
@@ -195,11 +183,26 @@ if ffmpeg_path and os.path.exists(ffmpeg_path):
 hidden_imports = [
     'PyQt6',
     'yt_dlp',
-    'ffmpeg',
-    'ffmpeg.audio',
-    'ffmpeg.video',
     'src.core.downloader',
+    'src.core.archive',
+    'src.core.cache',
+    'src.core.progress',
+    'src.core.events',
+    'src.core.media',
+    'src.core.postprocess',
+    'src.core.segmented',
+    'src.core.jobs',
+    'src.core.async_engine',
+    'src.core.bandwidth',
+    'src.core.cancel',
+    'src.core.metrics',
+    'src.core.retry',
+    'src.core.tracker',
+    'src.core.preflight',
+    'src.core.store',
     'src.ui.main_window',
+    'src.ui.qt_signals',
+    'src.ui.queue_model',
 ]
 
 # Veri dosyalarını hazırla
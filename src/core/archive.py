@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+import subprocess
+from urllib.parse import urlparse, parse_qs
+
+ARCHIVE_FILENAME = ".ytdownloader-archive.sqlite3"
+MEDIA_EXTENSIONS = ("mp4", "mp3")
+AUDIO_QUALITIES = ("320 kbps", "256 kbps", "192 kbps", "128 kbps", "96 kbps")
+
+_extractor_classes = None  # extractor_classes() ilk çağrıda doldurur
+
+
+def make_archive_key(extractor, video_id):
+    """Arşivde kullanılan (çıkarıcı, video kimliği) anahtarını üretir"""
+    return (extractor or "").lower(), str(video_id)
+
+
+def archive_key_from_entry(entry):
+    """Düz liste öğesinden veya çözülmüş bilgiden ağ isteği olmadan anahtar üretir"""
+    video_id = entry.get('id')
+    extractor = entry.get('ie_key') or entry.get('extractor_key') or entry.get('extractor')
+    if not video_id or not extractor:
+        return None
+    return make_archive_key(extractor, video_id)
+
+
+def extractor_classes():
+    """Generic dışındaki çıkarıcı sınıfları; YouTube çıkarıcıları (kendi sıralarıyla) önde"""
+    global _extractor_classes
+    if _extractor_classes is None:
+        from .downloader import load_yt_dlp
+
+        classes = [ie for ie in load_yt_dlp().extractor.gen_extractor_classes() if ie.ie_key() != 'Generic']
+        # Adreslerin çoğu YouTube'dur; 1700'den fazla çıkarıcının hepsi denenmeden bulunur
+        youtube = [ie for ie in classes if ie.ie_key().startswith('Youtube')]
+        _extractor_classes = youtube + [ie for ie in classes if not ie.ie_key().startswith('Youtube')]
+    return _extractor_classes
+
+
+def archive_key_from_url(url, noplaylist=False):
+    """
+    URL'den, sayfayı indirmeden çıkarıcı ve video kimliğini bulur.
+    noplaylist: liste parametresi taşıyan video adresi (watch?v=ID&list=PL..., youtu.be/ID?list=PL...)
+    yt-dlp'de olduğu gibi listenin değil videonun anahtarını verir.
+    """
+    for ie in extractor_classes():
+        if not ie.suitable(url):
+            continue
+        temp_id = ie.get_temp_id(url)
+        if noplaylist and ie.ie_key() in ('YoutubeTab', 'YoutubeYtBe'):
+            video_id = parse_qs(urlparse(url).query).get('v', [None])[0] if ie.ie_key() == 'YoutubeTab' else temp_id
+            if video_id:
+                return make_archive_key('Youtube', video_id)
+        if temp_id:
+            return make_archive_key(ie.ie_key(), temp_id)
+        return None
+    return None
+
+
+class DownloadArchive:
+    """İndirilen öğeleri (çıkarıcı, kimlik, mod, kalite) anahtarıyla tutan SQLite dizini"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, ARCHIVE_FILENAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            "extractor TEXT NOT NULL, video_id TEXT NOT NULL, mode TEXT NOT NULL, "
+            "quality TEXT NOT NULL, filepath TEXT, downloaded_at REAL, "
+            "PRIMARY KEY (extractor, video_id, mode, quality))"
+        )
+        self.connection.commit()
+
+    def lookup(self, key, mode, quality):
+        """Kayıt varsa dosya yolunu, yoksa None döndürür"""
+        if key is None:
+            return None
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT filepath FROM downloads WHERE extractor=? AND video_id=? AND mode=? AND quality=?",
+                (key[0], key[1], mode, quality)
+            ).fetchone()
+        if row is None:
+            return None
+        # Dosya silinmişse kayıt geçersizdir
+        if row[0] and not os.path.exists(row[0]):
+            return None
+        return row[0] or ""
+
+    def add(self, key, mode, quality, filepath):
+        """Tamamlanan indirmeyi arşive ekler"""
+        if key is None:
+            return
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?)",
+                (key[0], key[1], mode, quality, filepath, time.time())
+            )
+            self.connection.commit()
+
+    def rebuild(self):
+        """Arşivi indirme klasöründeki dosyaların gömülü kaynak URL'lerinden yeniden oluşturur"""
+        records = []
+        for name in os.listdir(self.directory):
+            ext = name.rsplit('.', 1)[-1].lower()
+            if ext not in MEDIA_EXTENSIONS:
+                continue
+            filepath = os.path.join(self.directory, name)
+            record = self._probe_file(filepath, ext)
+            if record is not None:
+                records.append(record)
+
+        with self.lock:
+            self.connection.execute("DELETE FROM downloads")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?)", records
+            )
+            self.connection.commit()
+        return len(records)
+
+    def _probe_file(self, filepath, ext):
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', filepath],
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                return None
+            probe = json.loads(result.stdout)
+        except (OSError, ValueError) as e:
+            print(f"Archive probe error: {e}")
+            return None
+
+        tags = {k.lower(): v for k, v in probe.get('format', {}).get('tags', {}).items()}
+        source_url = tags.get('comment', '')
+        if not source_url.startswith('http'):
+            return None
+        key = archive_key_from_url(source_url, noplaylist=True)
+        if key is None:
+            return None
+
+        if ext == "mp3":
+            mode = "audio"
+            bitrate = int(probe.get('format', {}).get('bit_rate', 0) or 0) // 1000
+            quality = min(AUDIO_QUALITIES, key=lambda q: abs(int(q.split()[0]) - bitrate))
+        else:
+            mode = "video"
+            heights = [s.get('height', 0) for s in probe.get('streams', []) if s.get('codec_type') == 'video']
+            quality = f"{max(heights)}p" if heights else "Best Quality"
+
+        return (key[0], key[1], mode, quality, filepath, os.path.getmtime(filepath))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+if __name__ == "__main__":
+    # Kullanım: python -m src.core.archive rebuild <indirme klasörü>
+    if len(sys.argv) != 3 or sys.argv[1] != "rebuild":
+        print("Usage: python -m src.core.archive rebuild <download_directory>")
+        sys.exit(2)
+    archive = DownloadArchive(sys.argv[2])
+    count = archive.rebuild()
+    archive.close()
+    print(f"Archive rebuilt: {count} files indexed")
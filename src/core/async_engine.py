@@ -0,0 +1,334 @@
+import os
+import asyncio
+import itertools
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from .archive import archive_key_from_entry, archive_key_from_url
+from .media import merge_audio_video_async, convert_to_mp3_async
+from .postprocess import default_postprocess_workers
+from .bandwidth import PRIORITY_NORMAL, PRIORITIES
+from .cancel import DownloadCancelled, remove_files
+
+
+class AsyncDownloader:
+    """
+    YouTubeDownloader için tek olay döngüsünde çok sayıda işi yöneten asyncio motoru.
+    yt-dlp çağrıları sınırlı bir iş parçacığı havuzunda, ffmpeg ise doğrudan alt süreç olarak çalışır.
+    Sırada bekleyen öğeler iş parçacığı tutmaz; ağ ve işlemci sınırları semaforlarla uygulanır.
+    """
+
+    def __init__(self, downloader, network_limit=None, cpu_limit=None):
+        self.downloader = downloader
+        self.network_limit = network_limit or downloader.max_workers
+        self.cpu_limit = cpu_limit or default_postprocess_workers()
+        # Her öğe görüntü ve ses akışını aynı anda indirir ve her öncelik sınıfının kendi ağ yuvaları var;
+        # havuzun iş parçacıkları ihtiyaç oldukça açılır
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.network_limit * 2 * len(PRIORITIES) + 1, thread_name_prefix="async-ydl"
+        )
+        # Semaforlar oluşturuldukları olay döngüsüne bağlanır; motor birden çok asyncio.run çağrısında
+        # kullanılabilsin diye yeni döngüde semaforlar yeniden oluşturulur
+        self.slots_loop = None
+        self.slots = None  # {'cpu': semafor, 'network': {öncelik: semafor}}
+        self.active = 0
+        self.tasks = set()
+        self.job_ids = itertools.count(1)  # Her download çağrısı hız zamanlayıcısında ayrı bir iştir
+
+    def loop_slots(self):
+        """Çalışan olay döngüsünün semaforlarını döndürür (ilk ihtiyaçta oluşturur)"""
+        loop = asyncio.get_running_loop()
+        if self.slots_loop is not loop:
+            self.slots_loop = loop
+            self.slots = {'cpu': asyncio.Semaphore(self.cpu_limit), 'network': {}}
+        return self.slots
+
+    def network_slot(self, priority):
+        """
+        Öncelik sınıfının ağ semaforunu döndürür; arka plan listesi etkileşimli indirmenin yuvasını tutmasın.
+        Hız önceliğini bant genişliği zamanlayıcısı uygular.
+        """
+        network = self.loop_slots()['network']
+        if priority not in network:
+            network[priority] = asyncio.Semaphore(self.network_limit)
+        return network[priority]
+
+    def cpu_slot(self):
+        return self.loop_slots()['cpu']
+
+    async def _call(self, func, *args):
+        """Bloklayan yt-dlp çağrısını iş parçacığı havuzunda çalıştırır"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _begin(self):
+        if self.active == 0:
+            if self.downloader.is_downloading:
+                return False
+            self.downloader.begin_session()
+            self.downloader.progress.start()
+            # stop_download başka iş parçacığından çağrılsa da görevler olay döngüsünde iptal edilir
+            loop = asyncio.get_running_loop()
+            self.downloader.cancel_token.register(lambda: loop.call_soon_threadsafe(self.cancel_tasks))
+        self.active += 1
+        return True
+
+    def _end(self):
+        self.active -= 1
+        if self.active == 0:
+            self.downloader.progress.stop()
+            self.downloader.end_session()
+
+    def stop(self):
+        """Tüm işleri iptal eder; açık bağlantılar kesilir, çalışan ffmpeg süreçleri sonlandırılır"""
+        self.downloader.stop_download()
+        self.cancel_tasks()
+
+    def cancel_tasks(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+    async def download_many(self, requests):
+        """(url, is_video, quality, is_playlist[, priority]) listesini aynı sınırlar içinde birlikte indirir"""
+        results = await asyncio.gather(*(self.download(*request) for request in requests))
+        return [path for paths in results for path in paths]
+
+    async def download(self, url, is_video=True, quality="Best Quality", is_playlist=False, priority=None):
+        """URL'yi indirir ve oluşan dosyaların yollarını döndürür"""
+        if not self._begin():
+            self.downloader.signals.status.emit("Download already in progress")
+            return []
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        job_key = f"async:{next(self.job_ids)}"
+        if priority is None:
+            priority = self.downloader.default_priority(is_playlist)
+        self.downloader.bandwidth.register(job_key, priority)
+        try:
+            if not is_playlist:
+                archived_path = await self._call(self.find_archived_url, url, is_video, quality)
+                if archived_path is not None:
+                    self.downloader.signals.status.emit("Already downloaded, skipping")
+                    return [archived_path]
+
+            self.downloader.signals.status.emit("Getting information...")
+            ydl, info = await self._call(self.open_info, url, is_playlist)
+            try:
+                if info is None:
+                    self.downloader.signals.error.emit("Could not retrieve video information. It might be private or deleted.")
+                    return []
+                if is_playlist and 'entries' in info:
+                    return await self.download_entries(
+                        info['entries'], info.get('playlist_count') or 0, is_video, quality, job_key, priority
+                    )
+                filepath = await self.download_item(info, is_video, quality, job_key, priority)
+                return [filepath] if filepath else []
+            finally:
+                ydl.close()
+        except (asyncio.CancelledError, DownloadCancelled):
+            self.downloader.signals.status.emit("Download cancelled")
+            return []
+        except Exception as e:
+            if self.downloader.cancel_token.cancelled:
+                self.downloader.signals.status.emit("Download cancelled")
+                return []
+            print(f"Download error: {e}")
+            traceback.print_exc()
+            self.downloader.signals.error.emit(str(e))
+            return []
+        finally:
+            self.downloader.bandwidth.unregister(job_key)
+            self.tasks.discard(task)
+            self._end()
+
+    def find_archived_url(self, url, is_video, quality):
+        if not self.downloader.use_archive:
+            return None
+        return self.downloader.find_in_archive(archive_key_from_url(url, noplaylist=True), is_video, quality)
+
+    def open_info(self, url, is_playlist):
+        """Bilgiyi önbellekten veya yt-dlp ile alır; liste öğeleri bu YoutubeDL örneğiyle sayfalanır"""
+        ydl = self.downloader.create_ydl(self.downloader.info_options(is_playlist))
+        info = self.downloader.get_cached_info(url, is_playlist)
+        if info is None:
+            info = self.downloader.extract_url_info(ydl, url, is_playlist)
+        return ydl, info
+
+    async def download_entries(self, entries, total_videos, is_video, quality, job_key, priority):
+        """Liste öğelerinin hepsini görev olarak başlatır; eş zamanlılığı semaforlar sınırlar"""
+        counts = {'completed': 0, 'in_flight': 0}
+        iterator = self.downloader.iter_playlist_entries(entries)
+        tasks = []
+        while self.downloader.is_downloading:
+            # Sayfalama ağ isteği yapabilir, döngüyü bloklamasın
+            entry = await self._call(next, iterator, None)
+            if entry is None:
+                break
+            tasks.append(asyncio.create_task(
+                self.download_entry(entry, is_video, quality, counts, total_videos, job_key, priority)
+            ))
+
+        try:
+            results = await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        paths = [path for path in results if path]
+
+        if not self.downloader.is_downloading:
+            self.downloader.signals.status.emit("Download cancelled")
+        elif not paths:
+            self.downloader.signals.status.emit("Playlist completed: no files downloaded")
+        return paths
+
+    async def download_entry(self, entry, is_video, quality, counts, total_videos, job_key, priority):
+        signals = self.downloader.signals
+        try:
+            archived_path = await self._call(
+                self.downloader.find_in_archive, archive_key_from_entry(entry), is_video, quality
+            )
+            if archived_path is not None:
+                signals.status.emit(f"Already downloaded: {entry.get('title', 'Unknown')}")
+                return None
+
+            async with self.network_slot(priority):
+                counts['in_flight'] += 1
+                signals.playlist_progress.emit(counts['completed'], counts['in_flight'], total_videos)
+                try:
+                    if not self.downloader.is_downloading:
+                        return None
+                    info = await self._call(self.downloader.resolve_entry, entry)
+                    if info is None:
+                        if self.downloader.skip_private:
+                            signals.status.emit(f"Skipped unavailable video: {entry.get('title', 'Unknown')}")
+                        return None
+                    finish = await self.download_streams(info, is_video, quality, job_key)
+                finally:
+                    counts['in_flight'] -= 1
+            # Ağ yuvası son işleme beklenmeden bir sonraki öğeye bırakılır
+            return await self.finish_item(finish, info, is_video, quality) if finish else None
+        except asyncio.CancelledError:
+            raise
+        except DownloadCancelled:
+            return None
+        except Exception as e:
+            print(f"Entry download error: {e}")
+            traceback.print_exc()
+            signals.error.emit(str(e))
+            return None
+        finally:
+            counts['completed'] += 1
+            signals.playlist_progress.emit(counts['completed'], counts['in_flight'], total_videos)
+
+    async def download_item(self, info, is_video, quality, job_key=None, priority=PRIORITY_NORMAL):
+        """Tek bir çözülmüş öğeyi indirir, son işler ve dosya yolunu döndürür"""
+        try:
+            async with self.network_slot(priority):
+                finish = await self.download_streams(info, is_video, quality, job_key)
+            if not finish:
+                return None
+            filepath = await self.finish_item(finish, info, is_video, quality)
+            if filepath:
+                self.downloader.signals.progress.emit(100)
+                self.downloader.signals.finished.emit(os.path.basename(filepath), filepath, "")
+            return filepath
+        except asyncio.CancelledError:
+            raise
+        except DownloadCancelled:
+            return None
+        except Exception as e:
+            print(f"Video download error: {e}")
+            traceback.print_exc()
+            self.downloader.signals.error.emit(str(e))
+            return None
+
+    async def download_streams(self, info, is_video, quality, job_key=None):
+        """
+        Akışları indirir; (hedef yol, son işleme eş yordamı fabrikası) döndürür.
+        Özel video atlandıysa veya iptal edildiyse None döndürür.
+        """
+        downloader = self.downloader
+        if 'private' in info.get('_type', '') or 'private' in info.get('availability', ''):
+            if downloader.skip_private:
+                return None
+
+        video_title = downloader.clean_filename(info.get('title', 'video'))
+        task_prefix = info.get('id', '') or video_title
+        source_url = info.get('webpage_url', '') or info.get('url', '')
+        output_template = os.path.join(downloader.download_directory, f"{video_title}.%(ext)s")
+
+        try:
+            if not is_video:
+                downloaded = await self._call(
+                    downloader.download_stream, downloader.audio_stream_options(output_template, task_prefix, job_key), info
+                )
+                if not downloaded:
+                    return None
+                source_path = downloader.downloaded_filepath(downloaded)
+                filepath = os.path.join(downloader.download_directory, f"{video_title}.mp3")
+                if source_path is None or not os.path.exists(source_path):
+                    raise Exception(f"Downloaded audio file not found for {video_title}")
+                return filepath, lambda: self.convert_audio(source_path, filepath, downloader.audio_bitrate(quality), source_url)
+
+            video_path = os.path.join(downloader.download_directory, f"{video_title}.mp4")
+            audio_path = os.path.join(downloader.download_directory, f"{video_title}.m4a")
+            video_opts, audio_opts = downloader.video_stream_options(quality, output_template, task_prefix, job_key)
+            try:
+                video_ok, audio_ok = await asyncio.gather(
+                    self._call(downloader.download_stream, video_opts, info),
+                    self._call(downloader.download_stream, audio_opts, info)
+                )
+                downloader.cancel_token.check()
+            except (asyncio.CancelledError, DownloadCancelled):
+                # Tamamlanan akış birleştirilmeyecek; yarım dosyaları indirme iş parçacıkları kendisi siler
+                remove_files([video_path, audio_path])
+                raise
+            if not video_ok or not audio_ok:
+                return None
+            return video_path, lambda: self.merge_streams(video_path, audio_path, source_url)
+        finally:
+            downloader.progress.remove_tasks([f"{task_prefix}:video", f"{task_prefix}:audio"])
+
+    async def finish_item(self, finish, info, is_video, quality):
+        """Son işlemeyi işlemci sınırı içinde çalıştırır ve dosyayı kaydeder"""
+        filepath, postprocess = finish
+        async with self.cpu_slot():
+            await postprocess()
+        self.downloader.downloaded_files.append(filepath)
+        if self.downloader.use_archive:
+            await self._call(
+                self.downloader.get_archive().add,
+                archive_key_from_entry(info), "video" if is_video else "audio", quality, filepath
+            )
+        return filepath
+
+    async def convert_audio(self, source_path, mp3_path, bitrate, source_url):
+        if source_path == mp3_path:
+            return
+        self.downloader.signals.status.emit(f"Converting to MP3: {os.path.basename(mp3_path)}")
+        try:
+            with self.downloader.metrics.timer('phase_seconds', {'phase': 'transcode'}, self.downloader.file_context(mp3_path)):
+                await convert_to_mp3_async(source_path, mp3_path, bitrate, metadata={'comment': source_url})
+        except asyncio.CancelledError:
+            remove_files([source_path, mp3_path])
+            raise
+        os.remove(source_path)
+
+    async def merge_streams(self, video_path, audio_path, source_url):
+        if not os.path.exists(video_path) or not os.path.exists(audio_path):
+            return
+        self.downloader.signals.status.emit("Merging files...")
+        merged_path = os.path.splitext(video_path)[0] + "_merged.mp4"
+        try:
+            with self.downloader.metrics.timer('phase_seconds', {'phase': 'merge'}, self.downloader.file_context(video_path)):
+                await merge_audio_video_async(video_path, audio_path, merged_path, metadata={'comment': source_url})
+        except asyncio.CancelledError:
+            remove_files([video_path, audio_path, merged_path])
+            raise
+        if os.path.exists(merged_path):
+            os.remove(video_path)
+            os.remove(audio_path)
+            os.rename(merged_path, video_path)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,159 @@
+import time
+import threading
+
+# Yüksek öncelikli işler, toplam sınır dolduğunda düşük öncelikli işlerden önce jeton alır
+PRIORITY_BACKGROUND = 0
+PRIORITY_NORMAL = 1
+PRIORITY_INTERACTIVE = 2
+PRIORITIES = (PRIORITY_BACKGROUND, PRIORITY_NORMAL, PRIORITY_INTERACTIVE)
+
+MIN_BURST = 64 * 1024
+WAIT_SLICE = 0.1  # Saniye; uzun beklemeler iptal kontrolü için dilimlenir
+
+
+class TokenBucket:
+    """Saniyede rate bayt dolan jeton kovası; rate 0 ise sınırsızdır"""
+
+    def __init__(self, rate=0):
+        self.rate = rate
+        self.tokens = self.capacity()
+        self.updated = time.monotonic()
+
+    def capacity(self):
+        # En fazla yaklaşık bir saniyelik trafik birikebilir
+        return max(self.rate, MIN_BURST)
+
+    def refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity(), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        self.refill()
+        self.rate = rate
+        self.tokens = min(self.tokens, self.capacity())
+
+    def take(self, amount):
+        """Jetonları düşer (borca girebilir); borç ödenene kadar beklenecek süreyi döndürür"""
+        if not self.rate:
+            return 0
+        self.refill()
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def wait_time(self):
+        """Kova borçtan çıkana kadar geçecek süre"""
+        if not self.rate:
+            return 0
+        self.refill()
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+
+class BandwidthScheduler:
+    """
+    Toplam ve iş başına hız sınırlarını jeton kovalarıyla uygular.
+    Toplam sınır dolduğunda bekleyenlerden en yüksek öncelikli olan önce geçer.
+    Sınırlar çalışma sırasında değiştirilebilir.
+    """
+
+    def __init__(self, limit=0, job_limit=0):
+        self.condition = threading.Condition()
+        self.total = TokenBucket(limit)
+        self.job_limit = job_limit  # Kendi sınırı verilmemiş işler için varsayılan
+        self.jobs = {}  # iş anahtarı -> [kova, öncelik, özel sınır]
+        self.waiting = {}  # öncelik -> bekleyen sayısı
+
+    def set_limit(self, limit):
+        """Toplam hız sınırını bayt/saniye olarak ayarlar (0 = sınırsız)"""
+        with self.condition:
+            self.total.set_rate(max(0, int(limit)))
+            self.condition.notify_all()
+
+    def set_job_limit(self, limit):
+        """Kendi sınırı olmayan her iş için hız sınırını ayarlar (0 = sınırsız)"""
+        with self.condition:
+            self.job_limit = max(0, int(limit))
+            for job in self.jobs.values():
+                if job[2] is None:
+                    job[0].set_rate(self.job_limit)
+
+    def register(self, key, priority=PRIORITY_NORMAL, limit=None):
+        with self.condition:
+            self.jobs[key] = [TokenBucket(self.job_limit if limit is None else limit), priority, limit]
+
+    def unregister(self, key):
+        with self.condition:
+            self.jobs.pop(key, None)
+            self.condition.notify_all()
+
+    def set_priority(self, key, priority):
+        with self.condition:
+            job = self._job(key)
+            job[1] = priority
+            self.condition.notify_all()
+
+    def set_rate(self, key, limit):
+        """Tek bir işin hız sınırını ayarlar; None varsayılan iş sınırına döndürür"""
+        with self.condition:
+            job = self._job(key)
+            job[2] = limit
+            job[0].set_rate(self.job_limit if limit is None else limit)
+
+    def _job(self, key):
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = [TokenBucket(self.job_limit), PRIORITY_NORMAL, None]
+        return job
+
+    def consume(self, key, amount, should_stop=None):
+        """
+        amount bayt için izin bekler. should_stop() doğru dönerse beklemeyi bırakır ve False döndürür.
+        """
+        if amount <= 0:
+            return True
+
+        with self.condition:
+            job = self._job(key)
+            delay = job[0].take(amount)
+        if not self._sleep(delay, should_stop):
+            return False
+
+        with self.condition:
+            if not self.total.rate:
+                return True
+            priority = self._job(key)[1]
+            self.waiting[priority] = self.waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    if should_stop is not None and should_stop():
+                        return False
+                    higher_waiting = any(count for p, count in self.waiting.items() if p > priority)
+                    wait = self.total.wait_time()
+                    if not higher_waiting and wait <= 0:
+                        break
+                    self.condition.wait(min(wait, WAIT_SLICE) if wait > 0 else WAIT_SLICE)
+                self.total.take(amount)
+                return True
+            finally:
+                self.waiting[priority] -= 1
+                self.condition.notify_all()
+
+    def _sleep(self, delay, should_stop):
+        deadline = time.monotonic() + delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if should_stop is not None and should_stop():
+                return False
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, WAIT_SLICE))
+
+
+def parse_rate(text):
+    """'500K', '2M' veya '1.5M' gibi hız değerini bayt/saniyeye çevirir"""
+    text = text.strip().upper().rstrip('/S').rstrip('B')
+    multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(float(text))
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".ytdownloader")
+CACHE_FILENAME = "metadata-cache.sqlite3"
+
+# Format seçimi ve indirme için gerekmeyen, yer kaplayan alanlar
+DROPPED_INFO_KEYS = (
+    'thumbnails', 'description', 'automatic_captions', 'subtitles', 'heatmap',
+    'chapters', 'comments', 'tags', 'categories', 'requested_formats',
+    'requested_downloads', 'requested_subtitles', 'requested_entries', 'entries',
+)
+FLAT_ENTRY_KEYS = ('_type', 'url', 'id', 'ie_key', 'title')
+TRACKING_PARAMS = ('si', 'feature', 'pp', 'ab_channel')
+
+
+def normalize_url(url):
+    """Aynı kaynağı gösteren URL'lerin aynı önbellek anahtarını üretmesini sağlar"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith('utm_')
+    )
+    netloc = parts.netloc.lower()
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    return urlunsplit((parts.scheme.lower() or 'https', netloc, parts.path.rstrip('/'), urlencode(query), ''))
+
+
+def trim_info(info):
+    """Bilgi sözlüğünden format seçimi için gereksiz alanları atar"""
+    trimmed = {k: v for k, v in info.items() if k not in DROPPED_INFO_KEYS and not k.startswith('__')}
+    if 'formats' in trimmed:
+        # Önizleme (storyboard) formatları hiçbir zaman indirilmez
+        trimmed['formats'] = [
+            f for f in trimmed['formats']
+            if f.get('ext') != 'mhtml' and f.get('format_note') != 'storyboard'
+        ]
+    return trimmed
+
+
+def trim_flat_entry(entry):
+    """Düz liste öğesinden yalnızca çözümleme için gerekli alanları tutar"""
+    if entry.get('_type', 'video') == 'video':
+        # Tam çözülmüş öğeler de sonradan yeniden çözülebilecek URL sonucuna indirgenir
+        return {
+            '_type': 'url',
+            'url': entry.get('webpage_url') or entry.get('url'),
+            'id': entry.get('id'),
+            'ie_key': entry.get('extractor_key'),
+            'title': entry.get('title'),
+        }
+    return {k: entry[k] for k in FLAT_ENTRY_KEYS if k in entry}
+
+
+class MetadataCache:
+    """extract_info sonuçları için süre sınırlı, LRU tahliyeli, diske yazılan önbellek"""
+
+    def __init__(self, directory=CACHE_DIRECTORY, ttl=3600, max_entries=500):
+        self.ttl = ttl  # Saniye; format URL'leri birkaç saat içinde geçersizleşir
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, CACHE_FILENAME)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, last_access REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS metadata_last_access ON metadata (last_access)")
+        self.connection.commit()
+
+    def get(self, key):
+        """Süresi dolmamış kaydı döndürür, yoksa None"""
+        now = time.time()
+        with self.lock:
+            item = self.memory.get(key)
+            if item is None:
+                row = self.connection.execute(
+                    "SELECT stored_at, data FROM metadata WHERE key=?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                item = (row[0], json.loads(row[1]))
+
+            stored_at, value = item
+            if now - stored_at > self.ttl:
+                self.memory.pop(key, None)
+                self.connection.execute("DELETE FROM metadata WHERE key=?", (key,))
+                self.connection.commit()
+                return None
+
+            self.memory[key] = item
+            self.memory.move_to_end(key)
+            self._trim_memory()
+            self.connection.execute("UPDATE metadata SET last_access=? WHERE key=?", (now, key))
+            self.connection.commit()
+            return value
+
+    def put(self, key, value):
+        """Kaydı bellek ve diske yazar, sınır aşılırsa en eski erişileni atar"""
+        now = time.time()
+        try:
+            data = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            print(f"Metadata cache serialization error: {e}")
+            return
+
+        with self.lock:
+            self.memory[key] = (now, value)
+            self.memory.move_to_end(key)
+            self._trim_memory()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)", (key, now, now, data)
+            )
+            self.connection.execute(
+                "DELETE FROM metadata WHERE key NOT IN "
+                "(SELECT key FROM metadata ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self.connection.commit()
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.connection.execute("DELETE FROM metadata")
+            self.connection.commit()
+
+    def _trim_memory(self):
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,135 @@
+import os
+import socket
+import itertools
+import threading
+import traceback
+from contextlib import contextmanager
+
+CANCEL_TIMEOUT = 0.5  # Saniye; iptal isteğinden sonra indirmenin durmuş olması beklenen süre
+SOCKET_ATTRIBUTES = ('fp', 'raw', '_fp', '_sock', 'sock', '_connection', 'connection')
+CANCELLED_ERROR = "Cancelled by user"  # İptal edilen iş ve öğelerin kuyrukta kaydedilen hata metni
+
+
+class DownloadCancelled(Exception):
+    """Kullanıcı indirmeyi durdurdu"""
+
+    def __init__(self, message="Download cancelled by user"):
+        super().__init__(message)
+
+
+class CancelToken:
+    """
+    Bir indirme oturumunun iptal isteğini iş parçacıkları arasında paylaşır.
+    Bloklayan işlemler (soket okuması, ffmpeg süreci) kapatma işlevlerini kaydeder;
+    iptal anında bu işlevler hemen çağrılır, böylece beklemeler kendi zaman aşımını beklemeden biter.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.callbacks = {}
+        self.ids = itertools.count()
+        self.parent = None  # (üst belirteç, kayıt) alt belirteçte
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def cancel(self):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks = list(self.callbacks.values())
+            self.callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback error: {e}")
+                traceback.print_exc()
+
+    def check(self):
+        """İptal istendiyse DownloadCancelled fırlatır"""
+        if self.event.is_set():
+            raise DownloadCancelled()
+
+    def wait(self, timeout=None):
+        """İptal istenene kadar en fazla timeout saniye bekler; iptal edildiyse True döndürür"""
+        return self.event.wait(timeout)
+
+    def register(self, callback):
+        """İptalde çağrılacak işlevi kaydeder; zaten iptal edildiyse hemen çağırır ve None döndürür"""
+        with self.lock:
+            if not self.event.is_set():
+                handle = next(self.ids)
+                self.callbacks[handle] = callback
+                return handle
+        callback()
+        return None
+
+    def unregister(self, handle):
+        if handle is None:
+            return
+        with self.lock:
+            self.callbacks.pop(handle, None)
+
+    def child(self):
+        """Bu belirteç iptal edilince kendisi de iptal edilen, tek başına da iptal edilebilen alt belirteç (örn. tek öğe)"""
+        token = CancelToken()
+        token.parent = (self, self.register(token.cancel))
+        return token
+
+    def release(self):
+        """Alt belirteci üst belirteçten ayırır; iş bittiğinde çağrılır, böylece kayıtlar birikmez"""
+        if self.parent is not None:
+            parent, handle = self.parent
+            parent.unregister(handle)
+            self.parent = None
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """Blok süresince iptalde callback çağrılır"""
+        handle = self.register(callback)
+        try:
+            yield
+        finally:
+            self.unregister(handle)
+
+
+def find_socket(obj, depth=6):
+    """HTTP yanıtı sarmalayıcılarının (yt-dlp, urllib3, http.client) altındaki soketi bulur"""
+    seen = set()
+    layer = [obj]
+    for _ in range(depth):
+        next_layer = []
+        for item in layer:
+            if isinstance(item, socket.socket):
+                return item
+            if item is None or id(item) in seen:
+                continue
+            seen.add(id(item))
+            next_layer.extend(getattr(item, name, None) for name in SOCKET_ATTRIBUTES)
+        layer = next_layer
+    return None
+
+
+def shutdown_socket(sock):
+    """Başka iş parçacığında okuma bekleyen soketi hemen uyandırır"""
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def remove_files(paths):
+    """İptal edilen indirmeden kalan geçici dosyaları siler"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not remove {path}: {e}")
@@ -0,0 +1,163 @@
+import os
+import sys
+import signal
+import argparse
+
+from .downloader import YouTubeDownloader
+from .bandwidth import parse_rate
+
+VIDEO_QUALITIES = ("Best Quality", "1080p", "720p", "480p", "360p", "240p")
+AUDIO_QUALITIES = ("320 kbps", "256 kbps", "192 kbps", "128 kbps", "96 kbps")
+
+
+def read_url_file(path):
+    """URL dosyasındaki boş olmayan ve yorum olmayan satırları döndürür"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def parse_outputs(text):
+    """'mp4:1080p,mp3:320,mp3:128' biçimindeki çıktı listesini (is_video, kalite) çiftlerine çevirir"""
+    outputs = []
+    for part in text.split(','):
+        container, _, quality = (value.strip() for value in part.partition(':'))
+        container = container.lower()
+        if container == "mp4":
+            quality = quality or VIDEO_QUALITIES[0]
+            qualities = {q.lower(): q for q in VIDEO_QUALITIES}
+            qualities["best"] = VIDEO_QUALITIES[0]
+        elif container == "mp3":
+            quality = quality or AUDIO_QUALITIES[2]
+            qualities = {q.lower(): q for q in AUDIO_QUALITIES}
+            qualities.update({q.split()[0]: q for q in AUDIO_QUALITIES})
+        else:
+            raise argparse.ArgumentTypeError(f"unknown output format '{container}' (use mp4 or mp3)")
+        if quality.lower() not in qualities:
+            raise argparse.ArgumentTypeError(f"unknown {container} quality '{quality}'")
+        output = (container == "mp4", qualities[quality.lower()])
+        if output not in outputs:
+            outputs.append(output)
+    return outputs
+
+
+def add_engine_arguments(parser):
+    """İndirme motorunun ayarlarını (klasör, hız, disk, arşiv, metrikler) ayrıştırıcıya ekler"""
+    parser.add_argument("-o", "--output", help="Download directory (default: ~/Downloads)")
+    parser.add_argument("-j", "--workers", type=int, help="Parallel playlist downloads")
+    parser.add_argument("-c", "--connections", type=int, help="Connections per large video stream (1 disables segmented downloading)")
+    parser.add_argument("-r", "--limit-rate", type=parse_rate, help="Maximum download speed, e.g. 500K or 2M (bytes per second)")
+    parser.add_argument("--min-free", type=parse_rate, metavar="SIZE",
+                        help="Disk space to keep free after each download's estimated size, e.g. 500M or 2G (default: 256M)")
+    parser.add_argument("--no-disk-check", action="store_true", help="Start downloads without checking free disk space")
+    parser.add_argument("--include-private", action="store_true", help="Fail on private videos instead of skipping them")
+    parser.add_argument("--no-archive", action="store_true", help="Download items even if they are in the archive")
+    parser.add_argument("--store", metavar="DIR",
+                        help="Shared content store: videos already in it are linked instead of downloaded again")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use cached video information")
+    parser.add_argument("--metrics", metavar="FILE", help="Write pipeline metrics in Prometheus text format after each download")
+    parser.add_argument("--metrics-log", metavar="FILE", help="Append every metric event to FILE as JSON lines")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core",
+        description="Download YouTube videos and audio without the graphical interface. "
+                    "Use 'python -m src.core serve' to run the local HTTP API."
+    )
+    parser.add_argument("urls", nargs="*", help="Video or playlist URLs")
+    parser.add_argument("-a", "--batch-file", help="File with one URL per line ('#' starts a comment)")
+    parser.add_argument("--audio", action="store_true", help="Download audio as MP3 instead of video")
+    parser.add_argument("-q", "--quality", help="Quality, e.g. 1080p or '192 kbps'")
+    parser.add_argument("-f", "--outputs", type=parse_outputs,
+                        help="Several outputs from one download, e.g. 'mp4:1080p,mp3:320,mp3:128' (overrides --audio/--quality)")
+    parser.add_argument("--playlist", action="store_true", help="Treat URLs as playlists")
+    parser.add_argument("--sync", action="store_true",
+                        help="Only download videos added to the playlist or channel since the last sync (implies --playlist)")
+    add_engine_arguments(parser)
+    parser.add_argument("--resume", action="store_true", help="First resume downloads left unfinished by a crash or reboot")
+    parser.add_argument("--rebuild-archive", action="store_true", help="Rebuild the download archive from files on disk and exit")
+    return parser
+
+
+def create_downloader(args):
+    """Komut satırı ayarlarıyla yapılandırılmış indirme motorunu döndürür"""
+    downloader = YouTubeDownloader()
+    if args.output:
+        downloader.set_download_directory(os.path.abspath(args.output))
+    if args.workers:
+        downloader.set_max_workers(args.workers)
+    if args.connections:
+        downloader.set_segment_connections(args.connections)
+    if args.limit_rate:
+        downloader.set_bandwidth_limit(args.limit_rate)
+    if args.min_free is not None:
+        downloader.set_min_free_space(args.min_free)
+    downloader.set_check_disk_space(not args.no_disk_check)
+    downloader.set_skip_private(not args.include_private)
+    downloader.set_use_archive(not args.no_archive)
+    downloader.set_use_metadata_cache(not args.no_cache)
+    if args.store:
+        downloader.set_content_store(os.path.abspath(args.store))
+    if args.metrics:
+        downloader.set_metrics_file(os.path.abspath(args.metrics))
+    if args.metrics_log:
+        downloader.set_metrics_log(os.path.abspath(args.metrics_log))
+    return downloader
+
+
+def main(argv=None):
+    """Arayüzsüz toplu indirme giriş noktası"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "serve":
+        # HTTP servisi yalnızca istendiğinde yüklenir
+        from .server import main as serve
+        return serve(argv[1:])
+    args = build_parser().parse_args(argv)
+    downloader = create_downloader(args)
+
+    errors = []
+    downloader.signals.status.connect(lambda text: print(text, file=sys.stderr))
+    downloader.signals.error.connect(lambda message: (errors.append(message), print(f"ERROR: {message}", file=sys.stderr)))
+    downloader.signals.finished.connect(lambda filename, filepath, thumbnail: print(filepath))
+    downloader.signals.playlist_progress.connect(
+        lambda completed, in_flight, total: print(f"Completed: {completed}/{total or '?'} ({in_flight} in progress)", file=sys.stderr)
+    )
+
+    if args.rebuild_archive:
+        downloader.rebuild_archive()
+        return 0
+
+    urls = list(args.urls)
+    if args.batch_file:
+        urls.extend(read_url_file(args.batch_file))
+    if not urls and not args.resume:
+        build_parser().error("no URLs given")
+
+    quality = args.quality or (AUDIO_QUALITIES[2] if args.audio else VIDEO_QUALITIES[0])
+    is_video = not args.audio
+    if args.outputs:
+        is_video, quality = args.outputs[0]
+
+    # Ctrl+C ile indirmeyi düzgün şekilde durdur
+    interrupted = []
+    def handle_interrupt(signum, frame):
+        interrupted.append(signum)
+        downloader.stop_download()
+    signal.signal(signal.SIGINT, handle_interrupt)
+
+    try:
+        if args.resume:
+            if not downloader.resume_jobs(block=True):
+                print("No unfinished downloads to resume", file=sys.stderr)
+
+        for url in urls:
+            if interrupted:
+                break
+            downloader.run_download(url, is_video, quality, args.playlist or args.sync, outputs=args.outputs, sync=args.sync)
+    finally:
+        downloader.set_metrics_log(None)
+
+    if interrupted:
+        return 130
+    return 1 if errors else 0
@@ -1,32 +1,55 @@
 import os
+import copy
+import glob
 import threading
 import traceback
-import urllib.request
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import subprocess
-from PyQt6.QtCore import pyqtSignal, QObject
 
-try:
-    import yt_dlp
-except ImportError as e:
-    print(f"Failed to import yt-dlp library: {e}")
-    print("Please install it with 'pip install yt-dlp'")
-    import sys
-    sys.exit(1)
+# yt-dlp yüzlerce çıkarıcı modülüyle birlikte yüklendiği için ilk ihtiyaçta içe aktarılır
+yt_dlp = None
+_yt_dlp_lock = threading.Lock()
 
-try:
-    import ffmpeg
-except ImportError as e:
-    print(f"Failed to import ffmpeg-python library: {e}")
-    print("Please install it with 'pip install ffmpeg-python'")
-    import sys
-    sys.exit(1)
+def load_yt_dlp():
+    """yt-dlp kütüphanesini ilk çağrıda yükler ve modülü döndürür"""
+    global yt_dlp
+    if yt_dlp is None:
+        with _yt_dlp_lock:
+            if yt_dlp is None:
+                try:
+                    import yt_dlp as module
+                except ImportError as e:
+                    raise ImportError(f"Failed to import yt-dlp library: {e}. Please install it with 'pip install yt-dlp'")
+                yt_dlp = module
+    return yt_dlp
+
+from .archive import DownloadArchive, archive_key_from_entry, archive_key_from_url
+from .cache import MetadataCache, normalize_url, trim_info, trim_flat_entry
+from .progress import ProgressAggregator
+from .events import DownloadSignals
+from .media import merge_audio_video, convert_to_mp3
+from .postprocess import PostProcessingPool
+from .jobs import JobQueue
+from .async_engine import AsyncDownloader
+from .bandwidth import BandwidthScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from .segmented import segmented_youtube_dl_class, DEFAULT_CONNECTIONS, DEFAULT_MIN_SIZE, READ_SIZE
+from .cancel import CancelToken, DownloadCancelled, CANCEL_TIMEOUT, CANCELLED_ERROR, remove_files
+from .metrics import Metrics, JsonLinesWriter
+from .retry import RetryPolicy, CircuitBreaker, classify_error, NETWORK, FORBIDDEN, RATE_LIMITED, UNAVAILABLE
+from .tracker import DownloadTracker
+from .store import ContentStore, link_file
+from .preflight import DiskBudget, PlaylistProjection, InsufficientDiskSpace, estimate_stream_size, estimate_mp3_size
+
+AUDIO_FORMAT = 'bestaudio/best'  # Ses modunda indirilen akış
 
-class DownloadSignals(QObject):
-    progress = pyqtSignal(float)
-    finished = pyqtSignal(str, str, str)
-    error = pyqtSignal(str)
-    status = pyqtSignal(str)
-    playlist_progress = pyqtSignal(int, int)
+# İptal edilen indirmede silinen yarım dosya uzantıları (yt-dlp .part, parçalı indirme durumu)
+PARTIAL_SUFFIXES = ("part", "part.segments", "part.segments.tmp", "ytdl")
+
+def default_worker_count():
+    """Oynatma listesi için varsayılan paralel indirme sayısını döndürür"""
+    # Öğe başına süre çoğunlukla ağ gecikmesine bağlı, bu yüzden çekirdek sayısının biraz üstü güvenli
+    return max(2, min(8, (os.cpu_count() or 1) + 2))
 
 class YouTubeDownloader:
     
@@ -36,8 +59,57 @@ class YouTubeDownloader:
         self.downloaded_files = []
         self.skip_private = True  # Özel videoları atlama seçeneği (varsayılan olarak aktif)
         self.is_downloading = False  # İndirme durumunu takip etmek için değişken
+        self.progress = ProgressAggregator(self.signals, self.format_size)  # İlerleme sinyallerini 10 Hz ile sınırlar
+        self.max_workers = default_worker_count()  # Aynı anda indirilecek liste öğesi sayısı
+        self.postprocessing = PostProcessingPool()  # Birleştirme ve dönüştürme işleri ağdan bağımsız yürür
+        self._resolver_local = threading.local()  # İşçi başına liste öğesi çözücü
+        self.use_archive = True  # Daha önce indirilenleri atlama seçeneği
+        self.archive = None
+        self.archive_lock = threading.Lock()
+        self.use_metadata_cache = True  # extract_info sonuçlarını önbellekten kullanma seçeneği
+        self.metadata_cache = None
+        self.segment_connections = DEFAULT_CONNECTIONS  # Büyük görüntü akışı başına bağlantı sayısı; 1 = kapalı
+        self.segment_min_size = DEFAULT_MIN_SIZE
+        self.jobs = None  # Kalıcı indirme kuyruğu, ilk ihtiyaçta açılır
+        self.current_job = None
+        self.dispatcher = None
+        self.dispatch_lock = threading.Lock()
+        self.async_engine = None
+        self.bandwidth = BandwidthScheduler()  # Toplam ve iş başına hız sınırları, çalışırken değiştirilebilir
+        self.cancel_token = CancelToken()  # Her indirme oturumunda yenilenir
+        self.idle = threading.Event()  # Oturum tamamen bittiğinde (iptal dahil) işaretlenir
+        self.idle.set()
+        self.metrics = Metrics()  # Aşama süreleri, aktarım hızları ve yeniden denemeler
+        self.metrics_file = None  # Her işten sonra Prometheus metin biçiminde yazılır
+        self.metrics_log = None  # Her ölçümün eklendiği JSON satırları dosyası
+        self.retry_policy = RetryPolicy()  # Geçici hatalarda akış kaldığı yerden yeniden denenir
+        self.circuit = CircuitBreaker()  # Sunucu hız sınırlarsa tüm indirmeler bir süre bekler
+        self.tracker = DownloadTracker()  # İndirme listesinin iş ve öğe satırları
+        self.item_tokens = {}  # (iş, öğe) -> öğenin alt iptal belirteci
+        self.cancelled_items = set()  # Listeden iptal edilen (iş, öğe) anahtarları
+        self.cancelled_jobs = set()  # Listeden iptal edilen işler; kuyruk durmadan sıradakine geçer
+        self.items_lock = threading.Lock()
+        self.check_disk_space = True  # İndirmeden önce tahmini boyut için boş alan kontrolü
+        self.disk_budget = DiskBudget()  # Eşzamanlı öğelerin ayırdığı disk alanı
+        self.disk_reservations = {}  # öğe belirteci -> disk ayırma kaydı
+        self.disk_error = None  # Yer kalmadığında listenin kalanı başlatılmaz
+        self.job_error = None  # Başarısız işin kuyruğa kaydedilecek hata özeti
+        self.playlist_projection = None
+        self.format_ydl = None  # Boyut tahmininde biçim seçimi için
+        self.content_store = None  # Klasörler arasında paylaşılan içerik deposu (None = kapalı)
         os.makedirs(self.download_directory, exist_ok=True)
     
+    def warm_up(self, callback=None):
+        """yt-dlp'yi arka planda yükler, böylece ilk indirme beklemez"""
+        def run():
+            try:
+                load_yt_dlp()
+            except ImportError as e:
+                print(e)
+            if callback is not None:
+                callback()
+        threading.Thread(target=run, daemon=True).start()
+    
     def set_download_directory(self, directory):
         self.download_directory = directory
         os.makedirs(self.download_directory, exist_ok=True)
@@ -46,92 +118,793 @@ class YouTubeDownloader:
         """Özel videoları atlama seçeneğini ayarlar"""
         self.skip_private = skip
     
-    def stop_download(self):
-        """İndirme işlemini durdurur"""
+    def set_use_archive(self, use):
+        """İndirme arşivinin kullanılıp kullanılmayacağını ayarlar"""
+        self.use_archive = use
+    
+    def get_archive(self):
+        """Geçerli indirme klasörünün arşivini açar (klasör değiştiyse yeniden açar)"""
+        with self.archive_lock:
+            if self.archive is None or self.archive.directory != self.download_directory:
+                if self.archive is not None:
+                    self.archive.close()
+                self.archive = DownloadArchive(self.download_directory)
+            return self.archive
+    
+    def find_in_archive(self, key, is_video, quality):
+        """Öğe bu mod ve kalitede indirildiyse dosya yolunu döndürür"""
+        if not self.use_archive or key is None:
+            return None
+        return self.get_archive().lookup(key, "video" if is_video else "audio", quality)
+    
+    def find_outputs_in_archive(self, key, outputs):
+        """Tüm çıktılar arşivdeyse dosya yollarını, herhangi biri eksikse None döndürür"""
+        paths = [self.find_in_archive(key, is_video, quality) for is_video, quality in outputs]
+        return None if None in paths else paths
+    
+    def set_content_store(self, directory):
+        """İçerik deposunu açar (None verilirse kapatır); depodaki videolar yeniden indirilmez, bağlanır"""
+        with self.archive_lock:
+            if self.content_store is not None:
+                self.content_store.close()
+                self.content_store = None
+            if directory:
+                self.content_store = ContentStore(directory)
+    
+    def link_from_store(self, info, outputs, paths=None):
+        """
+        Tüm çıktılar içerik deposundaysa indirmeden indirme klasörüne bağlar ve dosya yollarını döndürür;
+        herhangi biri eksikse None döndürür.
+        """
+        store = self.content_store
+        key = archive_key_from_entry(info)
+        if store is None or key is None or not info.get('title'):
+            return None
+        objects = [store.lookup(key, "video" if is_video else "audio", quality) for is_video, quality in outputs]
+        if None in objects:
+            return None
+        
+        video_title = self.clean_filename(info['title'])
+        linked = []
+        for (is_video, quality), object_path, path in zip(outputs, objects, paths or self.output_paths(video_title, outputs)):
+            # Aynı başlıklı başka bir videonun dosyası üzerine yazılmaz
+            if os.path.exists(path) and not os.path.samefile(path, object_path):
+                base, ext = os.path.splitext(path)
+                path = f"{base} [{key[1]}]{ext}"
+            method = link_file(object_path, path)
+            self.metrics.increment('store_links_total', labels={'method': method}, context={'job': self.current_job})
+            self.record_download(path, info, is_video, quality, store=False)
+            linked.append(path)
+        self.signals.status.emit(f"Linked from store: {info['title']}")
+        self.set_item_state(info, "done", partial_files=[])
+        return linked
+    
+    def rebuild_archive(self):
+        """Arşivi indirme klasöründeki dosyalardan yeniden oluşturur"""
+        self.signals.status.emit("Rebuilding download archive...")
+        count = self.get_archive().rebuild()
+        self.signals.status.emit(f"Archive rebuilt: {count} files indexed")
+        return count
+    
+    def set_use_metadata_cache(self, use):
+        """Bilgi önbelleğinin kullanılıp kullanılmayacağını ayarlar"""
+        self.use_metadata_cache = use
+    
+    def get_metadata_cache(self):
+        """Bilgi önbelleğini ilk ihtiyaçta açar"""
+        with self.archive_lock:
+            if self.metadata_cache is None:
+                self.metadata_cache = MetadataCache()
+            return self.metadata_cache
+    
+    def get_job_queue(self):
+        """Kalıcı iş kuyruğunu ilk ihtiyaçta açar"""
+        with self.archive_lock:
+            if self.jobs is None:
+                self.jobs = JobQueue()
+            return self.jobs
+    
+    def job_item_key(self, entry):
+        """İş içindeki öğeyi, çözülmeden önce ve sonra aynı olan bir anahtarla tanımlar"""
+        key = archive_key_from_entry(entry)
+        if key is not None:
+            return f"{key[0]}:{key[1]}"
+        return entry.get('webpage_url') or entry.get('url')
+    
+    def set_job_state(self, state, error=None):
+        if self.current_job is not None:
+            self.get_job_queue().set_state(self.current_job, state, error)
+            self.tracker.job_state(self.current_job, state, error)
+    
+    def set_item_state(self, entry, state, partial_files=None, error=None):
+        if self.current_job is not None:
+            item_key = self.job_item_key(entry)
+            self.get_job_queue().set_item_state(
+                self.current_job, item_key, state,
+                title=entry.get('title'), partial_files=partial_files, error=error
+            )
+            self.tracker.item_state(self.current_job, item_key, state, title=entry.get('title'), error=error)
+    
+    def metadata_cache_key(self, url, is_playlist):
+        return ("playlist:" if is_playlist else "single:") + normalize_url(url)
+    
+    def get_cached_info(self, url, is_playlist):
+        """Önbellekte geçerli bilgi varsa döndürür"""
+        if not self.use_metadata_cache or not url:
+            return None
+        return self.get_metadata_cache().get(self.metadata_cache_key(url, is_playlist))
+    
+    def store_cached_info(self, url, info):
+        """Çözülmüş tek video bilgisini kırpılmış olarak önbelleğe yazar"""
+        if not self.use_metadata_cache or not url or info is None:
+            return
+        self.get_metadata_cache().put(self.metadata_cache_key(url, False), trim_info(load_yt_dlp().YoutubeDL.sanitize_info(info)))
+    
+    def record_playlist_entries(self, url, info, entries):
+        """Liste öğelerini geçirirken kaydeder, liste sonuna kadar okunursa önbelleğe yazar"""
+        recorded = []
+        for entry in entries:
+            recorded.append(trim_flat_entry(entry))
+            yield entry
+        
+        if self.use_metadata_cache:
+            self.get_metadata_cache().put(self.metadata_cache_key(url, True), {
+                '_type': 'playlist',
+                'title': info.get('title'),
+                'playlist_count': len(recorded),
+                'entries': recorded
+            })
+    
+    def set_max_workers(self, count):
+        """Oynatma listesinde aynı anda indirilecek öğe sayısını ayarlar"""
+        self.max_workers = max(1, int(count))
+    
+    def set_segment_connections(self, count):
+        """Büyük görüntü akışları için paralel bağlantı sayısını ayarlar (1 = parçalı indirme kapalı)"""
+        self.segment_connections = max(1, int(count))
+    
+    def segmented_download_options(self):
+        """Parçalı indirme için ydl_opts değerini döndürür, kapalıysa None"""
+        if self.segment_connections <= 1:
+            return None
+        return {'connections': self.segment_connections, 'min_size': self.segment_min_size}
+    
+    def set_bandwidth_limit(self, limit):
+        """Tüm indirmelerin toplam hız sınırını bayt/saniye olarak ayarlar (0 = sınırsız)"""
+        self.bandwidth.set_limit(limit)
+    
+    def set_job_bandwidth_limit(self, limit):
+        """Her indirme işinin hız sınırını bayt/saniye olarak ayarlar (0 = sınırsız)"""
+        self.bandwidth.set_job_limit(limit)
+    
+    def default_priority(self, is_playlist):
+        """Tek videolar kullanıcı beklediği için arka plandaki listelerin önüne geçer"""
+        return PRIORITY_BACKGROUND if is_playlist else PRIORITY_INTERACTIVE
+    
+    def bandwidth_key(self):
+        return f"job:{self.current_job}" if self.current_job is not None else "default"
+    
+    def make_throttle(self, job_key=None, cancel=None):
+        """İndirilen baytları hız zamanlayıcısına bildiren, sınır aşılırsa bekleten işlev üretir"""
+        job_key = job_key or self.bandwidth_key()
+        cancel = cancel or self.cancel_token
+        def throttle(amount):
+            if not self.bandwidth.consume(job_key, amount, lambda: cancel.cancelled):
+                raise DownloadCancelled()
+        return throttle
+    
+    def set_check_disk_space(self, check):
+        """İndirmeden önce boş disk alanı kontrolünü açar veya kapatır"""
+        self.check_disk_space = check
+    
+    def set_min_free_space(self, size):
+        """Tahmini boyut ayrıldıktan sonra diskte boş kalması gereken alan (bayt)"""
+        self.disk_budget.set_min_free(size)
+    
+    def set_metrics_file(self, path):
+        """Ölçüm toplamlarının her işten sonra yazılacağı Prometheus metin dosyasını ayarlar (None = kapalı)"""
+        self.metrics_file = path
+    
+    def set_metrics_log(self, path):
+        """Her ölçümün JSON satırı olarak ekleneceği dosyayı ayarlar (None = kapalı)"""
+        if self.metrics_log is not None:
+            self.metrics.recorded.disconnect(self.metrics_log)
+            self.metrics_log.close()
+            self.metrics_log = None
+        if path:
+            self.metrics_log = JsonLinesWriter(path)
+            self.metrics.recorded.connect(self.metrics_log)
+    
+    def write_metrics(self):
+        if self.metrics_file is None:
+            return
+        try:
+            self.metrics.write_prometheus(self.metrics_file)
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
+    
+    def retry_delay(self, kind, cancel, n):
+        """
+        yt-dlp'nin bilgi çıkarma yeniden denemelerinde çağrılır; denemeyi sayar ve bekler.
+        yt-dlp'nin beklemesi kesilemediği için burada iptal edilebilir şekilde beklenir ve 0 döndürülür.
+        """
+        self.metrics.increment('retries_total', labels={'kind': kind}, context={'job': self.current_job})
+        if cancel.wait(self.retry_policy.delay(n + 1, NETWORK)):
+            raise DownloadCancelled()
+        return 0
+    
+    def begin_session(self):
+        """Yeni indirme oturumu başlatır; önceki oturumun iptali bu oturumu etkilemez"""
+        self.cancel_token = CancelToken()
+        self.disk_error = None
+        self.job_error = None
+        self.idle.clear()
+        self.is_downloading = True
+    
+    def end_session(self):
+        self.is_downloading = False
+        self.idle.set()
+    
+    def stop_download(self, wait=False):
+        """
+        İndirme işlemini durdurur: açık bağlantılar kesilir, ffmpeg süreçleri öldürülür, yarım dosyalar silinir.
+        wait ise oturumun bitmesini en fazla CANCEL_TIMEOUT saniye bekler ve bitip bitmediğini döndürür.
+        """
         if self.is_downloading:
             self.is_downloading = False
+            self.cancel_token.cancel()
             self.signals.status.emit("Download cancelled by user")
+        if wait:
+            return self.idle.wait(CANCEL_TIMEOUT)
+        return self.idle.is_set()
+    
+    def cancel_row(self, key):
+        """
+        İndirme listesindeki tek bir satırı iptal eder: bekleyen iş kuyruktan çıkar, çalışan iş veya öğe durdurulur.
+        Diğer işler ve listenin diğer öğeleri devam eder.
+        """
+        if key[0] == "job":
+            job_id = key[1]
+            if job_id == self.current_job:
+                self.cancelled_jobs.add(job_id)
+                self.stop_download()
+            elif self.get_job_queue().cancel(job_id):
+                self.tracker.job_state(job_id, "failed", CANCELLED_ERROR)
+            return
+        
+        _, job_id, item_key = key
+        if job_id != self.current_job:
+            return
+        with self.items_lock:
+            self.cancelled_items.add((job_id, item_key))
+            token = self.item_tokens.get((job_id, item_key))
+        if token is not None:
+            token.cancel()
+    
+    def move_job(self, job_id, offset):
+        """Bekleyen işi kuyrukta öne (-1) veya geriye (1) taşır; yer değiştirdiği işin kimliğini döndürür"""
+        return self.get_job_queue().move(job_id, offset)
+    
+    def begin_item(self, entry):
+        """Öğeye oturum belirtecinin alt belirtecini verir; öğe listeden tek başına iptal edilebilir"""
+        key = (self.current_job, self.job_item_key(entry))
+        token = self.cancel_token.child()
+        with self.items_lock:
+            self.item_tokens[key] = token
+            cancelled = key in self.cancelled_items
+        if cancelled:
+            token.cancel()
+        return token
+    
+    def end_item(self, token):
+        """Öğenin alt belirtecini ve ayırdığı disk alanını bırakır (öğe son işleme dahil bittiğinde)"""
+        # Son işleme iş bittikten sonra da sürebilir; anahtar geçerli işten değil belirteçten bulunur
+        with self.items_lock:
+            for key, item_token in list(self.item_tokens.items()):
+                if item_token is token:
+                    del self.item_tokens[key]
+            reservation = self.disk_reservations.pop(token, None)
+        self.disk_budget.release(reservation)
+        token.release()
+    
+    def item_cancelled(self, entry):
+        with self.items_lock:
+            return (self.current_job, self.job_item_key(entry)) in self.cancelled_items
     
-    def start_download(self, url, is_video, quality, is_playlist=False):
-        # Aktif indirme varsa iptal et
+    def start_download(self, url, is_video, quality, is_playlist=False, priority=None, outputs=None, sync=False,
+                       directory=None):
+        """
+        İndirmeyi kalıcı kuyruğa ekler ve işin kimliğini döndürür; aktif indirme varsa ondan sonra başlar.
+        outputs verilirse (örn. [(True, "1080p"), (False, "320 kbps")]) kaynak bir kez indirilip tüm çıktılar üretilir.
+        sync verilirse listenin yalnızca son eşitlemeden sonra eklenen öğeleri indirilir.
+        directory verilmezse iş geçerli indirme klasörüne iner.
+        """
+        if priority is None:
+            priority = self.default_priority(is_playlist)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        jobs = self.get_job_queue()
+        job_id = jobs.add(url, is_video, quality, is_playlist, directory or self.download_directory, priority, outputs, sync)
+        self.tracker.add_job(jobs.get(job_id))
+        if self.is_downloading:
+            self.signals.status.emit("Added to download queue")
+        self.start_dispatcher()
+        return job_id
+    
+    def run_download(self, url, is_video, quality, is_playlist=False, priority=None, outputs=None, sync=False):
+        """İndirmeyi çağıran iş parçacığında çalıştırır (arayüzsüz kullanım için)"""
         if self.is_downloading:
             self.signals.status.emit("Download already in progress")
             return
-            
-        self.is_downloading = True
-        threading.Thread(
-            target=self.download_thread,
-            args=(url, is_video, quality, is_playlist),
-            daemon=True
-        ).start()
+        
+        if priority is None:
+            priority = self.default_priority(is_playlist)
+        jobs = self.get_job_queue()
+        # İş eklenirken bu sürece bağlanır, aynı kuyruğu kullanan başka bir sürecin işleyicisi onu almaz
+        job = jobs.get(jobs.add(url, is_video, quality, is_playlist, self.download_directory, priority, outputs, sync, claim=True))
+        self.tracker.add_job(job)
+        return self.run_job(job)
+    
+    def get_async_engine(self):
+        """asyncio motorunu ilk ihtiyaçta oluşturur"""
+        if self.async_engine is None:
+            self.async_engine = AsyncDownloader(self)
+        return self.async_engine
+    
+    async def download_async(self, url, is_video, quality, is_playlist=False, priority=None):
+        """run_download'ın asyncio karşılığı; indirilen dosyaların yollarını döndürür"""
+        return await self.get_async_engine().download(url, is_video, quality, is_playlist, priority)
+    
+    def resume_jobs(self, block=False):
+        """Önceki çalışmadan kalan işleri yeniden başlatır, bekleyen iş sayısını döndürür"""
+        pending = self.get_job_queue().recover()
+        for job in self.get_job_queue().queued_jobs():
+            self.tracker.add_job(job)
+        if pending:
+            self.signals.status.emit(f"Resuming {pending} unfinished download(s)")
+            if block:
+                self.run_jobs()
+            else:
+                self.start_dispatcher()
+        return pending
     
-    def download_thread(self, url, is_video, quality, is_playlist=False):
+    def start_dispatcher(self):
+        """Kuyruk işleyicisi çalışmıyorsa başlatır"""
+        with self.dispatch_lock:
+            if self.dispatcher is not None:
+                return
+            self.dispatcher = threading.Thread(target=self.run_jobs, daemon=True)
+            self.dispatcher.start()
+    
+    def run_jobs(self):
+        """Kuyruktaki işleri sırayla çalıştırır; kullanıcı durdurursa kalanlar kuyrukta bekler"""
+        while True:
+            with self.dispatch_lock:
+                # Kuyruk dosyası süreçler arasında paylaşılır; iş tek adımda alınır, iki süreç aynı işi çalıştırmaz
+                job = self.get_job_queue().claim_next()
+                if job is None:
+                    # Kuyruğun boş görüldüğü kilit içinde bırakılır; bundan sonra eklenen iş yeni işleyici başlatır
+                    self.release_dispatcher()
+                    return
+            try:
+                state = self.run_job(job)
+            except BaseException:
+                with self.dispatch_lock:
+                    self.release_dispatcher()
+                raise
+            # Listeden yalnızca bu iş iptal edildiyse kuyruk sıradaki işle devam eder
+            if state == "cancelled" and job['id'] not in self.cancelled_jobs:
+                with self.dispatch_lock:
+                    self.release_dispatcher()
+                return
+            self.cancelled_jobs.discard(job['id'])
+    
+    def release_dispatcher(self):
+        """dispatch_lock tutulurken çağrılır; run_jobs doğrudan (block=True) çağrıldıysa işleyici değişmez"""
+        if self.dispatcher is threading.current_thread():
+            self.dispatcher = None
+    
+    def run_job(self, job):
+        """Bu sürecin aldığı (claim) kuyruk işini çalıştırır ve son durumunu kaydeder"""
+        with self.get_job_queue().lease(job['id']):
+            return self.run_claimed_job(job)
+    
+    def run_claimed_job(self, job):
+        previous_directory = self.download_directory
+        self.current_job = job['id']
+        self.begin_session()
+        self.bandwidth.register(self.bandwidth_key(), job['priority'])
+        state = "failed"
         try:
-            self.signals.status.emit("Getting information...")
-            
-            info_opts = {
-                'quiet': True,
-                'no_warnings': True, 
-                'noplaylist': not is_playlist,
-                'skip_download': True
-            }
+            # İş, eklendiği andaki indirme klasörüne iner
+            self.set_download_directory(job['directory'])
+            self.set_job_state("extracting")
+            state = self.download_thread(
+                job['url'], job['is_video'], job['quality'], job['is_playlist'], job['outputs'], job['sync']
+            )
+        finally:
+            if state == "cancelled":
+                self.set_job_state("failed", CANCELLED_ERROR)
+            else:
+                self.set_job_state(state, self.job_error if state == "failed" else None)
+            self.bandwidth.unregister(self.bandwidth_key())
+            with self.items_lock:
+                self.cancelled_items.clear()
+            self.current_job = None
+            if self.download_directory == job['directory']:
+                self.download_directory = previous_directory
+            self.end_session()
+            self.write_metrics()
+        return state
+    
+    def download_thread(self, url, is_video, quality, is_playlist=False, outputs=None, sync=False):
+        outputs = outputs or [(is_video, quality)]
+        sync = sync and is_playlist
+        self.progress.start()
+        try:
+            # Daha önce indirilmişse hiçbir ağ isteği yapmadan bitir
+            if not is_playlist and self.use_archive:
+                archived_paths = self.find_outputs_in_archive(archive_key_from_url(url, noplaylist=True), outputs)
+                if archived_paths is not None:
+                    self.signals.status.emit("Already downloaded, skipping")
+                    self.signals.finished.emit(os.path.basename(archived_paths[0]), archived_paths[0], "")
+                    self.is_downloading = False
+                    return "done"
             
-            # Özel videoları hata olmadan atlamak için ignoreerrors ekleyelim
-            if self.skip_private:
-                info_opts['ignoreerrors'] = True
+            self.signals.status.emit("Checking for new videos..." if sync else "Getting information...")
             
-            with yt_dlp.YoutubeDL(info_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            with self.create_ydl(self.info_options(is_playlist)) as ydl:
+                # Yakın zamanda çözülmüş bilgi varsa ağa çıkmadan kullan; eşitlemede listenin güncel başı gerekir
+                info = self.get_cached_info(url, is_playlist) if not sync else None
+                if info is not None:
+                    self.signals.status.emit("Using cached information")
+                else:
+                    info = self.extract_url_info(ydl, url, is_playlist)
                 
                 # İşlem iptal edildiyse çık
                 if not self.is_downloading:
                     self.signals.status.emit("Download cancelled")
-                    return
+                    return "cancelled"
                 
-                if is_playlist and 'entries' in info:
-                    entries = list(info['entries'])
-                    # None değerleri filtreleme (atlanmış videolar)
-                    entries = [entry for entry in entries if entry is not None]
-                    
-                    total_videos = len(entries)
-                    self.signals.status.emit(f"Playlist found: {total_videos} videos")
+                if info is not None:
+                    self.tracker.job_title(self.current_job, info.get('title'))
+                self.set_job_state("downloading")
+                state = "done"
+                if is_playlist and info is not None and 'entries' in info:
+                    entries = self.iter_playlist_entries(info['entries'])
+                    if sync:
+                        # Listenin tamamı değil yalnızca yeni öğeler indirileceğinden toplam baştan bilinmez
+                        sync_run = self.begin_sync(url)
+                        entries = self.sync_entries(sync_run, entries)
+                        total_videos = 0
+                    else:
+                        total_videos = info.get('playlist_count') or 0
+                        if total_videos:
+                            self.signals.status.emit(f"Playlist found: {total_videos} videos")
+                        else:
+                            self.signals.status.emit("Playlist found, fetching entries...")
                     
-                    for i, entry in enumerate(entries):
-                        # İşlem iptal edildiyse döngüden çık
-                        if not self.is_downloading:
-                            self.signals.status.emit("Download cancelled")
-                            break
-                            
-                        self.signals.playlist_progress.emit(i+1, total_videos)
-                        self.signals.status.emit(f"Downloading: Item {i+1}/{total_videos}")
-                        
-                        is_last_video = (i == len(entries) - 1)
-                        success = self.download_single_video(entry, is_video, quality, notify_completion=is_last_video)
-                        
-                        # Video özel ise ve atlanması gerekiyorsa
-                        if not success and self.skip_private:
-                            self.signals.status.emit(f"Skipped private video: {entry.get('title', 'Unknown')}")
+                    self.download_playlist_entries(entries, total_videos, is_video, quality, outputs)
+                    failed = self.failed_items()
+                    if self.disk_error is not None:
+                        state = "failed"
+                        self.job_error = str(self.disk_error)
+                    elif failed:
+                        # Öğelerden biri bile indirilemediyse liste işi başarılı sayılmaz
+                        state = "failed"
+                        self.job_error = f"{len(failed)} of {len(self.get_job_queue().items(self.current_job))} items failed"
+                    if sync and self.is_downloading and self.disk_error is None:
+                        # Yarıda kalan eşitleme kaydedilmez, sonraki çalışma aynı noktadan yeniden bakar
+                        self.finish_sync(sync_run, failed)
                 else:
                     if info is not None:  # None olabilir (atlanmış video)
-                        success = self.download_single_video(info, is_video, quality, notify_completion=True)
-                        if not success and self.skip_private:
-                            self.signals.status.emit(f"Skipped private video: {info.get('title', 'Unknown')}")
+                        success = self.download_single_video(info, is_video, quality, notify_completion=True, outputs=outputs)
+                        if success:
+                            self.set_job_state("merging")
+                        # Birleştirme/dönüştürme bitene kadar indirme sürüyor sayılır
+                        self.postprocessing.join()
+                        failed = self.failed_items() if success else {}
+                        if failed:
+                            # Son işleme (birleştirme/dönüştürme) başarısız olduysa iş de başarısızdır
+                            state = "failed"
+                            self.job_error = next(iter(failed.values()))
+                        if not success:
+                            state = "failed"
+                            failed = self.failed_items()
+                            if self.disk_error is not None:
+                                self.job_error = str(self.disk_error)
+                            elif failed:
+                                self.job_error = next(iter(failed.values()))
+                            if self.skip_private and self.disk_error is None:
+                                self.signals.status.emit(f"Skipped private video: {info.get('title', 'Unknown')}")
                     else:
-                        self.signals.error.emit("Could not retrieve video information. It might be private or deleted.")
+                        state = "failed"
+                        self.job_error = "Could not retrieve video information. It might be private or deleted."
+                        self.signals.error.emit(self.job_error)
             
             # İndirme işlemi tamamlandı
+            if not self.is_downloading:
+                state = "cancelled"
             self.is_downloading = False
+            return state
             
         except Exception as e:
+            if self.cancel_token.cancelled:
+                self.is_downloading = False
+                self.signals.status.emit("Download cancelled")
+                return "cancelled"
             error_msg = str(e)
             print(f"Download error: {error_msg}")
             print("Error details:")
             traceback.print_exc()
+            self.job_error = error_msg
             self.signals.error.emit(error_msg)
             self.signals.status.emit("Error occurred")
             self.is_downloading = False
+            return "failed"
+        finally:
+            self.progress.stop()
+    
+    def info_options(self, is_playlist):
+        """Bilgi çıkarma için kullanılan ydl_opts değerini döndürür"""
+        info_opts = {
+            'quiet': True,
+            'no_warnings': True, 
+            'noplaylist': not is_playlist,
+            'skip_download': True
+        }
+        
+        # Özel videoları hata olmadan atlamak için ignoreerrors ekleyelim
+        if self.skip_private:
+            info_opts['ignoreerrors'] = True
+        return info_opts
+    
+    def extract_url_info(self, ydl, url, is_playlist):
+        """URL bilgisini çıkarır; listelerde öğeler çözülmeden, akış halinde bırakılır"""
+        with self.metrics.timer('phase_seconds', {'phase': 'extract'}, {'job': self.current_job, 'url': url}):
+            # Liste modunda sadece ham (düz) sonucu alıyoruz, öğeler indirilmeden hemen önce çözülür
+            info = ydl.extract_info(url, download=False, process=not is_playlist)
+            
+            # Yönlendirme sonuçlarını öğeleri çözmeden takip et
+            while info is not None and info.get('_type') in ('url', 'url_transparent'):
+                info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+        
+        if info is None:
+            return None
+        
+        if is_playlist and 'entries' in info:
+            info['entries'] = self.record_playlist_entries(url, info, self.iter_playlist_entries(info['entries']))
+            return info
+        
+        # Liste değilse tek video olarak tam bilgiyi çöz
+        if is_playlist:
+            info = ydl.process_ie_result(info, download=False)
+        self.store_cached_info(url, info)
+        return info
+    
+    def begin_sync(self, url):
+        """Listenin önceki eşitlemede görülen öğelerini yükler"""
+        seen, retry = self.get_job_queue().sync_state(url)
+        return {
+            'url': url,
+            'seen': seen,
+            'known': set(seen),
+            'retry': retry,
+            'new': [],  # listenin başında bulunan yeni öğelerin anahtarları, en yeni önce
+            'entries': {}  # bu çalışmada sıraya giren öğeler: anahtar -> kırpılmış öğe
+        }
+    
+    def sync_entries(self, sync_run, entries):
+        """
+        Önce önceki eşitlemede başarısız olan öğeleri, sonra listenin başındaki yeni öğeleri verir.
+        Bilinen ilk öğede durulur; liste sayfalı çekildiğinden sonraki sayfalar hiç istenmez.
+        """
+        listed = sync_run['entries']
+        for entry in sync_run['retry']:
+            key = self.job_item_key(entry)
+            if key in listed:
+                continue
+            listed[key] = entry
+            yield entry
+        
+        for entry in entries:
+            key = self.job_item_key(entry)
+            if key is None:
+                continue
+            if key in sync_run['known']:
+                break
+            if key in listed:
+                continue
+            listed[key] = trim_flat_entry(entry)
+            sync_run['new'].append(key)
+            yield entry
+    
+    def failed_items(self):
+        """Geçerli işin indirilemeyen öğeleri (anahtar -> hata); atlanan (özel) ve kullanıcının iptal ettiği öğeler sayılmaz"""
+        if self.current_job is None:
+            return {}
+        return {
+            item['item_key']: item['error'] for item in self.get_job_queue().items(self.current_job)
+            if item['state'] == "failed" and item['error'] not in ("Skipped", CANCELLED_ERROR)
+        }
+    
+    def finish_sync(self, sync_run, failed):
+        """
+        Eşitleme sonucunu kaydeder: yeni öğeler görülenlere eklenir, sonraki eşitleme onlarda durur.
+        İndirilemeyen öğeler (failed) bir dahaki sefere yeniden denenir.
+        """
+        seen = list(sync_run['new'])
+        known = set(seen)
+        for key in sync_run['seen']:
+            if key not in known:
+                seen.append(key)
+                known.add(key)
+        retry = [entry for key, entry in sync_run['entries'].items() if key in failed]
+        self.get_job_queue().set_sync_state(sync_run['url'], seen, retry)
+        
+        summary = f"Sync finished: {len(sync_run['new'])} new item(s)"
+        if sync_run['retry']:
+            summary += f", {len(sync_run['retry'])} retried"
+        if retry:
+            summary += f", {len(retry)} failed (will retry next sync)"
+        self.signals.status.emit(summary)
+    
+    def iter_playlist_entries(self, entries):
+        """Liste öğelerini sayfa sayfa, belleğe toplamadan döndürür"""
+        if hasattr(entries, 'getslice'):
+            # yt-dlp PagedList: sayfaları ihtiyaç oldukça iste
+            page_size = 50
+            start = 0
+            while True:
+                page = entries.getslice(start, start + page_size)
+                if not page:
+                    break
+                for entry in page:
+                    if entry is not None:
+                        yield entry
+                start += page_size
+        else:
+            for entry in entries:
+                # None değerleri filtreleme (atlanmış videolar)
+                if entry is not None:
+                    yield entry
+    
+    def resolve_entry(self, entry):
+        """Düz liste öğesinin tam bilgisini indirmeden hemen önce çözer"""
+        if entry.get('_type', 'video') not in ('url', 'url_transparent'):
+            return entry
+        
+        entry_url = entry.get('url') or entry.get('id')
+        cached_info = self.get_cached_info(entry_url, False)
+        if cached_info is not None:
+            return cached_info
+        
+        # Her işçi iş parçacığı kendi YoutubeDL örneğini ve bağlantılarını yeniden kullanır
+        ydl = getattr(self._resolver_local, 'ydl', None)
+        if ydl is None or ydl.params.get('cancel_token') is not self.cancel_token:
+            resolve_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'noplaylist': True,
+                'skip_download': True
+            }
+            if self.skip_private:
+                resolve_opts['ignoreerrors'] = True
+            ydl = self.create_ydl(resolve_opts)
+            self._resolver_local.ydl = ydl
+        
+        with self.metrics.timer('phase_seconds', {'phase': 'extract'}, {'job': self.current_job, 'item': entry.get('id')}):
+            info = ydl.process_ie_result(entry, download=False)
+        self.store_cached_info(entry_url, info)
+        return info
     
-    def download_single_video(self, info, is_video, quality, notify_completion=True):
+    def download_playlist_entries(self, entries, total_videos, is_video, quality, outputs=None):
+        """Liste öğelerini sınırlı sayıda işçiyle paralel olarak indirir"""
+        counts = {'completed': 0, 'in_flight': 0}
+        lock = threading.Lock()
+        self._resolver_local = threading.local()
+        self.playlist_projection = PlaylistProjection(total_videos)
+        
+        def report_progress():
+            self.signals.playlist_progress.emit(counts['completed'], counts['in_flight'], total_videos)
+            self.tracker.job_progress(self.current_job, counts['completed'], total_videos)
+        
+        def run_entry(entry):
+            with lock:
+                counts['in_flight'] += 1
+                report_progress()
+            try:
+                self.playlist_projection.start()
+                # İşlem iptal edildiyse veya disk dolduysa öğeyi çözmeye uğraşma
+                if not self.is_downloading or self.disk_error is not None:
+                    return False
+                
+                # Arşivdeki öğeler çözülmeden atlanır
+                if self.find_outputs_in_archive(archive_key_from_entry(entry), outputs or [(is_video, quality)]) is not None:
+                    self.signals.status.emit(f"Already downloaded: {entry.get('title', 'Unknown')}")
+                    return False
+                
+                # Başka bir listede indirilmiş öğe depodan bağlanır, bilgisinin çözülmesine de gerek kalmaz
+                if self.link_from_store(entry, outputs or [(is_video, quality)]) is not None:
+                    return True
+                
+                # Devam ettirilen işte tamamlanmış öğeler tekrar indirilmez
+                if self.current_job is not None and self.get_job_queue().item_state(self.current_job, self.job_item_key(entry)) == "done":
+                    return False
+                
+                self.set_item_state(entry, "extracting")
+                try:
+                    info = self.resolve_entry(entry)
+                except Exception as e:
+                    print(f"Entry extraction error: {e}")
+                    self.signals.error.emit(str(e))
+                    self.set_item_state(entry, "failed", error=str(e))
+                    return False
+                
+                # Listeden iptal edilen öğe indirilmeden atlanır
+                if self.item_cancelled(entry):
+                    self.set_item_state(entry, "failed", error=CANCELLED_ERROR)
+                    return False
+                
+                if info is None:
+                    self.set_item_state(entry, "failed", error="Skipped")
+                    if self.skip_private:
+                        self.signals.status.emit(f"Skipped unavailable video: {entry.get('title', 'Unknown')}")
+                    return False
+                
+                success = self.download_single_video(info, is_video, quality, notify_completion=False, outputs=outputs)
+                # Video özel ise ve atlanması gerekiyorsa
+                if not success and self.skip_private and self.is_downloading and self.disk_error is None and not self.item_cancelled(entry):
+                    self.signals.status.emit(f"Skipped private video: {entry.get('title', 'Unknown')}")
+                return success
+            finally:
+                with lock:
+                    counts['in_flight'] -= 1
+                    counts['completed'] += 1
+                    report_progress()
+        
+        files_before = len(self.downloaded_files)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for entry in entries:
+                # İşlem iptal edildiyse veya diskte yer kalmadıysa yeni öğe gönderme
+                if not self.is_downloading or self.disk_error is not None:
+                    break
+                
+                # Kuyrukta işçi sayısından fazla öğe bekletme
+                if len(pending) >= self.max_workers:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                
+                pending.add(executor.submit(run_entry, entry))
+            
+            wait(pending)
+        
+        # Son işleme havuzundaki dosyaların da bitmesini bekle
+        self.postprocessing.join()
+        self.playlist_projection = None
+        
+        if not self.is_downloading:
+            self.signals.status.emit("Download cancelled")
+            return
+        
+        if self.disk_error is not None:
+            self.signals.status.emit("Playlist stopped: not enough disk space")
+            return
+        
+        if len(self.downloaded_files) > files_before:
+            filepath = self.downloaded_files[-1]
+            self.signals.finished.emit(os.path.basename(filepath), filepath, "")
+        else:
+            self.signals.status.emit("Playlist completed: no files downloaded")
+    
+    def download_single_video(self, info, is_video, quality, notify_completion=True, outputs=None):
+        if outputs is not None and len(outputs) > 1:
+            return self.download_outputs(info, outputs, notify_completion)
+        task_ids = []
+        # Öğe listeden tek başına iptal edilebilsin diye kendi belirteciyle indirilir
+        cancel = self.begin_item(info)
+        handed_off = False
         try:
             # İşlem iptal edildiyse çık
             if not self.is_downloading:
@@ -139,232 +912,687 @@ class YouTubeDownloader:
                 
             video_title = info.get('title', 'video')
             video_id = info.get('id', '')
-            video_url = info.get('webpage_url', '') or info.get('url', '')
+            source_url = info.get('webpage_url', '') or info.get('url', '')
             
             # Özel video kontrolü
             if 'private' in info.get('_type', '') or 'private' in info.get('availability', ''):
                 if self.skip_private:
                     return False
             
-            video_title = self.clean_filename(video_title)
+            linked = self.link_from_store(info, [(is_video, quality)])
+            if linked is not None:
+                if notify_completion:
+                    self.signals.finished.emit(os.path.basename(linked[0]), linked[0], "")
+                return True
             
-            # Thumbnail kısmını kaldırıyoruz
-            thumbnail_path = ""
+            video_title = self.clean_filename(video_title)
+            task_prefix = video_id or video_title
             
+            self.preflight_item(info, [(is_video, quality)], cancel)
             self.signals.status.emit("Starting download...")
             
             output_template = os.path.join(self.download_directory, f"{video_title}.%(ext)s")
             
+            task_ids.extend([f"{task_prefix}:video", f"{task_prefix}:audio"])
+            self.set_item_state(info, "downloading")
+            self.tracker.bind_tasks(self.current_job, self.job_item_key(info), task_ids)
+            
             if not is_video:
-                audio_quality_map = {
-                    "320 kbps": "320",
-                    "256 kbps": "256",
-                    "192 kbps": "192",
-                    "128 kbps": "128",
-                    "96 kbps": "96"
-                }
-                audio_quality = audio_quality_map.get(quality, "192")
+                audio_quality = self.audio_bitrate(quality)
+                ydl_opts = self.audio_stream_options(output_template, task_prefix, cancel=cancel)
                 
-                ydl_opts = {
-                    'format': 'bestaudio/best',
-                    'outtmpl': output_template,
-                    'quiet': False,
-                    'no_warnings': False,
-                    'progress_hooks': [self.progress_hook],
-                    'ignoreerrors': True,
-                    'nopostoverwrites': False,
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': 'mp3',
-                        'preferredquality': audio_quality,
-                    }]
-                }
-                
-                try:
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        # İşlem iptal edildiyse çık
-                        if not self.is_downloading:
-                            return False
-                            
-                        ydl.download([video_url])
-                except Exception as e:
-                    error_msg = str(e)
-                    if "Private video" in error_msg or "Sign in to confirm" in error_msg:
-                        if self.skip_private:
-                            return False
-                    else:
-                        raise e
+                downloaded = self.download_stream(ydl_opts, info)
+                if not downloaded:
+                    self.set_item_state(info, "failed", error="Skipped")
+                    return False
                 
+                source_path = self.downloaded_filepath(downloaded)
                 filepath = os.path.join(self.download_directory, f"{video_title}.mp3")
-                file_ext = "mp3"
+                
+                if source_path is None or not os.path.exists(source_path):
+                    raise Exception(f"Downloaded audio file not found for {video_title}")
+                
+                def postprocess():
+                    if source_path == filepath:
+                        return True
+                    self.signals.status.emit(f"Converting to MP3: {video_title}")
+                    self.convert_audio(source_path, filepath, audio_quality, source_url, cancel)
+                    return True
                 
             else:
                 self.signals.status.emit("Downloading...")
                 video_path = os.path.join(self.download_directory, f"{video_title}.mp4")
+                audio_path = os.path.join(self.download_directory, f"{video_title}.m4a")
                 
-                format_map = {
-                    "Best Quality": "bestvideo[ext=mp4]/best[ext=mp4]",
-                    "1080p": "bestvideo[height<=1080][ext=mp4]/best[height<=1080][ext=mp4]",
-                    "720p": "bestvideo[height<=720][ext=mp4]/best[height<=720][ext=mp4]",
-                    "480p": "bestvideo[height<=480][ext=mp4]/best[height<=480][ext=mp4]",
-                    "360p": "bestvideo[height<=360][ext=mp4]/best[height<=360][ext=mp4]",
-                    "240p": "bestvideo[height<=240][ext=mp4]/best[height<=240][ext=mp4]"
-                }
-                format_str = format_map.get(quality, "bestvideo[ext=mp4]/best[ext=mp4]")
-                
-                ydl_opts = {
-                    'format': format_str,
-                    'outtmpl': output_template,
-                    'quiet': False,
-                    'no_warnings': False,
-                    'progress_hooks': [self.progress_hook],
-                    'ignoreerrors': True,
-                    'nopostoverwrites': False,
-                    'postprocessors': [],
-                    'noplaylist': True,
-                    'keepvideo': True
-                }
-                
-                try:
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        # İşlem iptal edildiyse çık
-                        if not self.is_downloading:
-                            return False
-                            
-                        ydl.download([video_url])
-                except Exception as e:
-                    error_msg = str(e)
-                    if "Private video" in error_msg or "Sign in to confirm" in error_msg:
-                        if self.skip_private:
-                            return False
-                    else:
-                        raise e
-                
-                # İşlem iptal edildiyse çık
-                if not self.is_downloading:
-                    return False
+                # Görüntü ve ses akışları birbirinden bağımsız, aynı anda indiriyoruz
+                # Yarım kalan .part dosyaları yeniden başlatmada kaldığı yerden devam eder
+                self.set_item_state(info, "downloading", partial_files=[f"{video_path}.part", f"{audio_path}.part"])
                 
-                self.signals.status.emit("Downloading audio component...")
-                audio_format_map = {
-                    "Best Quality": "bestaudio[ext=m4a]/best[ext=m4a]",
-                    "1080p": "bestaudio[ext=m4a]/best[ext=m4a]",
-                    "720p": "bestaudio[ext=m4a]/best[ext=m4a]",
-                    "480p": "bestaudio[ext=m4a]/best[ext=m4a]",
-                    "360p": "bestaudio[ext=m4a]/best[ext=m4a]",
-                    "240p": "bestaudio[ext=m4a]/best[ext=m4a]"
-                }
-                audio_format_str = audio_format_map.get(quality, "bestaudio[ext=m4a]/best[ext=m4a]")
+                ydl_opts, audio_ydl_opts = self.video_stream_options(quality, output_template, task_prefix, cancel=cancel)
                 
-                audio_ydl_opts = {
-                    'format': audio_format_str,
-                    'outtmpl': output_template,
-                    'quiet': False,
-                    'no_warnings': False,
-                    'progress_hooks': [self.progress_hook],
-                    'ignoreerrors': True,
-                    'nopostoverwrites': False,
-                    'postprocessors': [],
-                    'noplaylist': True
-                }
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    video_future = executor.submit(self.download_stream, ydl_opts, info)
+                    audio_future = executor.submit(self.download_stream, audio_ydl_opts, info)
+                    # Her iki akış da bitmeden birleştirmeye geçme
+                    video_ok = video_future.result()
+                    audio_ok = audio_future.result()
                 
-                try:
-                    with yt_dlp.YoutubeDL(audio_ydl_opts) as ydl:
-                        # İşlem iptal edildiyse çık
-                        if not self.is_downloading:
-                            return False
-                            
-                        ydl.download([video_url])
-                except Exception as e:
-                    error_msg = str(e)
-                    if "Private video" in error_msg or "Sign in to confirm" in error_msg:
-                        if self.skip_private:
-                            return False
-                    else:
-                        raise e
-                
-                audio_path = os.path.join(self.download_directory, f"{video_title}.m4a")
+                # İşlem iptal edildiyse inen akışlar birleştirilmeden silinir
+                cancel.check()
                 
-                if os.path.exists(video_path) and os.path.exists(audio_path):
-                    self.signals.status.emit("Merging files...")
-                    merged_path = os.path.join(self.download_directory, f"{video_title}_merged.mp4")
-                    
-                    try:
-                        cmd = f'ffmpeg -y -i "{video_path}" -i "{audio_path}" -c:v copy -c:a aac -map 0:v:0 -map 1:a:0 "{merged_path}"'
-                        result = subprocess.run(
-                            cmd, 
-                            shell=True,
-                            capture_output=True,
-                            text=True
-                        )
-                        
-                        if result.returncode != 0:
-                            raise Exception(f"ffmpeg error: {result.stderr}")
-                        
-                        if os.path.exists(merged_path):
-                            os.remove(video_path)
-                            os.remove(audio_path)
-                            os.rename(merged_path, video_path)
-                    except Exception as e:
-                        print(f"Video and audio merging error: {e}")
-                        traceback.print_exc()
-                        self.signals.error.emit(f"Video and audio merging error: {e}")
+                if not video_ok or not audio_ok:
+                    self.set_item_state(info, "failed", error="Skipped")
+                    return False
                 
                 filepath = video_path
-                file_ext = "mp4"
+                
+                def postprocess():
+                    # Birleştirme hatası run_postprocess'e ulaşır; öğe başarısız sayılır, arşive ve depoya eklenmez
+                    if os.path.exists(video_path) and os.path.exists(audio_path):
+                        self.signals.status.emit("Merging files...")
+                        self.merge_streams(video_path, audio_path, source_url, cancel)
+                    return True
             
-            filename = os.path.basename(filepath)
+            # İndirme işçisi son işlemeyi beklemeden bir sonraki öğeye geçer
+            self.postprocessing.submit(
+                lambda: self.finish_download(postprocess, filepath, info, is_video, quality, notify_completion, cancel)
+            )
+            handed_off = True
+            return True
             
-            if notify_completion:
-                self.signals.finished.emit(filename, filepath, thumbnail_path)
+        except InsufficientDiskSpace as e:
+            self.fail_disk_space(info, e)
+            return False
+        except Exception as e:
+            if cancel.cancelled:
+                # İptal hata sayılmaz; bu oturumda devam ettirilmeyecek dosyalar temizlenir
+                video_title = self.clean_filename(info.get('title', 'video'))
+                if is_video:
+                    remove_files([os.path.join(self.download_directory, f"{video_title}.{ext}") for ext in ("mp4", "m4a")])
+                self.set_item_state(info, "failed", partial_files=[], error=CANCELLED_ERROR)
+                return False
+            error_msg = str(e)
+            print(f"Video download error: {error_msg}")
+            traceback.print_exc()
+            self.signals.error.emit(error_msg)
+            self.set_item_state(info, "failed", error=error_msg)
+            return False
+        finally:
+            self.progress.remove_tasks(task_ids)
+            self.tracker.unbind_tasks(task_ids)
+            if not handed_off:
+                self.end_item(cancel)
+    
+    def download_outputs(self, info, outputs, notify_completion=True):
+        """
+        Tek kaynaktan birden çok çıktı üretir (örn. 1080p mp4 ile 320 ve 128 kbps mp3).
+        Ses akışı ve her görüntü kalitesi yalnızca bir kez indirilir; birleştirme ve dönüştürmeler
+        bu ortak dosyalardan son işleme havuzunda paralel çalışır, en son biten kaynakları siler.
+        """
+        task_ids = []
+        cancel = self.begin_item(info)
+        handed_off = False
+        video_title = self.clean_filename(info.get('title', 'video'))
+        source_base = os.path.join(self.download_directory, f"{video_title}.source")
+        try:
+            # İşlem iptal edildiyse çık
+            if not self.is_downloading:
+                return False
+            
+            # Özel video kontrolü
+            if 'private' in info.get('_type', '') or 'private' in info.get('availability', ''):
+                if self.skip_private:
+                    return False
+            
+            task_prefix = info.get('id', '') or video_title
+            source_url = info.get('webpage_url', '') or info.get('url', '')
+            
+            # Dosya adları tüm çıktılara göre belirlenir; arşivdekiler yeniden üretilmez
+            key = archive_key_from_entry(info)
+            targets = [
+                (output_is_video, output_quality, path)
+                for (output_is_video, output_quality), path in zip(outputs, self.output_paths(video_title, outputs))
+                if self.find_in_archive(key, output_is_video, output_quality) is None
+            ]
+            if not targets:
+                self.signals.status.emit(f"Already downloaded: {info.get('title', 'Unknown')}")
+                self.set_item_state(info, "done", partial_files=[])
+                return True
+            
+            target_outputs = [(output_is_video, output_quality) for output_is_video, output_quality, _ in targets]
+            linked = self.link_from_store(info, target_outputs, [path for _, _, path in targets])
+            if linked is not None:
+                if notify_completion:
+                    self.signals.finished.emit(os.path.basename(linked[0]), linked[0], "")
+                return True
+            
+            self.preflight_item(info, target_outputs, cancel)
+            self.signals.status.emit("Starting download...")
+            self.set_item_state(info, "downloading")
+            
+            # Ses akışı tüm çıktılarda ortak; mp4 çıktısı varsa mp4'e kopyalanabilen m4a seçilir
+            video_qualities = list(dict.fromkeys(quality for is_video, quality, _ in targets if is_video))
+            if video_qualities:
+                audio_opts = self.video_stream_options(video_qualities[0], f"{source_base}.%(ext)s", task_prefix, cancel=cancel)[1]
+            else:
+                audio_opts = self.audio_stream_options(f"{source_base}.%(ext)s", task_prefix, cancel=cancel)
+            stream_opts = [audio_opts]
+            task_ids.append(f"{task_prefix}:audio")
+            for index, video_quality in enumerate(video_qualities):
+                stream_prefix = f"{task_prefix}:{index}"
+                stream_opts.append(
+                    self.video_stream_options(video_quality, f"{source_base}{index}.%(ext)s", stream_prefix, cancel=cancel)[0]
+                )
+                task_ids.append(f"{stream_prefix}:video")
+            self.tracker.bind_tasks(self.current_job, self.job_item_key(info), task_ids)
+            
+            self.signals.status.emit("Downloading...")
+            with ThreadPoolExecutor(max_workers=len(stream_opts)) as executor:
+                futures = [executor.submit(self.download_stream, opts, info) for opts in stream_opts]
+                # Tüm akışlar bitmeden son işlemeye geçme
+                downloads = [future.result() for future in futures]
+            
+            # İşlem iptal edildiyse inen akışlar işlenmeden silinir
+            cancel.check()
+            
+            if not all(downloads):
+                self.set_item_state(info, "failed", error="Skipped")
+                return False
+            
+            sources = [self.downloaded_filepath(downloaded) for downloaded in downloads]
+            if any(path is None or not os.path.exists(path) for path in sources):
+                raise Exception(f"Downloaded streams not found for {video_title}")
+            audio_path = sources[0]
+            video_paths = dict(zip(video_qualities, sources[1:]))
             
+            lock = threading.Lock()
+            finished = {}
+            
+            def finish(output_is_video, output_quality, filepath, postprocess):
+                success = self.run_postprocess(postprocess, info)
+                if success:
+                    self.record_download(filepath, info, output_is_video, output_quality)
+                with lock:
+                    finished[filepath] = success
+                    if len(finished) < len(targets):
+                        return success
+                # Son çıktı da bittiğinde ortak kaynak dosyaları silinir
+                remove_files(sources)
+                self.end_item(cancel)
+                completed = [path for _, _, path in targets if finished[path]]
+                if len(completed) == len(targets):
+                    self.set_item_state(info, "done", partial_files=[])
+                elif not cancel.cancelled:
+                    self.set_item_state(info, "failed", error=f"{len(targets) - len(completed)} of {len(targets)} outputs failed")
+                if notify_completion and completed:
+                    self.signals.progress.emit(100)
+                    self.signals.finished.emit(os.path.basename(completed[0]), completed[0], "")
+                return success
+            
+            handed_off = True
+            for output_is_video, output_quality, filepath in targets:
+                if output_is_video:
+                    postprocess = partial(self.merge_output, video_paths[output_quality], audio_path, filepath, source_url, cancel)
+                else:
+                    postprocess = partial(self.convert_output, audio_path, filepath, self.audio_bitrate(output_quality), source_url, cancel)
+                self.postprocessing.submit(partial(finish, output_is_video, output_quality, filepath, postprocess))
             return True
             
+        except InsufficientDiskSpace as e:
+            self.fail_disk_space(info, e)
+            return False
         except Exception as e:
+            if cancel.cancelled:
+                # İptal hata sayılmaz; tamamlanmış kaynak akışları da silinir
+                remove_files(glob.glob(glob.escape(source_base) + "*"))
+                self.set_item_state(info, "failed", partial_files=[], error=CANCELLED_ERROR)
+                return False
             error_msg = str(e)
             print(f"Video download error: {error_msg}")
             traceback.print_exc()
             self.signals.error.emit(error_msg)
+            self.set_item_state(info, "failed", error=error_msg)
             return False
+        finally:
+            self.progress.remove_tasks(task_ids)
+            self.tracker.unbind_tasks(task_ids)
+            if not handed_off:
+                self.end_item(cancel)
+    
+    def estimate_item(self, info, outputs):
+        """
+        Öğenin indirilecek kaynak akışlarının ve üretilecek çıktılarının tahmini boyutlarını (bayt) döndürür.
+        Boyutu bilinmeyenler None olur; akışlar download_outputs ile aynı biçim seçicileriyle seçilir.
+        """
+        if self.format_ydl is None:
+            self.format_ydl = load_yt_dlp().YoutubeDL({'quiet': True, 'no_warnings': True})
+        duration = info.get('duration')
+        video_qualities = list(dict.fromkeys(quality for is_video, quality in outputs if is_video))
+        audio_spec = self.video_format_specs(video_qualities[0])[1] if video_qualities else AUDIO_FORMAT
+        audio_size = estimate_stream_size(self.format_ydl, info, audio_spec)
+        video_sizes = {
+            quality: estimate_stream_size(self.format_ydl, info, self.video_format_specs(quality)[0])
+            for quality in video_qualities
+        }
+        
+        results = []
+        for is_video, quality in outputs:
+            if is_video:
+                video_size = video_sizes[quality]
+                # Birleştirme akışları yeniden kodlamadan kopyalar
+                results.append(video_size + audio_size if video_size and audio_size else None)
+            else:
+                results.append(estimate_mp3_size(self.audio_bitrate(quality), duration))
+        return [audio_size] + list(video_sizes.values()), results
+    
+    def preflight_item(self, info, outputs, cancel):
+        """
+        İndirmeden önce öğenin diskte aynı anda kaplayacağı en yüksek alanı ayırır.
+        Yer yoksa InsufficientDiskSpace fırlatır; diğer öğeler alan ayırdıysa onların bitmesini bekler.
+        """
+        if not self.check_disk_space:
+            return
+        sources, results = self.estimate_item(info, outputs)
+        # Son işleme sırasında kaynak akışlar ile çıktılar diskte birlikte bulunur
+        peak = sum(size for size in sources + results if size)
+        projection = self.playlist_projection
+        if projection is not None:
+            projection.add(sum(size for size in results if size))
+            self.check_playlist_size(projection)
+        if not peak:
+            return
+        
+        title = info.get('title', 'Unknown')
+        reservation = self.disk_budget.acquire(
+            self.download_directory, peak, cancel,
+            on_wait=lambda: self.signals.status.emit(f"Waiting for disk space: {title}")
+        )
+        with self.items_lock:
+            self.disk_reservations[cancel] = reservation
+    
+    def check_playlist_size(self, projection):
+        """Listenin kalanı boş alana sığmayacak gibiyse bir kez uyarır"""
+        needed = projection.remaining_size()
+        if projection.warned or not needed:
+            return
+        available = self.disk_budget.available(self.download_directory)
+        if needed > available:
+            projection.warned = True
+            self.signals.status.emit(
+                f"Warning: the rest of the playlist needs about {self.format_size(needed)}, "
+                f"only {self.format_size(max(0, available))} available"
+            )
+    
+    def fail_disk_space(self, info, error):
+        """Diske sığmayan öğeyi başarısız sayar; listenin kalan öğeleri başlatılmaz"""
+        with self.items_lock:
+            first = self.disk_error is None
+            self.disk_error = error
+        print(f"Preflight error: {error}")
+        # Aynı anda başlayan öğeler için tek hata bildirilir
+        if first:
+            self.signals.error.emit(str(error))
+        self.set_item_state(info, "failed", error=str(error))
+    
+    def output_paths(self, video_title, outputs):
+        """Çıktıların dosya yolları; aynı uzantıda birden çok çıktı varsa adlarına kalite eklenir"""
+        extensions = ["mp4" if is_video else "mp3" for is_video, _ in outputs]
+        paths = []
+        for (is_video, quality), ext in zip(outputs, extensions):
+            name = video_title if extensions.count(ext) == 1 else f"{video_title} [{quality}]"
+            paths.append(os.path.join(self.download_directory, f"{name}.{ext}"))
+        return paths
     
-    def progress_hook(self, d):
-        if d['status'] == 'downloading':
+    def merge_output(self, video_path, audio_path, output_path, source_url, cancel=None):
+        self.signals.status.emit(f"Merging files: {os.path.basename(output_path)}")
+        self.merge_streams(video_path, audio_path, source_url, cancel, output_path=output_path)
+    
+    def convert_output(self, source_path, mp3_path, bitrate, source_url, cancel=None):
+        self.signals.status.emit(f"Converting to MP3: {os.path.basename(mp3_path)}")
+        self.convert_audio(source_path, mp3_path, bitrate, source_url, cancel, keep_source=True)
+    
+    def audio_bitrate(self, quality):
+        """Ses kalitesi seçeneğini mp3 bit hızına (kbps) çevirir"""
+        audio_quality_map = {
+            "320 kbps": "320",
+            "256 kbps": "256",
+            "192 kbps": "192",
+            "128 kbps": "128",
+            "96 kbps": "96"
+        }
+        return audio_quality_map.get(quality, "192")
+    
+    def audio_stream_options(self, output_template, task_prefix, job_key=None, cancel=None):
+        """Ses modunda indirilecek ham ses akışının ydl_opts değerini döndürür; cancel verilmezse oturum belirteci kullanılır"""
+        return {
+            'format': AUDIO_FORMAT,
+            'outtmpl': output_template,
+            'quiet': False,
+            'no_warnings': False,
+            'progress_hooks': [self.make_progress_hook(f"{task_prefix}:audio", job_key, cancel)],
+            'cancel_token': cancel or self.cancel_token,
+            # Hatalar yutulmasın; download_stream sınıflandırıp gerekirse yeniden dener
+            'ignoreerrors': False,
+            'nopostoverwrites': False,
+            'postprocessors': [],
+            **self.read_size_options()
+        }
+    
+    def read_size_options(self):
+        """Okuma bloğunu sabitler; büyüyen bloklar hız zamanlayıcısında öncelikleri bozar"""
+        return {'buffersize': READ_SIZE, 'noresizebuffer': True}
+    
+    def video_format_specs(self, quality):
+        """Video kalitesi için görüntü ve ses akışlarının yt-dlp biçim seçicilerini döndürür"""
+        format_map = {
+            "Best Quality": "bestvideo[ext=mp4]/best[ext=mp4]",
+            "1080p": "bestvideo[height<=1080][ext=mp4]/best[height<=1080][ext=mp4]",
+            "720p": "bestvideo[height<=720][ext=mp4]/best[height<=720][ext=mp4]",
+            "480p": "bestvideo[height<=480][ext=mp4]/best[height<=480][ext=mp4]",
+            "360p": "bestvideo[height<=360][ext=mp4]/best[height<=360][ext=mp4]",
+            "240p": "bestvideo[height<=240][ext=mp4]/best[height<=240][ext=mp4]"
+        }
+        format_str = format_map.get(quality, "bestvideo[ext=mp4]/best[ext=mp4]")
+        
+        audio_format_map = {
+            "Best Quality": "bestaudio[ext=m4a]/best[ext=m4a]",
+            "1080p": "bestaudio[ext=m4a]/best[ext=m4a]",
+            "720p": "bestaudio[ext=m4a]/best[ext=m4a]",
+            "480p": "bestaudio[ext=m4a]/best[ext=m4a]",
+            "360p": "bestaudio[ext=m4a]/best[ext=m4a]",
+            "240p": "bestaudio[ext=m4a]/best[ext=m4a]"
+        }
+        audio_format_str = audio_format_map.get(quality, "bestaudio[ext=m4a]/best[ext=m4a]")
+        return format_str, audio_format_str
+    
+    def video_stream_options(self, quality, output_template, task_prefix, job_key=None, cancel=None):
+        """Video modunda ayrı indirilen görüntü ve ses akışlarının ydl_opts değerlerini döndürür"""
+        format_str, audio_format_str = self.video_format_specs(quality)
+        
+        segmented_options = self.segmented_download_options()
+        if segmented_options is not None:
+            # Parçalı indiricide hız sınırı her bağlantının okumasında uygulanır
+            segmented_options['throttle'] = self.make_throttle(job_key, cancel)
+        
+        video_opts = {
+            'format': format_str,
+            'outtmpl': output_template,
+            'quiet': False,
+            'no_warnings': False,
+            'progress_hooks': [self.make_progress_hook(f"{task_prefix}:video", job_key, cancel)],
+            'cancel_token': cancel or self.cancel_token,
+            'ignoreerrors': False,
+            'nopostoverwrites': False,
+            'postprocessors': [],
+            'noplaylist': True,
+            'keepvideo': True,
+            **self.read_size_options(),
+            # Büyük görüntü akışı tek bağlantıda kısıtlanmasın diye bayt aralıklarıyla paralel indirilir
+            'segmented_download': segmented_options
+        }
+        
+        audio_opts = {
+            'format': audio_format_str,
+            'outtmpl': output_template,
+            'quiet': False,
+            'no_warnings': False,
+            'progress_hooks': [self.make_progress_hook(f"{task_prefix}:audio", job_key, cancel)],
+            'cancel_token': cancel or self.cancel_token,
+            'ignoreerrors': False,
+            'nopostoverwrites': False,
+            'postprocessors': [],
+            'noplaylist': True,
+            **self.read_size_options()
+        }
+        return video_opts, audio_opts
+    
+    def finish_download(self, postprocess, filepath, info, is_video, quality, notify_completion, cancel=None):
+        """Son işlemeyi çalıştırır ve tamamlanan dosyayı kaydeder (son işleme havuzunda çalışır); sonra öğe belirtecini bırakır"""
+        try:
+            if not self.run_postprocess(postprocess, info):
+                return False
+            
+            self.record_download(filepath, info, is_video, quality)
+            self.set_item_state(info, "done", partial_files=[])
+            
+            if notify_completion:
+                self.signals.progress.emit(100)
+                self.signals.finished.emit(os.path.basename(filepath), filepath, "")
+            return True
+        finally:
+            if cancel is not None:
+                self.end_item(cancel)
+    
+    def run_postprocess(self, postprocess, info):
+        """Son işlemeyi çalıştırır; hata veya iptalde öğeyi başarısız kaydeder ve False döndürür"""
+        try:
+            self.set_item_state(info, "merging")
+            postprocess()
+            return True
+        except DownloadCancelled:
+            self.set_item_state(info, "failed", partial_files=[], error=CANCELLED_ERROR)
+            return False
+        except Exception as e:
+            print(f"Post-processing error: {e}")
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+            self.set_item_state(info, "failed", error=str(e))
+            return False
+    
+    def record_download(self, filepath, info, is_video, quality, store=True):
+        """Tamamlanan dosyayı indirilenler listesine, arşive ve (store ise) içerik deposuna ekler"""
+        self.downloaded_files.append(filepath)
+        mode = "video" if is_video else "audio"
+        if self.use_archive:
+            self.get_archive().add(archive_key_from_entry(info), mode, quality, filepath)
+        content_store = self.content_store
+        if store and content_store is not None:
             try:
-                # İşlem iptal edildiyse çık
-                if not self.is_downloading:
-                    raise Exception("Download cancelled by user")
-                    
-                if 'downloaded_bytes' in d and 'total_bytes' in d and d['total_bytes'] > 0:
-                    p = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                    speed = d.get('speed', 0)
-                    if speed:
-                        speed_str = self.format_size(speed) + "/s"
-                        status_text = f"Downloading... {self.format_size(d['downloaded_bytes'])}/{self.format_size(d['total_bytes'])} ({speed_str})"
-                        self.signals.status.emit(status_text)
-                    self.signals.progress.emit(p)
-                elif 'downloaded_bytes' in d and 'total_bytes_estimate' in d and d['total_bytes_estimate'] > 0:
-                    p = (d['downloaded_bytes'] / d['total_bytes_estimate']) * 100
-                    speed = d.get('speed', 0)
-                    if speed:
-                        speed_str = self.format_size(speed) + "/s"
-                        status_text = f"Downloading... {self.format_size(d['downloaded_bytes'])}/{self.format_size(d['total_bytes_estimate'])} ({speed_str})"
-                        self.signals.status.emit(status_text)
-                    self.signals.progress.emit(p)
-                elif '_percent_str' in d:
-                    percent_str = d.get('_percent_str', '0%')
-                    status_text = f"Downloading... {percent_str} {d.get('_speed_str', '')}"
-                    self.signals.status.emit(status_text)
-                    
-                    percent_str = percent_str.replace('%', '').strip()
-                    try:
-                        p = float(percent_str)
-                        self.signals.progress.emit(p)
-                    except (ValueError, TypeError):
-                        pass
+                method, saved = content_store.add(archive_key_from_entry(info), mode, quality, filepath)
+            except OSError as e:
+                # Depo yazılamasa da indirilen dosya kullanılabilir
+                print(f"Content store error: {e}")
+                traceback.print_exc()
+                return
+            if method is not None:
+                self.metrics.increment('store_links_total', labels={'method': method}, context=self.file_context(filepath))
+            if saved:
+                self.metrics.increment('store_bytes_saved_total', saved, context=self.file_context(filepath))
+    
+    def downloaded_filepath(self, result):
+        """process_ie_result sonucundan indirilen dosyanın yolunu döndürür"""
+        if not isinstance(result, dict):
+            return None
+        downloads = result.get('requested_downloads') or []
+        return downloads[0].get('filepath') if downloads else None
+    
+    def convert_audio(self, source_path, mp3_path, bitrate, source_url, cancel=None, keep_source=False):
+        """İndirilen ses akışını mp3'e dönüştürür; keep_source verilmezse kaynak dosyayı siler"""
+        try:
+            if cancel is not None:
+                cancel.check()
+            # Kaynak URL'yi dosyaya göm, arşiv diskten yeniden oluşturulabilsin
+            with self.metrics.timer('phase_seconds', {'phase': 'transcode'}, self.file_context(mp3_path)):
+                convert_to_mp3(source_path, mp3_path, bitrate, metadata={'comment': source_url}, cancel=cancel)
+        except DownloadCancelled:
+            remove_files([source_path, mp3_path])
+            raise
+        if not keep_source:
+            os.remove(source_path)
+    
+    def merge_streams(self, video_path, audio_path, source_url, cancel=None, output_path=None):
+        """
+        İndirilen görüntü ve ses akışlarını tek bir dosyada birleştirir.
+        output_path verilmezse sonuç video_path'in yerine geçer ve akışlar silinir; verilirse akışlar korunur.
+        """
+        merged_path = output_path or os.path.splitext(video_path)[0] + "_merged.mp4"
+        try:
+            if cancel is not None:
+                cancel.check()
+            with self.metrics.timer('phase_seconds', {'phase': 'merge'}, self.file_context(output_path or video_path)):
+                merge_audio_video(video_path, audio_path, merged_path, metadata={'comment': source_url}, cancel=cancel)
+        except DownloadCancelled:
+            remove_files([video_path, audio_path, merged_path])
+            raise
+        except Exception as e:
+            # Yarım çıktı ve (başka çıktıların kaynağı değilse) tek başına oynatılamayan akışlar bırakılmaz
+            remove_files([merged_path] if output_path is not None else [video_path, audio_path, merged_path])
+            raise Exception(f"Video and audio merging error: {e}") from e
+        
+        if output_path is None and os.path.exists(merged_path):
+            os.remove(video_path)
+            os.remove(audio_path)
+            os.rename(merged_path, video_path)
+    
+    def file_context(self, path):
+        """Son işleme ölçümlerinin olay kaydına eklenen iş ve dosya bilgisi"""
+        return {'job': self.current_job, 'file': os.path.basename(path)}
+    
+    def create_ydl(self, ydl_opts):
+        """Motorun kullandığı tüm YoutubeDL örneklerini oluşturur"""
+        return segmented_youtube_dl_class()(self.session_options(ydl_opts))
+    
+    def session_options(self, ydl_opts):
+        """ydl_opts'a iptal belirtecini (verilmediyse oturumunkini), ölçüm bağlamını ve yeniden deneme sınırlarını ekler"""
+        cancel = ydl_opts.get('cancel_token') or self.cancel_token
+        return dict(
+            ydl_opts,
+            cancel_token=cancel,  # İptalde açık bağlantılar kesilir
+            metrics=self.metrics,
+            metrics_context={'job': self.current_job},
+            # Akış hataları download_stream'de yeniden denenir (sınır, bekleme, devre kesici); yt-dlp'nin varsayılan
+            # 10 denemesi bunun içinde katlanmasın. Eksik parça atlanmaz, hata yükselir ve akış kaldığı yerden sürer.
+            retries=0,
+            fragment_retries=0,
+            skip_unavailable_fragments=False,
+            # Bilgi çıkarma download_stream'den geçmez; sınırı aynı politikadan gelir
+            extractor_retries=self.retry_policy.limits[NETWORK],
+            retry_sleep_functions={'extractor': partial(self.retry_delay, 'extractor', cancel)}
+        )
+    
+    def prepare_info_for_download(self, info):
+        """Çözülmüş bilgi sözlüğünün önceki format seçiminden arındırılmış bir kopyasını döndürür"""
+        # yt-dlp işleme sırasında sözlüğü değiştirdiği için her akış kendi kopyasını alır
+        fresh_info = copy.deepcopy(info)
+        for key in ('requested_formats', 'requested_downloads', 'requested_subtitles',
+                    'filepath', '_filename', 'filename', '__postprocessors', '__files_to_move'):
+            fresh_info.pop(key, None)
+        return fresh_info
+    
+    def download_stream(self, ydl_opts, info):
+        """
+        Tek bir akışı indirir; işlenmiş bilgi sözlüğünü, özel video atlandıysa False döndürür.
+        Geçici hatalarda (bağlantı, 5xx, 403, 429) bekleyip yeniden dener; .part dosyası kaldığı yerden devam eder.
+        """
+        cancel = ydl_opts.get('cancel_token') or self.cancel_token
+        failures = {}
+        while True:
+            try:
+                self.wait_for_circuit(cancel)
+                result = self.fetch_stream(ydl_opts, info, cancel)
+                self.circuit.record_success()
+                return result
+            except DownloadCancelled:
+                raise
             except Exception as e:
-                print(f"Error calculating progress: {e}")
-        elif d['status'] == 'finished':
-            self.signals.progress.emit(100)
-            self.signals.status.emit("Processing... (Merging files)")
+                kind = classify_error(e)
+                if kind == UNAVAILABLE and self.skip_private:
+                    return False
+                if kind == RATE_LIMITED and self.circuit.record_failure():
+                    self.signals.status.emit(f"Server is rate limiting, pausing downloads for {self.circuit.remaining():.0f}s")
+                failures[kind] = failures.get(kind, 0) + 1
+                if not self.retry_policy.should_retry(kind, failures[kind]):
+                    raise
+                
+                delay = self.retry_policy.delay(failures[kind], kind)
+                self.metrics.increment('retries_total', labels={'kind': kind},
+                                       context={'job': self.current_job, 'item': info.get('id'), 'error': str(e)})
+                self.signals.status.emit(f"Download error ({kind}), retrying in {delay:.0f}s: {info.get('title', 'video')}")
+                if kind == FORBIDDEN:
+                    # 403 çoğunlukla akış adresinin süresi dolduğu için; bilgi yenilenir, format ve .part aynı kalır
+                    info = self.refresh_info(info)
+                if cancel.wait(delay):
+                    raise DownloadCancelled()
+    
+    def wait_for_circuit(self, cancel):
+        """Sunucu hız sınırladığı için devre açıksa kapanana kadar bekler"""
+        if self.circuit.remaining() > 0:
+            self.signals.status.emit(f"Waiting {self.circuit.remaining():.0f}s for the server rate limit to clear...")
+            self.circuit.wait(cancel)
+    
+    def refresh_info(self, info):
+        """Süresi dolmuş akış adresleri için videoyu önbelleği kullanmadan yeniden çözer"""
+        url = info.get('webpage_url') or info.get('original_url')
+        if not url:
+            return info
+        try:
+            with self.create_ydl(self.info_options(False)) as ydl:
+                fresh_info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            print(f"Could not refresh video information: {e}")
+            return info
+        if fresh_info is None:
+            return info
+        self.store_cached_info(url, fresh_info)
+        return fresh_info
+    
+    def fetch_stream(self, ydl_opts, info, cancel):
+        """download_stream'in tek denemesi; iptalde yarım dosyaları siler"""
+        result = None
+        try:
+            with self.create_ydl(ydl_opts) as ydl:
+                # İşlem iptal edildiyse çık
+                if not cancel.cancelled:
+                    # Sayfayı yeniden çıkarmak yerine elimizdeki bilgiyle format seçip indir
+                    result = ydl.process_ie_result(self.prepare_info_for_download(info), download=True)
+        except Exception:
+            if not cancel.cancelled:
+                raise
+        
+        if cancel.cancelled:
+            # Yarım kalan dosyalar bu oturumda devam ettirilmeyecek, iptal edilen akış bırakılmaz
+            self.remove_partial_downloads(ydl_opts['outtmpl'])
+            downloaded_path = self.downloaded_filepath(result)
+            if downloaded_path is not None:
+                remove_files([downloaded_path])
+            raise DownloadCancelled()
+        return result or True
+    
+    def remove_partial_downloads(self, output_template):
+        """Çıktı şablonuna ait yarım kalan indirme dosyalarını (.part ve devam durumu) siler"""
+        base = output_template.replace(".%(ext)s", "")
+        paths = []
+        for path in glob.glob(glob.escape(base) + ".*"):
+            # Yalnızca "<başlık>.<uzantı>.part" biçimi; başka bir başlığın dosyasına dokunma
+            _, _, suffix = path[len(base) + 1:].partition(".")
+            if suffix in PARTIAL_SUFFIXES:
+                paths.append(path)
+        remove_files(paths)
+    
+    def make_progress_hook(self, task_id, job_key=None, cancel=None):
+        """Bir akışın ilerlemesini toplayıcıya kaydeden ve hız sınırını uygulayan hook üretir"""
+        cancel = cancel or self.cancel_token
+        throttle = self.make_throttle(job_key, cancel)
+        last_downloaded = [None]
+        
+        def hook(d):
+            if d['status'] == 'downloading':
+                # İşlem iptal edildiyse çık
+                cancel.check()
+                
+                downloaded = d.get('downloaded_bytes', 0)
+                # Devam ettirilen indirmede önceden inen kısım sayılmaz; parçalı indirici sınırı kendisi uygular
+                if last_downloaded[0] is not None and not d.get('info_dict', {}).get('_segmented_size'):
+                    throttle(downloaded - last_downloaded[0])
+                last_downloaded[0] = downloaded
+                
+                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                speed = d.get('speed') or 0
+                self.progress.update(task_id, downloaded, total, speed)
+                self.tracker.update_task(task_id, downloaded, total, speed)
+            elif d['status'] == 'finished':
+                self.progress.finish_task(task_id)
+        return hook
     
     def format_size(self, size_bytes):
         if size_bytes < 0:
@@ -385,25 +1613,24 @@ class YouTubeDownloader:
         return filename
     
     def merge_video_audio(self, video_path, audio_path, output_path):
+        """Akışları birleştirir; ffmpeg ve yt-dlp ikisi de başaramazsa hata fırlatır (çağıran öğeyi başarısız saymalı)"""
+        self.signals.status.emit("Merging files...")
+        
         try:
-            self.signals.status.emit("Merging files...")
-            
-            cmd = f'ffmpeg -y -i "{video_path}" -i "{audio_path}" -c:v copy -c:a aac -map 0:v:0 -map 1:a:0 "{output_path}"'
-            
-            if not self._run_command(cmd):
-                self.signals.status.emit("ffmpeg merge failed, trying yt-dlp...")
-                cmd = f'yt-dlp -o "{output_path}" --audio-file "{audio_path}" "{video_path}"'
-                if not self._run_command(cmd):
-                    raise Exception("Both ffmpeg and yt-dlp merging failed")
-            
-            self.signals.status.emit("Merging completed.")
-            return True
-            
+            merge_audio_video(video_path, audio_path, output_path)
+            merged = True
         except Exception as e:
-            print(f"Video and audio merging error: {e}")
-            traceback.print_exc()
-            self.signals.error.emit(f"Video and audio merging error: {e}")
-            return False
+            print(f"Command error: {e}")
+            merged = False
+        
+        if not merged:
+            self.signals.status.emit("ffmpeg merge failed, trying yt-dlp...")
+            cmd = f'yt-dlp -o "{output_path}" --audio-file "{audio_path}" "{video_path}"'
+            if not self._run_command(cmd):
+                raise Exception("Video and audio merging error: both ffmpeg and yt-dlp merging failed")
+        
+        self.signals.status.emit("Merging completed.")
+        return True
     
     def _run_command(self, cmd):
         try:
@@ -0,0 +1,36 @@
+import threading
+
+
+class Event:
+    """pyqtSignal benzeri connect/emit arayüzüne sahip, arayüz kütüphanesinden bağımsız olay"""
+
+    def __init__(self):
+        self._callbacks = ()
+        self._lock = threading.Lock()
+
+    def connect(self, callback):
+        with self._lock:
+            self._callbacks = self._callbacks + (callback,)
+
+    def disconnect(self, callback):
+        with self._lock:
+            self._callbacks = tuple(cb for cb in self._callbacks if cb != callback)
+
+    def emit(self, *args):
+        # Dinleyiciler yayını yapan iş parçacığında çağrılır
+        for callback in self._callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Event callback error: {e}")
+
+
+class DownloadSignals:
+    """İndirme motorunun yayınladığı olaylar; Qt arayüzü bunları kendi sinyallerine bağlar"""
+
+    def __init__(self):
+        self.progress = Event()  # yüzde (float)
+        self.finished = Event()  # dosya adı, dosya yolu, küçük resim yolu
+        self.error = Event()  # hata mesajı
+        self.status = Event()  # durum metni
+        self.playlist_progress = Event()  # tamamlanan, devam eden, toplam
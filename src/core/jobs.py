@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .cache import CACHE_DIRECTORY, normalize_url
+from .bandwidth import PRIORITY_NORMAL
+from .cancel import CANCELLED_ERROR
+
+JOBS_FILENAME = "jobs.sqlite3"
+JOB_STATES = ("queued", "extracting", "downloading", "merging", "done", "failed")
+ACTIVE_STATES = ("extracting", "downloading", "merging")
+FINISHED_STATES = ("done", "failed")
+# Bekleyen işlerin sırası; konum kullanıcı sırayı değiştirmediyse kimliktir
+QUEUE_ORDER = "priority DESC, COALESCE(position, id), id"
+SYNC_WINDOW = 500  # Eşitlenen liste başına hatırlanan en yeni öğe sayısı
+# Çalışan işin sahibi süreç kaydını bu aralıkla yeniler; yenilenmeyen iş sahipsiz sayılıp yeniden kuyruğa alınır
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 15
+
+
+def process_alive(pid):
+    """Aynı makinede pid'li süreç çalışıyor mu; bilinemiyorsa (Windows) True"""
+    if os.name == 'nt':
+        # Windows'ta os.kill(pid, 0) süreci sonlandırır; yalnızca kira süresine güvenilir
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """İndirme işlerini ve öğe durumlarını süreç çökse bile kaybolmayacak şekilde SQLite'ta tutar"""
+
+    def __init__(self, directory=CACHE_DIRECTORY):
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, JOBS_FILENAME)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # WAL: her durum değişikliği ucuz bir ekleme, yarım kalan yazma dosyayı bozmaz
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, is_video INTEGER NOT NULL, "
+            "quality TEXT NOT NULL, is_playlist INTEGER NOT NULL, directory TEXT NOT NULL, "
+            "state TEXT NOT NULL, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            f"priority INTEGER NOT NULL DEFAULT {PRIORITY_NORMAL})"
+        )
+        # Öncelik, çıktı, konum, eşitleme ve sahiplik sütunları sonradan eklendi, eski kuyruk dosyalarını güncelle
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")]
+        if 'priority' not in columns:
+            self.connection.execute(f"ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT {PRIORITY_NORMAL}")
+        if 'outputs' not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN outputs TEXT")
+        if 'position' not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN position INTEGER")
+        if 'sync' not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN sync INTEGER NOT NULL DEFAULT 0")
+        if 'owner' not in columns:
+            # Kuyruk dosyası arayüz, servis ve komut satırı arasında paylaşılır; işi çalıştıran süreç ve son yenileme
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "job_id INTEGER NOT NULL, item_key TEXT NOT NULL, title TEXT, state TEXT NOT NULL, "
+            "partial_files TEXT, error TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (job_id, item_key))"
+        )
+        # Eşitleme modundaki listelerin son görülen öğeleri ve yeniden denenecek öğeleri
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "url TEXT PRIMARY KEY, seen TEXT NOT NULL, retry TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority, id)")
+        self.connection.commit()
+
+    def add(self, url, is_video, quality, is_playlist, directory, priority=PRIORITY_NORMAL, outputs=None, sync=False,
+            claim=False):
+        """
+        Yeni işi kuyruğa ekler ve kimliğini döndürür.
+        outputs: tek kaynaktan üretilecek (is_video, kalite) çıktıları; None ise yalnızca is_video/quality
+        sync: listenin yalnızca son eşitlemeden sonra eklenen öğeleri indirilir
+        claim: iş bu süreç tarafından hemen çalıştırılacak; başka bir sürecin kuyruk işleyicisi onu almaz
+        """
+        now = time.time()
+        encoded_outputs = json.dumps([[bool(v), q] for v, q in outputs]) if outputs else None
+        state, owner, heartbeat = ("extracting", os.getpid(), now) if claim else ("queued", None, None)
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (url, is_video, quality, is_playlist, directory, state, created_at, updated_at, "
+                "priority, outputs, sync, owner, heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, int(bool(is_video)), quality, int(bool(is_playlist)), directory, state, now, now, priority,
+                 encoded_outputs, int(bool(sync)), owner, heartbeat)
+            )
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def next_job(self):
+        """Sıradaki bekleyen işi döndürür (önce yüksek öncelikliler), yoksa None"""
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT * FROM jobs WHERE state='queued' ORDER BY {QUEUE_ORDER} LIMIT 1"
+            ).fetchone()
+        return self._job(row)
+
+    def claim_next(self):
+        """
+        Sıradaki bekleyen işi bu süreç adına alır ve döndürür, bekleyen iş yoksa None.
+        Aynı kuyruğu kullanan başka bir süreç işi önce aldıysa sıradakine geçilir.
+        """
+        while True:
+            job = self.next_job()
+            if job is None or self.claim(job['id']):
+                return self.get(job['id']) if job is not None else None
+
+    def claim(self, job_id):
+        """Bekleyen işi tek adımda bu sürece bağlar; iş artık bekliyor değilse False döndürür"""
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET state='extracting', owner=?, heartbeat=?, updated_at=? WHERE id=? AND state='queued'",
+                (os.getpid(), now, now, job_id)
+            )
+            self.connection.commit()
+            return cursor.rowcount > 0
+
+    def heartbeat(self, job_id):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET heartbeat=? WHERE id=? AND owner=?", (time.time(), job_id, os.getpid())
+            )
+            self.connection.commit()
+
+    @contextmanager
+    def lease(self, job_id):
+        """İş çalıştığı sürece sahiplik kaydını arka planda yeniler"""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(HEARTBEAT_SECONDS):
+                try:
+                    self.heartbeat(job_id)
+                except sqlite3.Error as e:
+                    print(f"Job heartbeat error: {e}")
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+
+    def queued_jobs(self):
+        """Bekleyen işleri çalışacakları sırayla döndürür"""
+        with self.lock:
+            rows = self.connection.execute(f"SELECT * FROM jobs WHERE state='queued' ORDER BY {QUEUE_ORDER}").fetchall()
+        return [self._job(row) for row in rows]
+
+    def move(self, job_id, offset):
+        """
+        Bekleyen işi kuyrukta offset kadar (-1 öne, 1 geriye) taşır; yer değiştirdiği işin kimliğini,
+        taşınamıyorsa None döndürür. İşler sıra anahtarlarını (öncelik, konum) değiştirir.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT id, priority, COALESCE(position, id) FROM jobs WHERE state='queued' ORDER BY {QUEUE_ORDER}"
+            ).fetchall()
+            ids = [row[0] for row in rows]
+            if job_id not in ids:
+                return None
+            index = ids.index(job_id)
+            target = index + offset
+            if not 0 <= target < len(rows):
+                return None
+            moved, other = rows[index], rows[target]
+            self.connection.execute("UPDATE jobs SET priority=?, position=? WHERE id=?", (other[1], other[2], moved[0]))
+            self.connection.execute("UPDATE jobs SET priority=?, position=? WHERE id=?", (moved[1], moved[2], other[0]))
+            self.connection.commit()
+            return other[0]
+
+    def cancel(self, job_id):
+        """Henüz başlamamış işi iptal eder; iş bekliyor değilse False döndürür"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET state='failed', error=?, updated_at=? WHERE id=? AND state='queued'",
+                (CANCELLED_ERROR, time.time(), job_id)
+            )
+            self.connection.commit()
+            return cursor.rowcount > 0
+
+    def set_state(self, job_id, state, error=None):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET state=?, error=?, updated_at=? WHERE id=?",
+                (state, error, time.time(), job_id)
+            )
+            self.connection.commit()
+
+    def recover(self):
+        """
+        Önceki çalışmada yarıda kalan işleri yeniden kuyruğa alır, bekleyen iş sayısını döndürür.
+        Yalnızca sahibi artık çalışmayan veya kirası dolan işler alınır; başka bir süreçte süren iş dokunulmadan kalır.
+        """
+        now = time.time()
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT id, owner, heartbeat FROM jobs WHERE state IN ({', '.join('?' * len(ACTIVE_STATES))})",
+                ACTIVE_STATES
+            ).fetchall()
+            for job_id, owner, heartbeat in rows:
+                # Pid yeniden kullanılmış olabilir; süreç yaşıyor görünse de kirası dolan iş sahipsizdir
+                leased = heartbeat is not None and now - heartbeat < LEASE_SECONDS
+                if owner is not None and leased and process_alive(owner):
+                    continue
+                self.connection.execute(
+                    "UPDATE jobs SET state='queued', owner=NULL, heartbeat=NULL, updated_at=? WHERE id=?", (now, job_id)
+                )
+            self.connection.commit()
+            return self.connection.execute("SELECT COUNT(*) FROM jobs WHERE state='queued'").fetchone()[0]
+
+    def list_jobs(self, limit=100):
+        """En yeni işleri döndürür"""
+        with self.lock:
+            rows = self.connection.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def set_item_state(self, job_id, item_key, state, title=None, partial_files=None, error=None):
+        """Öğe durumunu kaydeder; verilmeyen başlık ve kısmi dosya listesi korunur"""
+        if job_id is None or item_key is None:
+            return
+        partial = json.dumps(partial_files) if partial_files is not None else None
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO items (job_id, item_key, title, state, partial_files, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_id, item_key) DO UPDATE SET "
+                "title=COALESCE(excluded.title, title), state=excluded.state, "
+                "partial_files=COALESCE(excluded.partial_files, partial_files), "
+                "error=excluded.error, updated_at=excluded.updated_at",
+                (job_id, item_key, title, state, partial, error, time.time())
+            )
+            self.connection.commit()
+
+    def item_state(self, job_id, item_key):
+        if job_id is None or item_key is None:
+            return None
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT state FROM items WHERE job_id=? AND item_key=?", (job_id, item_key)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def items(self, job_id):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM items WHERE job_id=? ORDER BY updated_at", (job_id,)
+            ).fetchall()
+        items = []
+        for row in rows:
+            item = dict(row)
+            item['partial_files'] = json.loads(item['partial_files']) if item['partial_files'] else []
+            items.append(item)
+        return items
+
+    def sync_state(self, url):
+        """Listenin son eşitlemede görülen öğe anahtarlarını (en yeni önce) ve yeniden denenecek öğeleri döndürür"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT seen, retry FROM sync_state WHERE url=?", (normalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return [], []
+        return json.loads(row['seen']), json.loads(row['retry'])
+
+    def set_sync_state(self, url, seen, retry):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (url, seen, retry, updated_at) VALUES (?, ?, ?, ?)",
+                (normalize_url(url), json.dumps(seen[:SYNC_WINDOW]), json.dumps(retry), time.time())
+            )
+            self.connection.commit()
+
+    def remove_finished(self):
+        """Tamamlanmış ve başarısız işleri öğeleriyle birlikte siler"""
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM items WHERE job_id IN (SELECT id FROM jobs WHERE state IN (?, ?))", FINISHED_STATES
+            )
+            self.connection.execute("DELETE FROM jobs WHERE state IN (?, ?)", FINISHED_STATES)
+            self.connection.commit()
+
+    def _job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['is_video'] = bool(job['is_video'])
+        job['is_playlist'] = bool(job['is_playlist'])
+        job['sync'] = bool(job['sync'])
+        job['outputs'] = [tuple(output) for output in json.loads(job['outputs'])] if job['outputs'] else None
+        return job
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,150 @@
+import asyncio
+import subprocess
+
+# mp4 kabının yeniden kodlama olmadan taşıyabildiği kodekler
+MP4_VIDEO_COPY_CODECS = ('h264', 'hevc', 'av1', 'vp9', 'mpeg4')
+MP4_AUDIO_COPY_CODECS = ('aac', 'mp3', 'alac', 'ac3', 'eac3', 'opus', 'flac')
+
+
+def build_probe_command(path, stream_type):
+    return ['ffprobe', '-v', 'error', '-select_streams', f'{stream_type}:0',
+            '-show_entries', 'stream=codec_name', '-of', 'default=noprint_wrappers=1:nokey=1', path]
+
+
+def parse_probe_output(output):
+    output = output.strip()
+    return output.splitlines()[0] if output else None
+
+
+def run_command(cmd, cancel=None):
+    """
+    Komutu çalıştırır; (dönüş kodu, stdout, stderr) döndürür.
+    cancel belirteci iptal edilirse süreç hemen öldürülür ve DownloadCancelled fırlatılır.
+    """
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if cancel is None:
+        stdout, stderr = process.communicate()
+        return process.returncode, stdout, stderr
+    # Yarım kalan çıktı zaten silineceği için ffmpeg'in düzgün kapanması beklenmez
+    with cancel.on_cancel(process.kill):
+        stdout, stderr = process.communicate()
+    cancel.check()
+    return process.returncode, stdout, stderr
+
+
+def probe_codec(path, stream_type, cancel=None):
+    """Dosyadaki ilk görüntü ('v') veya ses ('a') akışının kodek adını döndürür, bulunamazsa None"""
+    try:
+        returncode, stdout, _ = run_command(build_probe_command(path, stream_type), cancel)
+    except OSError:
+        return None
+    if returncode != 0:
+        return None
+    return parse_probe_output(stdout)
+
+
+def build_merge_command(video_path, audio_path, output_path, copy_video=True, copy_audio=True, metadata=None):
+    """Görüntü ve ses dosyalarını mp4 içinde birleştiren ffmpeg komutunu oluşturur"""
+    cmd = ['ffmpeg', '-y', '-i', video_path, '-i', audio_path,
+           '-c:v', 'copy' if copy_video else 'libx264',
+           '-c:a', 'copy' if copy_audio else 'aac',
+           '-map', '0:v:0', '-map', '1:a:0']
+    for key, value in (metadata or {}).items():
+        cmd.extend(['-metadata', f'{key}={value}'])
+    cmd.append(output_path)
+    return cmd
+
+
+def build_merge_commands(video_path, audio_path, output_path, video_codec, audio_codec, metadata=None):
+    """
+    Birleştirme komutunu ve kopyalama reddedilirse denenecek yeniden kodlama komutunu (yoksa None) döndürür.
+    Kopyalanabilir görünen kodek de (ör. eski ffmpeg'de mp4 içinde opus/vp9) reddedilebileceği için
+    kopyalama yapan her komutun ardından yeniden kodlama denenir.
+    """
+    copy_video = video_codec is None or video_codec in MP4_VIDEO_COPY_CODECS
+    copy_audio = audio_codec is None or audio_codec in MP4_AUDIO_COPY_CODECS
+    command = build_merge_command(video_path, audio_path, output_path, copy_video, copy_audio, metadata)
+
+    fallback = None
+    if copy_video or copy_audio:
+        fallback = build_merge_command(video_path, audio_path, output_path, copy_video=False, copy_audio=False,
+                                       metadata=metadata)
+    return command, fallback
+
+
+def build_mp3_command(input_path, output_path, bitrate, source_codec, metadata=None):
+    codec_args = ['-c:a', 'copy'] if source_codec == 'mp3' else ['-c:a', 'libmp3lame', '-b:a', f'{bitrate}k']
+    cmd = ['ffmpeg', '-y', '-i', input_path, '-vn', *codec_args]
+    for key, value in (metadata or {}).items():
+        cmd.extend(['-metadata', f'{key}={value}'])
+    cmd.append(output_path)
+    return cmd
+
+
+def merge_audio_video(video_path, audio_path, output_path, metadata=None, cancel=None):
+    """Akışları mümkünse kopyalayarak (yeniden kodlamadan) birleştirir"""
+    command, fallback = build_merge_commands(
+        video_path, audio_path, output_path,
+        probe_codec(video_path, 'v', cancel), probe_codec(audio_path, 'a', cancel), metadata
+    )
+    returncode, _, stderr = run_command(command, cancel)
+    if returncode != 0 and fallback is not None:
+        returncode, _, stderr = run_command(fallback, cancel)
+    if returncode != 0:
+        raise Exception(f"ffmpeg error: {stderr}")
+
+
+def convert_to_mp3(input_path, output_path, bitrate, metadata=None, cancel=None):
+    """Ses dosyasını verilen bit hızında (kbps) mp3'e dönüştürür; kaynak zaten mp3 ise kopyalar"""
+    cmd = build_mp3_command(input_path, output_path, bitrate, probe_codec(input_path, 'a', cancel), metadata)
+    returncode, _, stderr = run_command(cmd, cancel)
+    if returncode != 0:
+        raise Exception(f"ffmpeg error: {stderr}")
+
+
+async def run_async(cmd):
+    """Komutu olay döngüsünü bloklamadan çalıştırır; (dönüş kodu, stdout, stderr) döndürür"""
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # İptal edilen görevin ffmpeg süreci arkada çalışmaya devam etmesin
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    return process.returncode, stdout.decode(errors='replace'), stderr.decode(errors='replace')
+
+
+async def probe_codec_async(path, stream_type):
+    """probe_codec'in asyncio karşılığı"""
+    try:
+        returncode, stdout, _ = await run_async(build_probe_command(path, stream_type))
+    except OSError:
+        return None
+    if returncode != 0:
+        return None
+    return parse_probe_output(stdout)
+
+
+async def merge_audio_video_async(video_path, audio_path, output_path, metadata=None):
+    """merge_audio_video'nun asyncio karşılığı"""
+    video_codec, audio_codec = await asyncio.gather(
+        probe_codec_async(video_path, 'v'), probe_codec_async(audio_path, 'a')
+    )
+    command, fallback = build_merge_commands(video_path, audio_path, output_path, video_codec, audio_codec, metadata)
+    returncode, _, stderr = await run_async(command)
+    if returncode != 0 and fallback is not None:
+        returncode, _, stderr = await run_async(fallback)
+    if returncode != 0:
+        raise Exception(f"ffmpeg error: {stderr}")
+
+
+async def convert_to_mp3_async(input_path, output_path, bitrate, metadata=None):
+    """convert_to_mp3'ün asyncio karşılığı"""
+    source_codec = await probe_codec_async(input_path, 'a')
+    returncode, _, stderr = await run_async(build_mp3_command(input_path, output_path, bitrate, source_codec, metadata))
+    if returncode != 0:
+        raise Exception(f"ffmpeg error: {stderr}")
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+from .events import Event
+
+PREFIX = "ytdownloader_"
+TIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)  # Saniye
+THROUGHPUT_BUCKETS = tuple(2 ** power * 1024 for power in range(6, 18, 2))  # 64 KB/s - 128 MB/s
+
+# İsim -> (tür, açıklama, histogram aralıkları)
+DEFINITIONS = {
+    'phase_seconds': ('histogram', "Time spent in each pipeline phase", TIME_BUCKETS),
+    'transfer_seconds': ('histogram', "Duration of each stream transfer", TIME_BUCKETS),
+    'transfer_throughput_bytes': ('histogram', "Average throughput of each stream transfer in bytes per second",
+                                  THROUGHPUT_BUCKETS),
+    'bytes_written_total': ('counter', "Bytes downloaded and written to disk", None),
+    'retries_total': ('counter', "Retried network requests", None),
+    'store_links_total': ('counter', "Files linked into or out of the content store, by method", None),
+    'store_bytes_saved_total': ('counter', "Bytes of duplicate downloads replaced by links to the content store", None),
+}
+
+
+class Histogram:
+    """Birikimli aralık sayılarını, toplamı ve gözlem sayısını tutar"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(üst sınır, birikimli sayı) çiftleri; son sınır +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """
+    İndirme hattının sayaçları ve histogramları.
+    Her ölçüm ayrıca recorded olayıyla yayınlanır (örn. JSON satırları günlüğü); context yalnızca olaya eklenir,
+    toplamlara girmez, böylece yavaş bir işin hangi aşamada yavaşladığı izlenebilir.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (isim, etiketler) -> değer
+        self.histograms = {}  # (isim, etiketler) -> Histogram
+        self.recorded = Event()  # ölçüm kaydı (sözlük)
+
+    def increment(self, name, amount=1, labels=None, context=None):
+        key = (name, self._labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        self._emit('counter', name, amount, labels, context)
+
+    def observe(self, name, value, labels=None, context=None):
+        key = (name, self._labels(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self._definition(name)[2] or TIME_BUCKETS)
+            histogram.observe(value)
+        self._emit('histogram', name, value, labels, context)
+
+    @contextmanager
+    def timer(self, name, labels=None, context=None):
+        """Blok süresini saniye olarak gözlemler; blok hata fırlatsa da ölçülür"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels, context)
+
+    def _labels(self, labels):
+        return tuple(sorted((labels or {}).items()))
+
+    def _definition(self, name):
+        return DEFINITIONS.get(name, ('counter', "", None))
+
+    def _emit(self, kind, name, value, labels, context):
+        self.recorded.emit({
+            'time': time.time(),
+            'type': kind,
+            'name': PREFIX + name,
+            'value': value,
+            'labels': dict(labels or {}),
+            **({'context': context} if context else {})
+        })
+
+    def snapshot(self):
+        """Toplamların JSON'a yazılabilir kopyası"""
+        with self.lock:
+            counters = [
+                {'name': PREFIX + name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {'name': PREFIX + name, 'labels': dict(labels), 'count': histogram.count, 'sum': histogram.sum,
+                 'buckets': [[bound if bound != float('inf') else "+Inf", count] for bound, count in histogram.cumulative()]}
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ]
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self):
+        """Toplamları Prometheus metin biçiminde döndürür"""
+        with self.lock:
+            series = {}
+            for (name, labels), value in self.counters.items():
+                series.setdefault(name, []).append((labels, value))
+            for (name, labels), histogram in self.histograms.items():
+                series.setdefault(name, []).append((labels, (histogram.cumulative(), histogram.sum, histogram.count)))
+
+            lines = []
+            for name in sorted(series):
+                kind, help_text, _ = self._definition(name)
+                full_name = PREFIX + name
+                if help_text:
+                    lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in sorted(series[name]):
+                    if kind != 'histogram':
+                        lines.append(f"{full_name}{format_labels(labels)} {format_value(value)}")
+                        continue
+                    buckets, total, count = value
+                    for bound, bucket_count in buckets:
+                        le = "+Inf" if bound == float('inf') else format_value(bound)
+                        lines.append(f"{full_name}_bucket{format_labels(labels + (('le', le),))} {bucket_count}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {format_value(total)}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Prometheus textfile toplayıcısı için dosyaya yazar; yarım dosya okunmasın diye önce geçici dosyaya yazılır"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+
+class JsonLinesWriter:
+    """Metrics.recorded olayına bağlanır ve her ölçümü dosyaya bir JSON satırı olarak ekler"""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line + "\n")
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
@@ -0,0 +1,61 @@
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+def default_postprocess_workers():
+    """Son işleme havuzu için varsayılan işçi sayısı (çekirdek sayısı)"""
+    return max(1, os.cpu_count() or 1)
+
+
+class PostProcessingPool:
+    """
+    İndirme işçilerinden bağımsız çalışan son işleme (ffmpeg) havuzu.
+    Asıl işlem ayrı ffmpeg süreçlerinde yapıldığından havuz iş parçacıklarıyla yönetilir.
+    Bekleyen iş sayısı sınırlıdır; havuz dolunca submit bekler, böylece geçici dosyalar birikmez.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or default_postprocess_workers()
+        self.max_pending = max_pending or self.workers * 2
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="postprocess")
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.condition = threading.Condition()
+        self.pending = 0
+
+    def submit(self, job):
+        """İşi kuyruğa ekler; kuyruk doluysa yer açılana kadar bekler"""
+        self.slots.acquire()
+        with self.condition:
+            self.pending += 1
+        try:
+            return self.executor.submit(self._run, job)
+        except Exception:
+            self._release()
+            raise
+
+    def join(self):
+        """Kuyruktaki tüm işler bitene kadar bekler"""
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+
+    def _run(self, job):
+        try:
+            return job()
+        except Exception as e:
+            print(f"Post-processing error: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            self._release()
+
+    def _release(self):
+        self.slots.release()
+        with self.condition:
+            self.pending -= 1
+            self.condition.notify_all()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,175 @@
+import os
+import shutil
+import threading
+
+from .cancel import DownloadCancelled
+
+DEFAULT_MIN_FREE = 256 * 1024 * 1024  # İndirmeler başladıktan sonra da diskte boş kalması istenen alan
+MB = 1024 * 1024
+
+
+class InsufficientDiskSpace(Exception):
+    """İndirme klasöründe tahmini boyut için yeterli boş alan yok"""
+
+    def __init__(self, needed, available, directory):
+        self.needed = needed
+        self.available = available
+        self.directory = directory
+        super().__init__(
+            f"Not enough disk space in {directory}: needs about {needed / MB:.0f} MB, "
+            f"only {max(0, available) / MB:.0f} MB available"
+        )
+
+
+def estimate_format_size(fmt, duration=None):
+    """Biçimin bayt cinsinden boyutu: kesin boyut, yaklaşık boyut veya bit hızı × süre; bilinmiyorsa None"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    bitrate = fmt.get('tbr') or (fmt.get('vbr') or 0) + (fmt.get('abr') or 0)
+    duration = fmt.get('duration') or duration
+    if bitrate and duration:
+        return int(bitrate * 1000 / 8 * duration)
+    return None
+
+
+def select_formats(ydl, info, format_spec):
+    """format_spec için yt-dlp'nin seçeceği biçimleri döndürür (indirme sırasında yapılan seçimin aynısı)"""
+    formats = info.get('formats')
+    if not formats:
+        return [info]
+    selector = ydl.build_format_selector(format_spec)
+    selected = []
+    for fmt in selector({
+        'formats': formats,
+        'has_merged_format': any('none' not in (f.get('acodec'), f.get('vcodec')) for f in formats),
+        'incomplete_formats': (all(f.get('vcodec') == 'none' for f in formats)
+                               or all(f.get('acodec') == 'none' for f in formats)),
+    }):
+        selected.extend(fmt.get('requested_formats') or [fmt])
+    return selected
+
+
+def estimate_stream_size(ydl, info, format_spec):
+    """Bir akışın tahmini boyutu; biçim seçilemiyor veya boyutu bilinmiyorsa None"""
+    try:
+        formats = select_formats(ydl, info, format_spec)
+    except Exception as e:
+        print(f"Format selection error: {e}")
+        return None
+    sizes = [estimate_format_size(fmt, info.get('duration')) for fmt in formats]
+    if not sizes or None in sizes:
+        return None
+    return sum(sizes)
+
+
+def estimate_mp3_size(bitrate, duration):
+    """bitrate kbps ve duration saniye için mp3 dosyasının tahmini boyutu"""
+    if not duration:
+        return None
+    return int(int(bitrate) * 1000 / 8 * duration)
+
+
+def free_space(directory):
+    return shutil.disk_usage(directory).free
+
+
+class DiskBudget:
+    """
+    Boş disk alanını aynı anda çalışan öğeler arasında paylaştırır.
+    Her öğe başlamadan önce en yüksek tahmini kullanımını (kaynak akışlar + birleştirme/dönüştürme çıktıları) ayırır,
+    ayrılan alan öğe son işleme dahil bitince bırakılır. Başka öğelerin ayırdığı alan yüzünden yer yoksa
+    öğe onların bitmesini bekler; hiçbir ayırma yokken de yer yoksa hemen InsufficientDiskSpace fırlatılır.
+    """
+
+    def __init__(self, min_free=DEFAULT_MIN_FREE):
+        self.min_free = min_free
+        self.condition = threading.Condition()
+        self.reserved = {}  # dosya sistemi (st_dev) -> ayrılmış bayt
+
+    def set_min_free(self, min_free):
+        with self.condition:
+            self.min_free = max(0, min_free)
+            self.condition.notify_all()
+
+    def available(self, directory):
+        """Ayrılmış alan ve boş bırakılacak pay düşüldükten sonra kalan alan"""
+        with self.condition:
+            return free_space(directory) - self.min_free - self.reserved.get(os.stat(directory).st_dev, 0)
+
+    def acquire(self, directory, size, cancel=None, on_wait=None):
+        """size bayt ayırır ve release'e verilecek kaydı döndürür; beklemek gerekirse önce on_wait çağrılır"""
+        device = os.stat(directory).st_dev
+        if cancel is None:
+            with self.condition:
+                return self._acquire(directory, device, size, cancel, on_wait)
+        # İptalde bekleyen öğe hemen uyanır
+        with cancel.on_cancel(self._wake):
+            with self.condition:
+                return self._acquire(directory, device, size, cancel, on_wait)
+
+    def _acquire(self, directory, device, size, cancel, on_wait):
+        waiting = False
+        while True:
+            if cancel is not None and cancel.cancelled:
+                raise DownloadCancelled()
+            available = free_space(directory) - self.min_free
+            held = self.reserved.get(device, 0)
+            if size <= available - held:
+                self.reserved[device] = held + size
+                return (device, size)
+            if held == 0:
+                raise InsufficientDiskSpace(size, available, directory)
+            if not waiting and on_wait is not None:
+                on_wait()
+            waiting = True
+            # Diğer öğeler bitip alanlarını bırakınca yeniden denenir; boş alan dışarıdan da artabilir
+            self.condition.wait(5)
+
+    def release(self, reservation):
+        if reservation is None:
+            return
+        device, size = reservation
+        with self.condition:
+            remaining = self.reserved.get(device, 0) - size
+            if remaining > 0:
+                self.reserved[device] = remaining
+            else:
+                self.reserved.pop(device, None)
+            self.condition.notify_all()
+
+    def _wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
+
+class PlaylistProjection:
+    """
+    İndirilen liste öğelerinin ortalama boyutundan listenin kalanının kaplayacağı alanı tahmin eder.
+    Arşivde bulunan veya atlanan öğelerin oranı da hesaba katılır, böylece tekrar çalıştırılan liste yanlış uyarı vermez.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.lock = threading.Lock()
+        self.started = 0  # sırası gelen öğeler (atlananlar dahil)
+        self.count = 0  # boyutu tahmin edilen öğeler
+        self.size = 0
+        self.warned = False
+
+    def start(self):
+        with self.lock:
+            self.started += 1
+
+    def add(self, size):
+        with self.lock:
+            self.count += 1
+            self.size += size
+
+    def remaining_size(self):
+        """Sırası henüz gelmemiş öğelerin tahmini toplam boyutu; liste uzunluğu bilinmiyorsa 0"""
+        with self.lock:
+            if not self.total or not self.count:
+                return 0
+            share = self.count / max(self.started, self.count)
+            return int(self.size / self.count * share * max(0, self.total - self.started))
@@ -0,0 +1,98 @@
+import threading
+
+
+class ProgressAggregator:
+    """yt-dlp ilerleme bildirimlerini toplar ve sabit aralıklarla tek bir özet olarak yayınlar"""
+
+    def __init__(self, signals, format_size, interval=0.1):
+        self.signals = signals
+        self.format_size = format_size
+        self.interval = interval  # Saniye; 0.1 saniye = 10 Hz
+        self.lock = threading.Lock()
+        self.tasks = {}  # görev kimliği -> [indirilen bayt, toplam bayt, hız, bitti mi]
+        self.dirty = False
+        self.last_progress = None
+        self.last_status = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Yayın iş parçacığını başlatır"""
+        with self.lock:
+            self.tasks.clear()
+            self.dirty = False
+            self.last_progress = None
+            self.last_status = None
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Yayını durdurur, bekleyen son durumu gönderir"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        self.publish()
+
+    def update(self, task_id, downloaded, total, speed):
+        # Sadece sayıları kaydet; biçimlendirme yayın sırasında bir kez yapılır
+        with self.lock:
+            self.tasks[task_id] = [downloaded, total, speed, False]
+            self.dirty = True
+
+    def finish_task(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                size = max(task[0], task[1])
+                self.tasks[task_id] = [size, size, 0, True]
+            else:
+                self.tasks[task_id] = [0, 0, 0, True]
+            self.dirty = True
+
+    def remove_tasks(self, task_ids):
+        """Tamamlanan öğenin görevlerini toplam ilerlemeden çıkarır"""
+        with self.lock:
+            for task_id in task_ids:
+                self.tasks.pop(task_id, None)
+            self.dirty = True
+
+    def publish(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            tasks = list(self.tasks.values())
+
+        if not tasks:
+            return
+
+        downloaded_sum = sum(task[0] for task in tasks)
+        total_sum = sum(task[1] for task in tasks)
+        speed_sum = sum(task[2] for task in tasks)
+        active = sum(1 for task in tasks if not task[3])
+
+        if total_sum > 0:
+            progress = min(100.0, (downloaded_sum / total_sum) * 100)
+            if progress != self.last_progress:
+                self.last_progress = progress
+                self.signals.progress.emit(progress)
+
+        if active:
+            status_text = f"Downloading... {self.format_size(downloaded_sum)}/{self.format_size(total_sum)}"
+            if speed_sum:
+                status_text += f" ({self.format_size(speed_sum)}/s)"
+        else:
+            status_text = "Processing... (Merging files)"
+
+        if status_text != self.last_status:
+            self.last_status = status_text
+            self.signals.status.emit(status_text)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"Error publishing progress: {e}")
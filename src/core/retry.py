@@ -0,0 +1,175 @@
+import re
+import time
+import errno
+import random
+import socket
+import threading
+import http.client
+
+from .cancel import DownloadCancelled
+
+# Hata sınıfları
+NETWORK = "network"  # Bağlantı koptu, zaman aşımı, eksik veri
+SERVER = "server"  # HTTP 5xx
+FORBIDDEN = "forbidden"  # HTTP 403; YouTube'da çoğunlukla süresi dolmuş akış adresi
+RATE_LIMITED = "rate_limited"  # HTTP 429 veya bot doğrulaması
+UNAVAILABLE = "unavailable"  # Özel, silinmiş veya oturum açma gerektiren video
+CANCELLED = "cancelled"
+PERMANENT = "permanent"  # Yeniden denemenin işe yaramayacağı diğer hatalar
+
+# Sınıf başına en fazla yeniden deneme sayısı
+DEFAULT_LIMITS = {NETWORK: 3, SERVER: 3, FORBIDDEN: 2, RATE_LIMITED: 4}
+# Sınıf başına (ilk bekleme, en uzun bekleme) saniye
+DEFAULT_BACKOFF = {NETWORK: (1, 30), SERVER: (2, 60), FORBIDDEN: (1, 10), RATE_LIMITED: (15, 300)}
+
+HTTP_STATUS_PATTERN = re.compile(r"HTTP Error (\d{3})")
+NETWORK_ERRNOS = (errno.ECONNRESET, errno.ECONNABORTED, errno.ECONNREFUSED, errno.ETIMEDOUT, errno.EPIPE,
+                  errno.ENETUNREACH, errno.EHOSTUNREACH, errno.ENETDOWN)
+NETWORK_ERROR_NAMES = ("TransportError", "IncompleteRead", "ContentTooShortError")
+NETWORK_MESSAGES = ("timed out", "connection reset", "remote end closed", "connection aborted",
+                    "did not get any data blocks", "incomplete read", "temporary failure in name resolution",
+                    "bytes, expected")  # yt-dlp ContentTooShortError iletisi: bağlantı aktarım ortasında koptu
+RATE_LIMIT_MESSAGES = ("too many requests", "not a bot", "rate-limit", "rate limit")
+UNAVAILABLE_MESSAGES = ("private video", "sign in to confirm", "video unavailable", "this video is unavailable",
+                        "has been removed", "members-only", "this video is not available")
+
+
+def backoff_delay(attempt, base, cap, rng=random):
+    """attempt. deneme için bekleme: süre her denemede ikiye katlanır, yarısı rastgele seçilir"""
+    # Rastgele kısım, aynı anda düşen indirmelerin sunucuya aynı anda dönmesini önler
+    ceiling = min(cap, base * 2 ** max(0, attempt - 1))
+    return ceiling / 2 + rng.uniform(0, ceiling / 2)
+
+
+def iter_causes(error):
+    """Hatayı ve onu doğuran hataları sırayla döndürür (yt-dlp DownloadError.exc_info dahil)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        exc_info = getattr(error, 'exc_info', None)
+        wrapped = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        error = wrapped or error.__cause__ or error.__context__
+
+
+def http_status(error):
+    status = getattr(error, 'status', None) or getattr(error, 'code', None)
+    if isinstance(status, int) and 100 <= status < 600:
+        return status
+    match = HTTP_STATUS_PATTERN.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def classify_status(status):
+    if status == 429:
+        return RATE_LIMITED
+    if status == 403:
+        return FORBIDDEN
+    if status in (408, 425) or 500 <= status < 600:
+        return SERVER
+    return PERMANENT
+
+
+def classify_error(error):
+    """Hatanın sınıfını döndürür; yeniden deneme kararı ve bekleme süresi buna göre verilir"""
+    causes = list(iter_causes(error))
+    for cause in causes:
+        if isinstance(cause, DownloadCancelled):
+            return CANCELLED
+
+    # İleti metni en dıştaki hatada en açıklayıcıdır; durum kodu ise içteki hatada bulunur
+    message = " ".join(str(cause) for cause in causes).lower()
+    if any(text in message for text in RATE_LIMIT_MESSAGES):
+        return RATE_LIMITED
+    if any(text in message for text in UNAVAILABLE_MESSAGES):
+        return UNAVAILABLE
+
+    for cause in causes:
+        status = http_status(cause)
+        if status is not None:
+            return classify_status(status)
+
+    for cause in causes:
+        if isinstance(cause, (ConnectionError, TimeoutError, socket.timeout, socket.gaierror, http.client.HTTPException)):
+            return NETWORK
+        if isinstance(cause, OSError) and cause.errno in NETWORK_ERRNOS:
+            return NETWORK
+        if any(cls.__name__ in NETWORK_ERROR_NAMES for cls in type(cause).__mro__):
+            return NETWORK
+    if any(text in message for text in NETWORK_MESSAGES):
+        return NETWORK
+    return PERMANENT
+
+
+class RetryPolicy:
+    """Hata sınıfına göre yeniden deneme sınırı ve rastgele sapmalı üstel bekleme süresi"""
+
+    def __init__(self, limits=None, backoff=None, rng=None):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.backoff = dict(DEFAULT_BACKOFF, **(backoff or {}))
+        self.rng = rng or random.Random()
+
+    def should_retry(self, kind, attempt):
+        """attempt: bu sınıftan kaçıncı başarısızlık (1'den başlar)"""
+        return attempt <= self.limits.get(kind, 0)
+
+    def delay(self, attempt, kind=NETWORK):
+        base, cap = self.backoff.get(kind, DEFAULT_BACKOFF[NETWORK])
+        return backoff_delay(attempt, base, cap, self.rng)
+
+
+class CircuitBreaker:
+    """
+    Sunucu hız sınırlamaya başladığında (window saniyede threshold hata) yeni istekleri cooldown saniye durdurur.
+    Bekleme bitince istekler yeniden başlar; ilk hata devreyi iki kat uzun süre için tekrar açar.
+    """
+
+    def __init__(self, threshold=3, window=60, cooldown=30, max_cooldown=600):
+        self.threshold = threshold
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = []
+        self.open_until = 0
+        self.half_open = False
+
+    def record_failure(self):
+        """Hız sınırı hatasını kaydeder; devre bu hatayla açıldıysa True döndürür"""
+        now = time.monotonic()
+        with self.lock:
+            if now < self.open_until:
+                return False
+            self.failures = [failed_at for failed_at in self.failures if now - failed_at < self.window]
+            self.failures.append(now)
+            if not self.half_open and len(self.failures) < self.threshold:
+                return False
+            self.open_until = now + self.cooldown
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.failures = []
+            self.half_open = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if time.monotonic() >= self.open_until:
+                self.half_open = False
+                self.cooldown = self.base_cooldown
+
+    def remaining(self):
+        """Devre açıksa kalan bekleme süresi, kapalıysa 0"""
+        with self.lock:
+            return max(0.0, self.open_until - time.monotonic())
+
+    def wait(self, cancel=None):
+        """Devre kapanana kadar bekler; iptal edilirse DownloadCancelled fırlatır"""
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                return
+            if cancel is not None:
+                if cancel.wait(remaining):
+                    raise DownloadCancelled()
+            else:
+                time.sleep(remaining)
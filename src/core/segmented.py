@@ -0,0 +1,449 @@
+import os
+import re
+import json
+import time
+import queue
+import weakref
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+from .cancel import find_socket, shutdown_socket
+from .retry import backoff_delay
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_MIN_SIZE = 20 * 1024 * 1024  # Bundan küçük akışlar tek bağlantıyla indirilir
+MIN_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+READ_SIZE = 256 * 1024
+STATE_SUFFIX = ".segments"  # Tamamlanan parçaların listesi; yarıda kalan indirme buradan devam eder
+
+
+class RangeNotSupported(Exception):
+    """Sunucu bayt aralığı (Range) isteklerini desteklemiyor"""
+
+
+class SegmentedDownload:
+    """
+    Bir akışı bayt aralıklarına bölüp birkaç kalıcı bağlantı üzerinden paralel indirir.
+    Parçalar önceden ayrılmış dosyaya doğru konumlarına yazılır, her parça ayrı ayrı yeniden denenir.
+    """
+
+    def __init__(self, url, filepath, headers=None, connections=DEFAULT_CONNECTIONS, retries=3, timeout=20, throttle=None,
+                 cancel=None, metrics=None):
+        self.url = url
+        self.filepath = filepath
+        self.headers = dict(headers or {})
+        self.connections = max(1, connections)
+        self.retries = retries
+        self.timeout = timeout
+        self.throttle = throttle  # throttle(bayt) hız sınırı için okuma sonrası bekletir
+        self.cancel = cancel  # İptal belirteci; iptalde bağlantılar beklenmeden kapatılır
+        self.metrics = metrics
+        self.parts = urlsplit(url)
+        self.lock = threading.Lock()
+        self.downloaded = 0
+        self.stop_event = threading.Event()
+        self.error = None
+        self.done_chunks = set()
+        self.open_connections = set()
+        self.state_path = f"{filepath}{STATE_SUFFIX}" if filepath else None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.parts.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(self.parts.netloc, timeout=self.timeout)
+        with self.lock:
+            self.open_connections.add(connection)
+        return connection
+
+    def _close(self, connection):
+        with self.lock:
+            self.open_connections.discard(connection)
+        connection.close()
+
+    def abort(self):
+        """Tüm işçileri durdurur; okuma bekleyen bağlantılar zaman aşımı beklenmeden kesilir"""
+        self.stop_event.set()
+        with self.lock:
+            connections = list(self.open_connections)
+        for connection in connections:
+            shutdown_socket(connection.sock)
+
+    def _path(self):
+        return self.parts.path + (f"?{self.parts.query}" if self.parts.query else "")
+
+    def _request(self, connection, start, end):
+        headers = dict(self.headers, Range=f"bytes={start}-{end}")
+        connection.request("GET", self._path(), headers=headers)
+        response = connection.getresponse()
+        if response.status != 206:
+            response.read()
+            if response.status == 200:
+                raise RangeNotSupported(f"Server ignored range request for {self.parts.netloc}")
+            raise http.client.HTTPException(f"HTTP Error {response.status}: {response.reason}")
+        return response
+
+    def probe_size(self):
+        """İlk baytı isteyerek toplam boyutu ve aralık desteğini öğrenir"""
+        connection = self._connect()
+        try:
+            response = self._request(connection, 0, 0)
+            response.read()
+            match = re.match(r"bytes \d+-\d+/(\d+)", response.getheader("Content-Range", ""))
+            if not match:
+                raise RangeNotSupported("Missing Content-Range header")
+            return int(match.group(1))
+        finally:
+            self._close(connection)
+
+    def chunk_size(self, total_size):
+        return min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, total_size // (self.connections * 4) + 1))
+
+    def make_chunks(self, total_size, chunk_size):
+        return [(start, min(start + chunk_size, total_size) - 1) for start in range(0, total_size, chunk_size)]
+
+    def load_state(self, total_size):
+        """Önceki yarım indirmenin durumunu döndürür; dosya ile uyuşmuyorsa None"""
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('total_size') != total_size or not os.path.exists(self.filepath):
+            return None
+        if os.path.getsize(self.filepath) != total_size:
+            return None
+        return state
+
+    def save_state(self, total_size, chunk_size):
+        with self.lock:
+            done = sorted(self.done_chunks)
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({'total_size': total_size, 'chunk_size': chunk_size, 'done': done}, f)
+        os.replace(temp_path, self.state_path)
+
+    def preallocate(self, total_size):
+        with open(self.filepath, "wb") as f:
+            if hasattr(os, "posix_fallocate") and total_size:
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total_size)
+                    return
+                except OSError:
+                    pass
+            f.truncate(total_size)
+
+    def _worker(self, chunks):
+        # Her iş parçacığı kendi bağlantısını parçalar arasında yeniden kullanır (keep-alive)
+        connection = self._connect()
+        try:
+            with open(self.filepath, "r+b") as f:
+                while not self.stop_event.is_set():
+                    try:
+                        start, end = chunks.get_nowait()
+                    except queue.Empty:
+                        return
+                    connection = self._fetch_chunk(connection, f, start, end)
+                    if not self.stop_event.is_set():
+                        # Parça diske yazılmadan tamamlandı sayılmaz
+                        f.flush()
+                        os.fsync(f.fileno())
+                        with self.lock:
+                            self.done_chunks.add((start, end))
+        except Exception as e:
+            if self.error is None:
+                self.error = e
+            self.stop_event.set()
+        finally:
+            self._close(connection)
+
+    def _fetch_chunk(self, connection, f, start, end):
+        """Bir parçayı indirir; kullanılmaya devam edecek bağlantıyı döndürür"""
+        position = start
+        attempt = 0
+        while position <= end:
+            if self.stop_event.is_set():
+                return connection
+            try:
+                response = self._request(connection, position, end)
+                f.seek(position)
+                while position <= end:
+                    if self.stop_event.is_set():
+                        return connection
+                    data = response.read(min(READ_SIZE, end - position + 1))
+                    if not data:
+                        raise http.client.IncompleteRead(b"", end - position + 1)
+                    f.write(data)
+                    position += len(data)
+                    with self.lock:
+                        self.downloaded += len(data)
+                    if self.throttle is not None:
+                        self.throttle(len(data))
+            except RangeNotSupported:
+                raise
+            except (OSError, http.client.HTTPException):
+                if self.stop_event.is_set():
+                    return connection
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                if self.metrics is not None:
+                    self.metrics.increment('retries_total', labels={'kind': 'segment'})
+                # Bozulan bağlantıyı at, kalan kısmı yeni bağlantıyla kaldığı yerden iste
+                self._close(connection)
+                connection = self._connect()
+                if self.stop_event.wait(backoff_delay(attempt, 0.5, 5)):
+                    return connection
+        return connection
+
+    def run(self, total_size, on_progress=None, interval=0.1):
+        """
+        İndirmeyi yürütür; on_progress(indirilen_bayt) ilerleme için periyodik çağrılır.
+        on_progress bir istisna fırlatırsa (örn. iptal) tüm bağlantılar durdurulur ve istisna iletilir.
+        """
+        state = self.load_state(total_size)
+        if state is None:
+            self.preallocate(total_size)
+            chunk_size = self.chunk_size(total_size)
+        else:
+            chunk_size = state['chunk_size']
+            self.done_chunks = {tuple(chunk) for chunk in state['done']}
+            self.downloaded = sum(end - start + 1 for start, end in self.done_chunks)
+
+        chunks = queue.Queue()
+        for chunk in self.make_chunks(total_size, chunk_size):
+            if chunk not in self.done_chunks:
+                chunks.put(chunk)
+
+        threads = []
+        for _ in range(min(self.connections, chunks.qsize())):
+            thread = threading.Thread(target=self._worker, args=(chunks,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        saved_count = len(self.done_chunks)
+        cancel_handle = self.cancel.register(self.abort) if self.cancel is not None else None
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(interval)
+                if len(self.done_chunks) != saved_count:
+                    saved_count = len(self.done_chunks)
+                    self.save_state(total_size, chunk_size)
+                if on_progress is not None:
+                    on_progress(self.downloaded)
+            if self.cancel is not None:
+                self.cancel.check()
+        except BaseException:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+            self.save_state(total_size, chunk_size)
+            raise
+        finally:
+            if self.cancel is not None:
+                self.cancel.unregister(cancel_handle)
+
+        if self.error is not None or self.downloaded < total_size:
+            self.save_state(total_size, chunk_size)
+            raise self.error or http.client.IncompleteRead(b"", total_size - self.downloaded)
+        remove_state(self.filepath)
+
+
+def resumed_bytes(filepath):
+    """Yarım indirmenin diskte hazır olan bayt sayısı; parçalı indirmede tamamlanan parçalar sayılır"""
+    try:
+        with open(f"{filepath}{STATE_SUFFIX}", encoding="utf-8") as f:
+            return sum(end - start + 1 for start, end in json.load(f)['done'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+def remove_state(filepath):
+    """Parçalı indirmenin devam durumu dosyasını siler"""
+    try:
+        os.remove(f"{filepath}{STATE_SUFFIX}")
+    except FileNotFoundError:
+        pass
+
+
+_youtube_dl_class = None
+_class_lock = threading.Lock()
+
+
+def segmented_youtube_dl_class():
+    """
+    'segmented_download' seçeneğini tanıyan YoutubeDL alt sınıfını döndürür.
+    Seçenek örneği: {'segmented_download': {'connections': 4, 'min_size': 20 * 1024 * 1024}}
+    """
+    global _youtube_dl_class
+    with _class_lock:
+        if _youtube_dl_class is None:
+            _youtube_dl_class = _build_youtube_dl_class()
+        return _youtube_dl_class
+
+
+def _build_youtube_dl_class():
+    from .downloader import load_yt_dlp
+    yt_dlp = load_yt_dlp()
+    FileDownloader = yt_dlp.downloader.common.FileDownloader
+
+    class SegmentedHttpFD(FileDownloader):
+        """Büyük HTTP akışlarını SegmentedDownload ile indiren yt-dlp indiricisi"""
+
+        def real_download(self, filename, info_dict):
+            options = self.params.get('segmented_download') or {}
+            tmpfilename = self.temp_name(filename)
+            download = SegmentedDownload(
+                info_dict['url'], tmpfilename, info_dict.get('http_headers'),
+                connections=options.get('connections', DEFAULT_CONNECTIONS),
+                retries=options.get('retries', 3),
+                throttle=options.get('throttle'),
+                cancel=self.params.get('cancel_token'),
+                metrics=self.params.get('metrics')
+            )
+            total_size = info_dict['_segmented_size']
+            started = time.time()
+            self.report_destination(filename)
+
+            def on_progress(downloaded):
+                now = time.time()
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': total_size,
+                    'filename': filename,
+                    'tmpfilename': tmpfilename,
+                    'elapsed': now - started,
+                    'speed': self.calc_speed(started, now, downloaded),
+                    'eta': self.calc_eta(started, now, total_size, downloaded),
+                }, info_dict)
+
+            download.run(total_size, on_progress)
+            self.try_rename(tmpfilename, filename)
+            self._hook_progress({
+                'status': 'finished',
+                'downloaded_bytes': total_size,
+                'total_bytes': total_size,
+                'filename': filename,
+                'elapsed': time.time() - started,
+            }, info_dict)
+            return True
+
+    class SegmentedYoutubeDL(yt_dlp.YoutubeDL):
+
+        def __init__(self, params=None, auto_init=True):
+            # 'cancel_token' seçeneği verilirse iptalde açık HTTP yanıtlarının soketleri kapatılır
+            self._responses = weakref.WeakSet()
+            self._responses_lock = threading.Lock()
+            self._selection_started = None
+            super().__init__(params, auto_init)
+            cancel = self.params.get('cancel_token')
+            self._cancel_handle = cancel.register(self._abort_requests) if cancel is not None else None
+
+        def urlopen(self, req):
+            cancel = self.params.get('cancel_token')
+            if cancel is not None:
+                # Yeniden denemeler iptal edilmiş indirme için yeni bağlantı açmasın
+                cancel.check()
+            response = super().urlopen(req)
+            if cancel is not None:
+                with self._responses_lock:
+                    self._responses.add(response)
+                if cancel.cancelled:
+                    shutdown_socket(find_socket(response))
+            return response
+
+        def _abort_requests(self):
+            with self._responses_lock:
+                responses = list(self._responses)
+            for response in responses:
+                shutdown_socket(find_socket(response))
+
+        def close(self):
+            cancel = self.params.get('cancel_token')
+            if cancel is not None:
+                cancel.unregister(self._cancel_handle)
+            super().close()
+
+        def process_video_result(self, info_dict, download=True):
+            self._selection_started = time.perf_counter()
+            return super().process_video_result(info_dict, download)
+
+        def process_info(self, info_dict):
+            # process_video_result'tan buraya kadar geçen süre format seçimidir
+            metrics = self.params.get('metrics')
+            if metrics is not None and self._selection_started is not None:
+                metrics.observe('phase_seconds', time.perf_counter() - self._selection_started,
+                                {'phase': 'format_selection'}, self._metrics_context(info_dict))
+                self._selection_started = None
+            return super().process_info(info_dict)
+
+        def dl(self, name, info, subtitle=False, test=False):
+            size = self._segmented_size(info) if not (subtitle or test) else None
+            tmpfilename = f"{name}.part"
+            if size is None and os.path.exists(f"{tmpfilename}{STATE_SUFFIX}"):
+                # Tek bağlantılı indirici önceden ayrılmış .part dosyasını tamamlanmış sanır, baştan indirilmeli
+                remove_state(tmpfilename)
+                if os.path.exists(tmpfilename):
+                    os.remove(tmpfilename)
+
+            measure = self.params.get('metrics') is not None and not (subtitle or test) and not os.path.exists(name)
+            resumed = resumed_bytes(tmpfilename) if measure else 0
+            started = time.perf_counter()
+            if size is None:
+                result = super().dl(name, info, subtitle, test)
+            else:
+                fd = SegmentedHttpFD(self, self.params)
+                for ph in self._progress_hooks:
+                    fd.add_progress_hook(ph)
+                new_info = self._copy_infodict(info)
+                new_info['_segmented_size'] = size
+                result = fd.download(name, new_info, subtitle)
+            if measure and result:
+                self._record_transfer(name, info, resumed, time.perf_counter() - started, size is not None)
+            return result
+
+        def _record_transfer(self, name, info, resumed, elapsed, segmented):
+            """Akış aktarımının süresini, yazılan baytları ve ortalama hızı kaydeder"""
+            try:
+                written = max(0, os.path.getsize(name) - resumed)
+            except OSError:
+                return
+            metrics = self.params['metrics']
+            context = self._metrics_context(info)
+            stream = {'stream': 'video' if info.get('vcodec') not in (None, 'none') else 'audio'}
+            metrics.observe('phase_seconds', elapsed, {'phase': 'transfer'}, context)
+            metrics.observe('transfer_seconds', elapsed, dict(stream, mode='segmented' if segmented else 'single'), context)
+            metrics.increment('bytes_written_total', written, stream, context)
+            if elapsed > 0:
+                metrics.observe('transfer_throughput_bytes', written / elapsed, stream, context)
+
+        def _metrics_context(self, info):
+            return dict(self.params.get('metrics_context') or {}, item=info.get('id'))
+
+        def _segmented_size(self, info):
+            """Akış parçalı indirmeye uygunsa toplam boyutu, değilse None döndürür"""
+            options = self.params.get('segmented_download')
+            if not options or name_is_stdout(info) or self.params.get('proxy'):
+                return None
+            if info.get('protocol') not in ('http', 'https') or info.get('requested_formats'):
+                return None
+            approx_size = info.get('filesize') or info.get('filesize_approx')
+            if approx_size and approx_size < options.get('min_size', DEFAULT_MIN_SIZE):
+                return None
+            try:
+                size = SegmentedDownload(info['url'], None, info.get('http_headers')).probe_size()
+            except (OSError, http.client.HTTPException, RangeNotSupported) as e:
+                self.write_debug(f"Segmented download not possible, falling back: {e}")
+                return None
+            return size if size >= options.get('min_size', DEFAULT_MIN_SIZE) else None
+
+    return SegmentedYoutubeDL
+
+
+def name_is_stdout(info):
+    return info.get('_filename') == '-' or info.get('filepath') == '-'
@@ -0,0 +1,405 @@
+import os
+import sys
+import json
+import queue
+import signal
+import argparse
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .cli import add_engine_arguments, create_downloader, parse_outputs, VIDEO_QUALITIES, AUDIO_QUALITIES
+from .bandwidth import PRIORITY_BACKGROUND, PRIORITY_NORMAL, PRIORITY_INTERACTIVE
+from .tracker import DownloadTracker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+POLL_INTERVAL = 0.2  # İlerleme satırları arayüzdeki gibi saniyede 5 kez toplanır
+HEARTBEAT_INTERVAL = 15  # Boşta kalan olay akışında bağlantının açık kaldığını bildirir
+SUBSCRIBER_QUEUE_SIZE = 1000  # Okumayan istemcinin biriktirebileceği olay sayısı
+PRIORITY_NAMES = {
+    "background": PRIORITY_BACKGROUND,
+    "normal": PRIORITY_NORMAL,
+    "interactive": PRIORITY_INTERACTIVE
+}
+FINISHED_ROW_STATES = ("done", "failed", "cancelled")
+
+
+class RequestError(Exception):
+    """İstemciye HTTP durum koduyla döndürülecek hata"""
+
+    def __init__(self, status, message):
+        self.status = status
+        super().__init__(message)
+
+
+def row_to_json(row):
+    """İzleyici satırını JSON'a uygun hale getirir: demet anahtar yerine iş kimliği ve öğe anahtarı"""
+    data = {name: value for name, value in row.items() if name != 'key'}
+    data['item'] = row['key'][2] if row['key'][0] == "item" else None
+    return data
+
+
+def resolve_directory(directory, root):
+    """
+    İstemcinin verdiği klasörü indirme kök klasörünün altında çözer; göreli yollar köke göre yorumlanır.
+    Kökün dışına çıkan yollar (.., mutlak yol, sembolik bağlantı) reddedilir.
+    """
+    if directory is None:
+        return None
+    if not isinstance(directory, str) or not directory.strip():
+        raise RequestError(400, "'directory' must be a non-empty string")
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, directory))
+    if os.path.commonpath([root, resolved]) != root:
+        raise RequestError(400, f"'directory' must be inside the download directory {root}")
+    return resolved
+
+
+def parse_job_request(payload, root):
+    """
+    POST /jobs gövdesini start_download parametrelerine çevirir.
+    Kalite ve çıktı biçimi komut satırıyla aynı kurallarla doğrulanır; klasör root'un altında olmalıdır.
+    """
+    if not isinstance(payload, dict):
+        raise RequestError(400, "request body must be a JSON object")
+    url = payload.get('url')
+    if not isinstance(url, str) or not url.strip():
+        raise RequestError(400, "'url' is required")
+
+    try:
+        if payload.get('outputs'):
+            outputs = payload['outputs']
+            if isinstance(outputs, list):
+                outputs = ",".join(str(output) for output in outputs)
+            outputs = parse_outputs(outputs)
+        else:
+            container = "mp3" if payload.get('audio') else "mp4"
+            quality = payload.get('quality') or (AUDIO_QUALITIES[2] if container == "mp3" else VIDEO_QUALITIES[0])
+            outputs = parse_outputs(f"{container}:{quality}")
+    except argparse.ArgumentTypeError as e:
+        raise RequestError(400, str(e))
+
+    priority = payload.get('priority')
+    if priority is not None and priority not in PRIORITY_NAMES:
+        raise RequestError(400, f"unknown priority '{priority}' (use {', '.join(PRIORITY_NAMES)})")
+
+    sync = bool(payload.get('sync'))
+    is_video, quality = outputs[0]
+    return {
+        'url': url.strip(),
+        'is_video': is_video,
+        'quality': quality,
+        'is_playlist': bool(payload.get('playlist')) or sync,
+        'priority': PRIORITY_NAMES.get(priority),
+        'outputs': outputs if len(outputs) > 1 else None,
+        'sync': sync,
+        'directory': resolve_directory(payload.get('directory'), root)
+    }
+
+
+class DownloadService:
+    """
+    Tek bir sıcak YouTubeDownloader örneğini HTTP istemcilerine açar.
+    İzleyicinin değişen satırları arka planda toplanır, son halleri durum sorgularına cevap verir ve
+    olay akışına (SSE) abone olan istemcilere gönderilir.
+    """
+
+    def __init__(self, downloader, token=None):
+        self.downloader = downloader
+        self.token = token
+        # İstemciler yalnızca servis başlatılırken verilen indirme klasörünün altına yazabilir
+        self.root = downloader.download_directory
+        self.lock = threading.Lock()
+        self.rows = {}  # izleyici satır anahtarı -> son satır
+        self.subscribers = set()
+        self.stopped = threading.Event()
+        downloader.signals.status.connect(lambda text: self.publish("status", {'message': text}))
+        downloader.signals.error.connect(lambda message: self.publish("error", {'message': message}))
+        downloader.signals.finished.connect(
+            lambda filename, filepath, thumbnail: self.publish("finished", {'filename': filename, 'path': filepath})
+        )
+        self.poller = threading.Thread(target=self.poll_changes, daemon=True)
+
+    def start(self):
+        self.poller.start()
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            # Açık olay akışları kapanabilsin diye bekleyen istemciler uyandırılır
+            self.offer(subscriber, None)
+
+    def submit(self, payload):
+        request = parse_job_request(payload, self.root)
+        return self.downloader.start_download(
+            request['url'], request['is_video'], request['quality'], request['is_playlist'],
+            priority=request['priority'], outputs=request['outputs'], sync=request['sync'],
+            directory=request['directory']
+        )
+
+    def job_status(self, job_id):
+        """İşin kuyruktaki kaydı, öğeleri ve canlı ilerlemesi; iş yoksa None"""
+        jobs = self.downloader.get_job_queue()
+        job = jobs.get(job_id)
+        if job is None:
+            return None
+        with self.lock:
+            live = self.rows.get(DownloadTracker.job_key(job_id))
+            item_rows = {row['key'][2]: row for row in self.rows.values() if row['job'] == job_id and row['key'][0] == "item"}
+        if live is not None:
+            job['progress'] = row_to_json(live)
+        job['items'] = jobs.items(job_id)
+        for item in job['items']:
+            row = item_rows.get(item['item_key'])
+            if row is not None:
+                item['progress'] = row_to_json(row)
+        return job
+
+    def list_jobs(self, limit):
+        return self.downloader.get_job_queue().list_jobs(limit)
+
+    def cancel(self, job_id, item_key=None):
+        """İşi veya iş içindeki tek öğeyi iptal eder; iş yoksa False döndürür"""
+        if self.downloader.get_job_queue().get(job_id) is None:
+            return False
+        if item_key is None:
+            self.downloader.cancel_row(DownloadTracker.job_key(job_id))
+        else:
+            self.downloader.cancel_row(("item", job_id, item_key))
+        return True
+
+    def metrics(self):
+        return self.downloader.metrics.to_prometheus()
+
+    def subscribe(self):
+        subscriber = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            self.offer(subscriber, (event, data))
+
+    def offer(self, subscriber, message):
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # Yetişemeyen istemci diğerlerini ve motoru bekletmez, bekleyen olayları atılıp bağlantısı kapatılır
+            self.unsubscribe(subscriber)
+            with subscriber.mutex:
+                subscriber.queue.clear()
+            subscriber.put_nowait(None)
+
+    def poll_changes(self):
+        """İzleyicinin değişen satırlarını toplar, saklar ve abonelere gönderir"""
+        while not self.stopped.wait(POLL_INTERVAL):
+            try:
+                changes = self.downloader.tracker.take_changes()
+                finished_jobs = []
+                with self.lock:
+                    for change in changes:
+                        self.rows[change['key']] = change
+                        if change['key'][0] == "job" and change['state'] in FINISHED_ROW_STATES:
+                            finished_jobs.append(change['job'])
+                for change in changes:
+                    self.publish("progress", row_to_json(change))
+                for job_id in finished_jobs:
+                    self.forget_job(job_id)
+            except Exception as e:
+                print(f"Progress polling error: {e}")
+                traceback.print_exc()
+
+    def forget_job(self, job_id):
+        """Biten işin canlı satırlarını bırakır; durumu kuyruktan okunmaya devam eder, uzun çalışan serviste bellek birikmez"""
+        with self.lock:
+            keys = [key for key, row in self.rows.items() if row['job'] == job_id]
+            for key in keys:
+                del self.rows[key]
+        self.downloader.tracker.forget(keys)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    GET  /jobs, /jobs/<id>, /metrics, /events[?job=<id>]
+    POST /jobs, /jobs/<id>/cancel[?item=<anahtar>]
+    """
+
+    server_version = "ytdownloader"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        # Olay akışı uzun süre açık kaldığından her istek yazdırılmaz
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            self.authorize(query)
+            if method == "GET" and parts == ["jobs"]:
+                limit = self.int_param(query.get('limit', '100'), "limit")
+                self.send_json(200, {'jobs': self.service.list_jobs(limit)})
+            elif method == "POST" and parts == ["jobs"]:
+                job_id = self.service.submit(self.read_json())
+                self.send_json(201, self.service.job_status(job_id))
+            elif method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+                job = self.service.job_status(self.int_param(parts[1], "job id"))
+                if job is None:
+                    raise RequestError(404, "job not found")
+                self.send_json(200, job)
+            elif method == "POST" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+                if not self.service.cancel(self.int_param(parts[1], "job id"), query.get('item')):
+                    raise RequestError(404, "job not found")
+                self.send_json(202, {'cancelled': True})
+            elif method == "GET" and parts == ["metrics"]:
+                self.send_body(200, self.service.metrics().encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8")
+            elif method == "GET" and parts == ["events"]:
+                job_id = self.int_param(query['job'], "job id") if 'job' in query else None
+                self.stream_events(job_id)
+            else:
+                raise RequestError(404, "not found")
+        except RequestError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            print(f"API error: {e}")
+            traceback.print_exc()
+            self.send_json(500, {'error': str(e)})
+
+    def authorize(self, query):
+        token = self.service.token
+        if token is None:
+            return
+        # Tarayıcıdaki EventSource başlık gönderemediğinden belirteç sorgu parametresiyle de verilebilir
+        if self.headers.get('Authorization') != f"Bearer {token}" and query.get('token') != token:
+            raise RequestError(401, "invalid or missing token")
+
+    def int_param(self, value, name):
+        try:
+            return int(value)
+        except ValueError:
+            raise RequestError(400, f"invalid {name} '{value}'")
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            raise RequestError(400, f"invalid JSON: {e}")
+
+    def send_json(self, status, data):
+        self.send_body(status, json.dumps(data).encode('utf-8'), "application/json")
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self, job_id):
+        """Server-Sent Events: ilerleme satırları ve motor bildirimleri bağlantı kapanana kadar gönderilir"""
+        subscriber = self.service.subscribe()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                try:
+                    message = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    if self.service.stopped.is_set():
+                        return
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    continue
+                if message is None:
+                    return
+                event, data = message
+                # İşe göre süzülen akışta genel bildirimler (durum, hata) gönderilmez
+                if job_id is not None and data.get('job') != job_id:
+                    continue
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.service.unsubscribe(subscriber)
+
+
+class ApiServer(ThreadingHTTPServer):
+    def __init__(self, address, service):
+        self.service = service
+        super().__init__(address, ApiHandler)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core serve",
+        description="Run the download engine as a local HTTP/JSON API service."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--token", help="Require this token as 'Authorization: Bearer TOKEN' or '?token=TOKEN'")
+    parser.add_argument("--no-resume", action="store_true", help="Do not resume downloads left unfinished by the last run")
+    add_engine_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    """HTTP servisinin giriş noktası"""
+    args = build_parser().parse_args(argv)
+    downloader = create_downloader(args)
+    # yt-dlp ilk istekten önce yüklenir
+    downloader.warm_up()
+
+    service = DownloadService(downloader, args.token)
+    server = ApiServer((args.host, args.port), service)
+    service.start()
+    if not args.no_resume:
+        downloader.resume_jobs()
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}", file=sys.stderr)
+
+    # SIGTERM de Ctrl+C gibi sunucuyu kapatır
+    def handle_terminate(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, handle_terminate)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Çalışan indirme iptal edilmez: iş kuyrukta kalır, servis yeniden başlayınca kaldığı yerden devam eder
+        service.stop()
+        server.server_close()
+        downloader.set_metrics_log(None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
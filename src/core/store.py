@@ -0,0 +1,173 @@
+import os
+import time
+import shutil
+import filecmp
+import sqlite3
+import hashlib
+import itertools
+import threading
+
+STORE_INDEX = "index.sqlite3"
+SAMPLE_SIZE = 1024 * 1024  # Parmak izi için okunan her örnek bloğun boyutu
+SAMPLE_COUNT = 8  # Dosya boyunca eşit aralıklı örnek blok sayısı (baş ve son dahil)
+FICLONE = 0x40049409  # Linux ioctl: blokları paylaşan kopya (btrfs, XFS reflink)
+
+
+def fingerprint_file(path):
+    """
+    Dosyanın boyutu ve eşit aralıklı SAMPLE_COUNT bloğundan hesaplanan SHA-256 parmak izi.
+    Büyük dosyada da en fazla SAMPLE_COUNT × SAMPLE_SIZE bayt okunur; küçük dosyalar tamamen okunur.
+    Parmak izi eşleşmesi içeriğin aynı olduğunu kanıtlamaz, bağlamadan önce dosyalar karşılaştırılır.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= SAMPLE_SIZE * SAMPLE_COUNT:
+            for chunk in iter(lambda: f.read(SAMPLE_SIZE), b""):
+                digest.update(chunk)
+        else:
+            step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+            for index in range(SAMPLE_COUNT):
+                f.seek(index * step)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def clone_file(source, target):
+    """target'ı source'un bloklarını paylaşan kopyası (reflink) olarak oluşturur; desteklenmiyorsa False döndürür"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return False
+
+
+def link_file(source, target):
+    """
+    target'ı source'a sabit bağlantı (hardlink) yapar; farklı dosya sistemindeyse reflink, o da olmazsa kopya oluşturur.
+    Var olan target tek adımda değiştirilir. Kullanılan yöntemi ("hardlink", "reflink" veya "copy") döndürür.
+    """
+    temp_path = f"{target}.link.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+        method = "hardlink"
+    except OSError:
+        if clone_file(source, temp_path):
+            method = "reflink"
+        else:
+            shutil.copyfile(source, temp_path)
+            method = "copy"
+    os.replace(temp_path, target)
+    return method
+
+
+class ContentStore:
+    """
+    Birden çok indirme klasörünün paylaştığı içerik deposu.
+    Dosyalar objects/ altında içerik parmak izleriyle bir kez tutulur; dizin (çıkarıcı, kimlik, mod, kalite) anahtarını
+    nesne adına bağlar. Başka bir listede zaten indirilmiş video yeniden indirilmez, depodaki dosyaya bağlanır.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.objects = os.path.join(directory, "objects")
+        os.makedirs(self.objects, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(directory, STORE_INDEX), check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            "extractor TEXT NOT NULL, video_id TEXT NOT NULL, mode TEXT NOT NULL, quality TEXT NOT NULL, "
+            "digest TEXT NOT NULL, ext TEXT NOT NULL, size INTEGER, added_at REAL, "
+            "PRIMARY KEY (extractor, video_id, mode, quality))"
+        )
+        self.connection.commit()
+
+    def object_path(self, digest, ext):
+        return os.path.join(self.objects, digest[:2], f"{digest}.{ext}")
+
+    def lookup(self, key, mode, quality):
+        """Kayıt varsa depodaki dosyanın yolunu, yoksa None döndürür"""
+        if key is None:
+            return None
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT digest, ext FROM media WHERE extractor=? AND video_id=? AND mode=? AND quality=?",
+                (key[0], key[1], mode, quality)
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.object_path(*row)
+        # Depodan silinmiş dosyanın kaydı geçersizdir
+        return path if os.path.exists(path) else None
+
+    def add(self, key, mode, quality, filepath):
+        """
+        Tamamlanan dosyayı depoya ekler. Aynı içerik depoda zaten varsa dosya depodakine bağlanır;
+        (yöntem, kazanılan bayt) döndürür.
+        İndirilen dosya yeniden baştan sona okunmaz: nesne örneklenmiş parmak iziyle adlandırılır, tam karşılaştırma
+        yalnızca aynı parmak izli bir nesne varken, yani yer kazanılacakken yapılır.
+        """
+        if key is None:
+            return None, 0
+        ext = filepath.rsplit('.', 1)[-1].lower()
+        size = os.path.getsize(filepath)
+        fingerprint = fingerprint_file(filepath)
+
+        method = None
+        saved = 0
+        # Parmak izi çakışan farklı içerik (pratikte görülmez) sıra numaralı ayrı bir nesne olarak tutulur
+        for number in itertools.count():
+            name = fingerprint if number == 0 else f"{fingerprint}-{number}"
+            object_path = self.object_path(name, ext)
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                method = self.ingest(filepath, object_path)
+                break
+            if os.path.samefile(object_path, filepath):
+                break
+            if os.path.getsize(object_path) == size and filecmp.cmp(object_path, filepath, shallow=False):
+                if os.stat(object_path).st_dev == os.stat(filepath).st_dev:
+                    # Farklı anahtarla gelen aynı içerik (örn. "Best Quality" ve "1080p") diskte bir kez tutulur
+                    method = link_file(object_path, filepath)
+                    saved = size if method != "copy" else 0
+                break
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key[0], key[1], mode, quality, name, ext, size, time.time())
+            )
+            self.connection.commit()
+        return method, saved
+
+    def ingest(self, filepath, object_path):
+        """Dosyayı depoya sabit bağlantı, reflink veya (başka diskte) kopya olarak alır; yöntemi döndürür"""
+        # Yarım kopya nesne adıyla görünmesin diye önce geçici adla yazılır
+        temp_path = os.path.join(self.objects, f".incoming-{os.getpid()}-{threading.get_ident()}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        try:
+            os.link(filepath, temp_path)
+            method = "hardlink"
+        except OSError:
+            if clone_file(filepath, temp_path):
+                method = "reflink"
+            else:
+                shutil.copyfile(filepath, temp_path)
+                method = "copy"
+        os.replace(temp_path, object_path)
+        return method
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,160 @@
+import threading
+
+from .cancel import CANCELLED_ERROR
+
+
+class DownloadTracker:
+    """
+    İndirme listesi için iş ve öğe satırlarını tutar.
+    Motor iş parçacıkları satırları günceller, arayüz take_changes ile yalnızca değişen satırları toplu olarak alır;
+    böylece binlerce öğede bile her ilerleme bildirimi ayrı bir arayüz olayına dönüşmez.
+    Tek videolu işlerde öğe ayrı satır açmaz, ilerlemesi iş satırında gösterilir.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}  # satır anahtarı -> satır sözlüğü
+        self.playlists = set()  # öğeleri ayrı satırlarda gösterilen işler
+        self.tasks = {}  # ilerleme görevi kimliği -> satır anahtarı
+        self.dirty = {}  # değişen satır anahtarları, ilk değişiklik sırasıyla
+
+    @staticmethod
+    def job_key(job_id):
+        return ("job", job_id)
+
+    def item_key(self, job_id, item_key):
+        """Öğenin satır anahtarı; liste olmayan işlerde iş satırı"""
+        if job_id in self.playlists:
+            return ("item", job_id, item_key)
+        return self.job_key(job_id)
+
+    def add_job(self, job):
+        """Kuyruğa eklenen işin satırını oluşturur (zaten varsa durumunu günceller)"""
+        kind = "Video" if job['is_video'] else "Audio"
+        if job.get('outputs'):
+            kind = " + ".join(quality for _, quality in job['outputs'])
+        else:
+            kind = f"{kind} {job['quality']}"
+        with self.lock:
+            if job['is_playlist']:
+                self.playlists.add(job['id'])
+            row = self._row(self.job_key(job['id']), job['id'], job['url'], kind)
+            row['playlist'] = job['is_playlist']
+            self._set_state(row, job['state'], job.get('error'))
+
+    def job_state(self, job_id, state, error=None):
+        with self.lock:
+            row = self.rows.get(self.job_key(job_id))
+            if row is not None:
+                self._set_state(row, state, error)
+                if state == "done" and not row['playlist']:
+                    row['downloaded'] = row['total'] = max(row['downloaded'], row['total'])
+
+    def job_title(self, job_id, title):
+        """İşin satırında URL yerine çözülen başlığı gösterir"""
+        with self.lock:
+            row = self.rows.get(self.job_key(job_id))
+            if row is not None and title:
+                row['title'] = title
+                self.dirty[row['key']] = True
+
+    def job_progress(self, job_id, completed, total):
+        """Liste işinin tamamlanan ve toplam öğe sayısı"""
+        with self.lock:
+            row = self.rows.get(self.job_key(job_id))
+            if row is not None:
+                row['completed'] = completed
+                row['count'] = total
+                self.dirty[row['key']] = True
+
+    def item_state(self, job_id, item_key, state, title=None, error=None):
+        with self.lock:
+            key = self.item_key(job_id, item_key)
+            job_row = self.rows.get(self.job_key(job_id))
+            row = self._row(key, job_id, title or item_key, job_row['kind'] if job_row else "")
+            if title and key[0] == "item":
+                row['title'] = title
+            self._set_state(row, state, error)
+            if state == "done":
+                row['downloaded'] = row['total'] = max(row['downloaded'], row['total'])
+                row['speed'] = 0
+
+    def bind_tasks(self, job_id, item_key, task_ids):
+        """Öğenin ilerleme görevlerini (görüntü/ses akışı) satırına bağlar"""
+        with self.lock:
+            key = self.item_key(job_id, item_key)
+            row = self.rows.get(key)
+            if row is None:
+                return
+            for task_id in task_ids:
+                self.tasks[task_id] = key
+                row['streams'].setdefault(task_id, [0, 0, 0])
+
+    def unbind_tasks(self, task_ids):
+        with self.lock:
+            for task_id in task_ids:
+                row = self.rows.get(self.tasks.pop(task_id, None))
+                if row is not None and task_id in row['streams']:
+                    row['streams'][task_id][2] = 0
+                    self._sum_streams(row)
+
+    def update_task(self, task_id, downloaded, total, speed):
+        """Akışın ilerlemesini kaydeder; bağlı olmayan görevler (örn. asyncio motoru) yok sayılır"""
+        with self.lock:
+            row = self.rows.get(self.tasks.get(task_id))
+            if row is None:
+                return
+            row['streams'][task_id] = [downloaded, total, speed]
+            self._sum_streams(row)
+
+    def take_changes(self):
+        """Son çağrıdan beri değişen satırların kopyalarını döndürür"""
+        with self.lock:
+            keys = list(self.dirty)
+            self.dirty.clear()
+            changes = []
+            for key in keys:
+                row = self.rows.get(key)
+                if row is None:
+                    continue
+                change = {name: value for name, value in row.items() if name != 'streams'}
+                remaining = row['total'] - row['downloaded']
+                change['eta'] = remaining / row['speed'] if row['speed'] and remaining > 0 else None
+                changes.append(change)
+        return changes
+
+    def forget(self, keys):
+        """Satırları takipten çıkarır (örn. arayüzde bitenler temizlenince)"""
+        with self.lock:
+            for key in keys:
+                row = self.rows.pop(key, None)
+                self.dirty.pop(key, None)
+                if row is not None:
+                    for task_id in row['streams']:
+                        self.tasks.pop(task_id, None)
+                    if key[0] == "job":
+                        self.playlists.discard(key[1])
+
+    def _row(self, key, job_id, title, kind):
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = {
+                'key': key, 'job': job_id, 'title': title, 'kind': kind, 'state': "queued", 'error': None,
+                'playlist': False, 'downloaded': 0, 'total': 0, 'speed': 0, 'completed': 0, 'count': 0,
+                'streams': {}
+            }
+        self.dirty[key] = True
+        return row
+
+    def _set_state(self, row, state, error):
+        # Kuyrukta iptal "failed" olarak saklanır; listede ayrı gösterilir
+        row['state'] = "cancelled" if state == "failed" and error == CANCELLED_ERROR else state
+        row['error'] = error
+        self.dirty[row['key']] = True
+
+    def _sum_streams(self, row):
+        streams = row['streams'].values()
+        row['downloaded'] = sum(stream[0] for stream in streams)
+        row['total'] = sum(stream[1] for stream in streams)
+        row['speed'] = sum(stream[2] for stream in streams)
+        self.dirty[row['key']] = True
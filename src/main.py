@@ -1,6 +1,78 @@
 import sys
 import os
+import time
+import builtins
+import threading
+
+# Başlangıç süresi raporu (--startup-timing) diğer modüller yüklenmeden önce kurulmalı
+STARTUP_TIMING = "--startup-timing" in sys.argv
+if STARTUP_TIMING:
+    sys.argv.remove("--startup-timing")
+
+
+class StartupTimer:
+    """Başlangıç aşamalarını ve modül içe aktarma sürelerini ölçer (-X importtime benzeri)"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+        self.imports = []  # (derinlik, modül, kendi süresi, toplam süre) mikrosaniye
+        self.local = threading.local()  # yt-dlp arka plan iş parçacığında yüklendiği için yığın iş parçacığına özel
+        self.original_import = builtins.__import__
+    
+    def install(self):
+        builtins.__import__ = self._timed_import
+    
+    def uninstall(self):
+        builtins.__import__ = self.original_import
+    
+    def mark(self, phase):
+        self.phases.append((phase, time.perf_counter() - self.start))
+    
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Sadece ilk kez yüklenen mutlak modülleri ölç
+        if level != 0 or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.imports.append((len(stack), name, (elapsed - children) * 1e6, elapsed * 1e6))
+    
+    def report(self, limit=25):
+        lines = ["", "Startup timing:"]
+        previous = 0.0
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<32} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        
+        lines.append("")
+        lines.append(f"Slowest imports (top {limit} by cumulative time):")
+        lines.append("  import time: self [us] | cumulative | imported package")
+        for depth, name, self_us, cumulative_us in sorted(self.imports, key=lambda item: -item[3])[:limit]:
+            lines.append(f"  import time: {self_us:9.0f} | {cumulative_us:10.0f} | {'  ' * depth}{name}")
+        print("\n".join(lines), file=sys.stderr)
+
+
+startup_timer = StartupTimer() if STARTUP_TIMING else None
+if startup_timer is not None:
+    startup_timer.install()
+
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+
+if startup_timer is not None:
+    startup_timer.mark("PyQt6 imported")
 
 # Modül yolunu düzenle
 def setup_module_paths():
@@ -16,56 +88,36 @@ def setup_module_paths():
         sys.path.insert(0, current_dir)
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
-    
-    # Çalışma dizinini ve Python yolunu yazdır (hata ayıklama için)
-    print(f"Çalışma dizini: {os.getcwd()}")
-    print(f"Python modül yolu: {sys.path}")
 
 # İlk olarak modül yollarını düzenle
 setup_module_paths()
 
-# Modülleri import et - her iki yolu da dene
+# Modülleri import et; yt-dlp burada değil, pencere açıldıktan sonra arka planda yüklenir
 try:
     # Direkt import (normal çalışma için)
     from core.downloader import YouTubeDownloader
     from ui.main_window import YouTubeDownloaderUI
-    print("Modüller başarıyla import edildi (core.* yoluyla)")
 except ImportError as e1:
     try:
         # Alternatif import (paketlenmiş uygulama için)
         from src.core.downloader import YouTubeDownloader
         from src.ui.main_window import YouTubeDownloaderUI
-        print("Modüller başarıyla import edildi (src.core.* yoluyla)")
     except ImportError as e2:
         print(f"Birincil import hatası: {e1}")
         print(f"İkincil import hatası: {e2}")
-        
-        # Paketlenmiş uygulama durumunda son bir deneme
-        try:
-            # __file__ konumundan başlayarak manuel import
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            sys.path.append(os.path.join(current_dir, "core"))
-            sys.path.append(os.path.join(current_dir, "ui"))
-            
-            # Modülleri direkt olarak import et
-            import downloader
-            import main_window
-            
-            YouTubeDownloader = downloader.YouTubeDownloader
-            YouTubeDownloaderUI = main_window.YouTubeDownloaderUI
-            print("Modüller başarıyla import edildi (manuel yollarla)")
-        except Exception as e3:
-            print(f"Üçüncü import hatası: {e3}")
-            # Hata mesajını göster
-            import tkinter as tk
-            from tkinter import messagebox
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror(
-                "Modül Bulunamadı", 
-                f"Gerekli modüller yüklenemedi:\n{str(e2)}\n\nUygulama kapatılacak."
-            )
-            sys.exit(1)
+        # Hata mesajını göster
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror(
+            "Modül Bulunamadı",
+            f"Gerekli modüller yüklenemedi:\n{str(e2)}\n\nUygulama kapatılacak."
+        )
+        sys.exit(1)
+
+if startup_timer is not None:
+    startup_timer.mark("Application modules imported")
 
 def main():
     """
@@ -81,6 +133,20 @@ def main():
         # Arayüzü göster
         window.show()
         
+        if startup_timer is not None:
+            startup_timer.mark("Window shown")
+        
+        # Pencere çizildikten sonra yt-dlp'yi arka planda ısıt
+        def warm_up_finished():
+            if startup_timer is not None:
+                startup_timer.mark("yt-dlp loaded (background)")
+                startup_timer.uninstall()
+                startup_timer.report()
+        QTimer.singleShot(0, lambda: backend.warm_up(warm_up_finished))
+        
+        # Çökme veya yeniden başlatma nedeniyle yarıda kalan indirmeleri sürdür
+        QTimer.singleShot(0, window.resume_unfinished_downloads)
+        
         # Uygulamayı çalıştır
         sys.exit(app.exec())
     except Exception as e:
@@ -91,10 +157,10 @@ def main():
         root = tk.Tk()
         root.withdraw()
         messagebox.showerror(
-            "Uygulama Hatası", 
+            "Uygulama Hatası",
             f"Uygulama başlatılırken bir hata oluştu:\n{str(e)}"
         )
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,10 +5,14 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                            QProgressBar, QFileDialog, QTabWidget, 
                            QListWidget, QListWidgetItem, QMessageBox,
                            QCheckBox, QGroupBox, QRadioButton, QButtonGroup,
-                           QApplication, QFrame)
+                           QApplication, QFrame, QSpinBox, QTableView, QHeaderView,
+                           QAbstractItemView)
 from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QIcon, QPixmap, QColor, QPalette
 
+from .qt_signals import QtDownloadSignals
+from .queue_model import DownloadQueueModel
+
 class YouTubeDownloaderUI(QMainWindow):
     
     def __init__(self, backend):
@@ -17,13 +21,20 @@ class YouTubeDownloaderUI(QMainWindow):
         self.backend = backend
         self.init_ui()
         
-        self.backend.signals.progress.connect(self.update_progress)
-        self.backend.signals.status.connect(self.update_status)
-        self.backend.signals.finished.connect(self.download_finished)
-        self.backend.signals.error.connect(self.show_error)
-        self.backend.signals.playlist_progress.connect(self.update_playlist_progress)
+        # Motor olaylarını Qt sinyallerine bağla
+        self.signals = QtDownloadSignals(self.backend.signals, self)
+        self.signals.progress.connect(self.update_progress)
+        self.signals.status.connect(self.update_status)
+        self.signals.finished.connect(self.download_finished)
+        self.signals.error.connect(self.show_error)
+        self.signals.playlist_progress.connect(self.update_playlist_progress)
         
         self.set_basic_theme()
+        
+        # İndirme listesi olay başına değil, zamanlayıcıyla toplu olarak yenilenir
+        self.queue_timer = QTimer(self)
+        self.queue_timer.timeout.connect(self.refresh_queue)
+        self.queue_timer.start(200)
     
     def set_basic_theme(self):
         app = QApplication.instance()
@@ -130,12 +141,60 @@ class YouTubeDownloaderUI(QMainWindow):
         self.playlist_check = QCheckBox("Download as playlist")
         add_options_layout.addWidget(self.playlist_check)
         
+        # Eşitleme: listenin yalnızca son indirmeden sonra eklenen videoları indirilir
+        self.sync_check = QCheckBox("Only download new videos (sync)")
+        self.sync_check.setToolTip("Remembers the newest videos of each playlist or channel and stops at them next time")
+        self.sync_check.setEnabled(False)
+        self.playlist_check.toggled.connect(self.sync_check.setEnabled)
+        add_options_layout.addWidget(self.sync_check)
+        
         # Özel video atlama seçeneği
         self.skip_private_check = QCheckBox("Skip private videos")
         self.skip_private_check.setChecked(True)  # Varsayılan olarak seçili
         self.skip_private_check.setToolTip("When checked, private videos will be skipped instead of causing errors")
         add_options_layout.addWidget(self.skip_private_check)
         
+        # Daha önce indirilenleri atlama seçeneği
+        self.skip_archived_check = QCheckBox("Skip already downloaded")
+        self.skip_archived_check.setChecked(True)
+        self.skip_archived_check.setToolTip("When checked, items recorded in the download archive are not downloaded again")
+        add_options_layout.addWidget(self.skip_archived_check)
+        
+        # Paralel indirme sayısı seçeneği
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Parallel downloads"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 16)
+        self.workers_spin.setValue(self.backend.max_workers)
+        self.workers_spin.setToolTip("Number of playlist items downloaded at the same time")
+        workers_layout.addWidget(self.workers_spin)
+        add_options_layout.addLayout(workers_layout)
+        
+        # Hız sınırları indirme sürerken de değiştirilebilir
+        limit_layout = QHBoxLayout()
+        limit_layout.addWidget(QLabel("Speed limit"))
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, 1000000)
+        self.limit_spin.setSingleStep(100)
+        self.limit_spin.setSuffix(" KB/s")
+        self.limit_spin.setSpecialValueText("Unlimited")
+        self.limit_spin.setToolTip("Maximum total download speed for all downloads")
+        self.limit_spin.valueChanged.connect(lambda value: self.backend.set_bandwidth_limit(value * 1024))
+        limit_layout.addWidget(self.limit_spin)
+        add_options_layout.addLayout(limit_layout)
+        
+        job_limit_layout = QHBoxLayout()
+        job_limit_layout.addWidget(QLabel("Per download"))
+        self.job_limit_spin = QSpinBox()
+        self.job_limit_spin.setRange(0, 1000000)
+        self.job_limit_spin.setSingleStep(100)
+        self.job_limit_spin.setSuffix(" KB/s")
+        self.job_limit_spin.setSpecialValueText("Unlimited")
+        self.job_limit_spin.setToolTip("Maximum speed of each download")
+        self.job_limit_spin.valueChanged.connect(lambda value: self.backend.set_job_bandwidth_limit(value * 1024))
+        job_limit_layout.addWidget(self.job_limit_spin)
+        add_options_layout.addLayout(job_limit_layout)
+        
         options_layout.addWidget(add_options_group)
         download_layout.addLayout(options_layout)
         
@@ -195,6 +254,40 @@ class YouTubeDownloaderUI(QMainWindow):
         
         tab_widget.addTab(download_tab, "Download")
         
+        queue_tab = QWidget()
+        queue_layout = QVBoxLayout(queue_tab)
+        queue_layout.setContentsMargins(10, 10, 10, 10)
+        queue_layout.setSpacing(10)
+        
+        self.queue_model = DownloadQueueModel(self.backend.format_size, self)
+        self.queue_view = QTableView()
+        self.queue_view.setModel(self.queue_model)
+        self.queue_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.queue_view.setWordWrap(False)
+        # Sabit satır yüksekliği, binlerce satırda görünümün her satırı ölçmesini önler
+        self.queue_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.queue_view.verticalHeader().setDefaultSectionSize(24)
+        self.queue_view.verticalHeader().setVisible(False)
+        self.queue_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        queue_layout.addWidget(self.queue_view)
+        
+        queue_buttons = QHBoxLayout()
+        move_up_button = QPushButton("Move Up")
+        move_up_button.clicked.connect(lambda: self.move_selected(-1))
+        move_down_button = QPushButton("Move Down")
+        move_down_button.clicked.connect(lambda: self.move_selected(1))
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.cancel_selected)
+        clear_button = QPushButton("Clear Finished")
+        clear_button.clicked.connect(self.clear_finished)
+        for button in (move_up_button, move_down_button, cancel_button, clear_button):
+            queue_buttons.addWidget(button)
+        queue_buttons.addStretch()
+        queue_layout.addLayout(queue_buttons)
+        
+        tab_widget.addTab(queue_tab, "Downloads")
+        
         about_tab = QWidget()
         about_layout = QVBoxLayout(about_tab)
         about_layout.setContentsMargins(10, 10, 10, 10)
@@ -276,26 +369,58 @@ class YouTubeDownloaderUI(QMainWindow):
         is_video = self.video_radio.isChecked()
         quality = self.quality_combo.currentText()
         is_playlist = self.playlist_check.isChecked()
+        sync = is_playlist and self.sync_check.isChecked()
         
         # Özel videoları atlama seçeneğini ayarla
         self.backend.set_skip_private(self.skip_private_check.isChecked())
+        self.backend.set_max_workers(self.workers_spin.value())
+        self.backend.set_use_archive(self.skip_archived_check.isChecked())
         
         self.progress_bar.setValue(0)
         self.status_label.setText("Starting download...")
         self.playlist_status.setText("")
         
-        self.backend.start_download(url, is_video, quality, is_playlist)
+        self.backend.start_download(url, is_video, quality, is_playlist, sync=sync)
         
-        # Butonların durumunu güncelle
-        self.download_button.setEnabled(False)
+        # İndirme sürerken yeni URL'ler kuyruğa eklenebilir, indirme butonu açık kalır
         self.stop_button.setEnabled(True)
     
+    def resume_unfinished_downloads(self):
+        """Önceki oturumda yarıda kalan indirmeleri devam ettirir"""
+        if self.backend.resume_jobs():
+            self.stop_button.setEnabled(True)
+    
     def stop_download(self):
         """İndirme işlemini durdurur"""
         self.backend.stop_download()
         self.stop_button.setEnabled(False)
         self.download_button.setEnabled(True)
     
+    def refresh_queue(self):
+        changes = self.backend.tracker.take_changes()
+        if changes:
+            self.queue_model.apply(changes)
+    
+    def selected_keys(self):
+        rows = sorted(index.row() for index in self.queue_view.selectionModel().selectedRows())
+        return [self.queue_model.key_at(row) for row in rows]
+    
+    def move_selected(self, offset):
+        """Seçili bekleyen işi kuyrukta bir sıra öne veya geriye taşır"""
+        keys = [key for key in self.selected_keys() if key[0] == "job"]
+        if len(keys) != 1:
+            return
+        neighbour = self.backend.move_job(keys[0][1], offset)
+        if neighbour is not None:
+            self.queue_model.swap(keys[0], ("job", neighbour))
+    
+    def cancel_selected(self):
+        for key in self.selected_keys():
+            self.backend.cancel_row(key)
+    
+    def clear_finished(self):
+        self.backend.tracker.forget(self.queue_model.remove_finished())
+    
     def update_progress(self, percentage):
         self.progress_bar.setValue(int(percentage))
     
@@ -307,8 +432,10 @@ class YouTubeDownloaderUI(QMainWindow):
             self.download_button.setEnabled(True)
             self.stop_button.setEnabled(False)
     
-    def update_playlist_progress(self, current, total):
-        self.playlist_status.setText(f"Processing: {current}/{total}")
+    def update_playlist_progress(self, completed, in_flight, total):
+        # Akış modunda toplam sayı bilinmeyebilir
+        total_text = str(total) if total > 0 else "?"
+        self.playlist_status.setText(f"Completed: {completed}/{total_text} ({in_flight} in progress)")
     
     def download_finished(self, filename, filepath, thumbnail_path):
         self.status_label.setText(f"Download completed: {filename}")
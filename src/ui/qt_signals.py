@@ -0,0 +1,19 @@
+from PyQt6.QtCore import pyqtSignal, QObject
+
+
+class QtDownloadSignals(QObject):
+    """İndirme motoru olaylarını Qt sinyallerine aktaran bağdaştırıcı"""
+    progress = pyqtSignal(float)
+    finished = pyqtSignal(str, str, str)
+    error = pyqtSignal(str)
+    status = pyqtSignal(str)
+    playlist_progress = pyqtSignal(int, int, int)  # tamamlanan, devam eden, toplam
+
+    def __init__(self, events, parent=None):
+        super().__init__(parent)
+        # Sinyaller iş parçacıkları arasında kuyruğa alınır, arayüz güncellemeleri ana iş parçacığında kalır
+        events.progress.connect(self.progress.emit)
+        events.finished.connect(self.finished.emit)
+        events.error.connect(self.error.emit)
+        events.status.connect(self.status.emit)
+        events.playlist_progress.connect(self.playlist_progress.emit)
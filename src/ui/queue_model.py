@@ -0,0 +1,151 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+COLUMNS = ("Title", "Format", "State", "Progress", "Size", "Speed", "ETA")
+FINISHED_STATES = ("done", "failed", "cancelled")
+STATE_LABELS = {
+    "queued": "Queued",
+    "extracting": "Getting info",
+    "downloading": "Downloading",
+    "merging": "Merging",
+    "done": "Done",
+    "failed": "Failed",
+    "cancelled": "Cancelled"
+}
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class DownloadQueueModel(QAbstractTableModel):
+    """
+    İndirme listesinin tablo modeli; satırlar DownloadTracker.take_changes ile toplu güncellenir.
+    Görünüm yalnızca ekranda görünen satırları çizer, binlerce öğede de arayüz akıcı kalır.
+    """
+
+    def __init__(self, format_size, parent=None):
+        super().__init__(parent)
+        self.format_size = format_size
+        self.rows = []
+        self.index_of = {}  # satır anahtarı -> satır numarası
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(row, column)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row['error'] or row['title']
+        if role == Qt.ItemDataRole.TextAlignmentRole and column >= 3:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def display_text(self, row, column):
+        if column == 0:
+            # Liste öğeleri bağlı oldukları işin altında girintili gösterilir
+            return f"    {row['title']}" if row['key'][0] == "item" else row['title']
+        if column == 1:
+            return row['kind']
+        if column == 2:
+            return STATE_LABELS.get(row['state'], row['state'])
+        if column == 3:
+            if row['playlist']:
+                # Akış modunda toplam öğe sayısı bilinmeyebilir
+                total = str(row['count']) if row['count'] > 0 else "?"
+                return f"{row['completed']}/{total}"
+            if row['total'] > 0:
+                return f"{min(100.0, row['downloaded'] * 100 / row['total']):.1f}%"
+            return ""
+        if column == 4:
+            return self.format_size(row['total']) if row['total'] > 0 else ""
+        if column == 5:
+            return f"{self.format_size(row['speed'])}/s" if row['speed'] > 0 else ""
+        if column == 6:
+            return format_eta(row['eta'])
+        return None
+
+    def apply(self, changes):
+        """Değişen satırları uygular: yeni satırlar tek seferde eklenir, güncellenenler tek bildirimle yenilenir"""
+        added = [change for change in changes if change['key'] not in self.index_of]
+        if added:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for change in added:
+                self.index_of[change['key']] = len(self.rows)
+                self.rows.append(change)
+            self.endInsertRows()
+
+        changed = []
+        for change in changes:
+            row_number = self.index_of[change['key']]
+            if self.rows[row_number] is not change:
+                self.rows[row_number] = change
+                changed.append(row_number)
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0), self.index(max(changed), len(COLUMNS) - 1))
+
+    def key_at(self, row_number):
+        return self.rows[row_number]['key']
+
+    def row_state(self, row_number):
+        return self.rows[row_number]['state']
+
+    def swap(self, first_key, second_key):
+        """İki satırın yerini değiştirir (kuyrukta yer değiştiren işler için)"""
+        if first_key not in self.index_of or second_key not in self.index_of:
+            return
+        upper, lower = sorted((self.index_of[first_key], self.index_of[second_key]))
+        if upper == lower:
+            return
+        self.beginMoveRows(QModelIndex(), lower, lower, QModelIndex(), upper)
+        self.rows.insert(upper, self.rows.pop(lower))
+        self.endMoveRows()
+        if lower > upper + 1:
+            self.beginMoveRows(QModelIndex(), upper + 1, upper + 1, QModelIndex(), lower + 1)
+            self.rows.insert(lower, self.rows.pop(upper + 1))
+            self.endMoveRows()
+        self.reindex(upper, lower + 1)
+
+    def remove_finished(self):
+        """Biten satırları listeden kaldırır ve kaldırılan anahtarları döndürür"""
+        removed = []
+        row_number = len(self.rows) - 1
+        # Ardışık biten satırlar sondan başa doğru tek bildirimle kaldırılır
+        while row_number >= 0:
+            if self.rows[row_number]['state'] not in FINISHED_STATES:
+                row_number -= 1
+                continue
+            last = row_number
+            while row_number > 0 and self.rows[row_number - 1]['state'] in FINISHED_STATES:
+                row_number -= 1
+            self.beginRemoveRows(QModelIndex(), row_number, last)
+            removed.extend(row['key'] for row in self.rows[row_number:last + 1])
+            del self.rows[row_number:last + 1]
+            self.endRemoveRows()
+            row_number -= 1
+        if removed:
+            self.index_of = {}
+            self.reindex(0, len(self.rows))
+        return removed
+
+    def reindex(self, start, stop):
+        for row_number in range(start, stop):
+            self.index_of[self.rows[row_number]['key']] = row_number